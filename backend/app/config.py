@@ -1,33 +1,116 @@
+from collections.abc import Mapping
+from functools import cached_property
+from typing import Literal
+
+from pydantic import SecretStr, model_validator
 from pydantic_settings import BaseSettings
 
+from app.services.brands import BrandConfig, BrandRegistry, load_brands
+from app.services.bulkhead import BulkheadLimits
+from app.services.password_policy import PasswordPolicy
+
 
 class Settings(BaseSettings):
-    oracle_dsn_avis: str
-    oracle_dsn_budget: str
+    brands_file: str | None = None
+    oracle_dsn_avis: str | None = None
+    oracle_dsn_budget: str | None = None
+    oracle_dsns: dict[str, list[str]] = {}
+    oracle_load_balance: bool = False
+    oracle_failover_attempts: int = 3
+    oracle_failover_backoff_seconds: float = 0.2
+    oracle_failover_backoff_max_seconds: float = 2.0
+    oracle_tcp_connect_timeout: float = 10.0
+    oracle_retry_count: int = 0
+    oracle_retry_delay: int = 1
+    oracle_config_dir: str | None = None
+    oracle_wallet_location: str | None = None
+    oracle_wallet_password: SecretStr | None = None
     cors_origins: list[str] = ["*"]
+    rate_limit_per_ip: str = "5/minute"
+    rate_limit_per_user: str = "5/minute"
+    rate_limit_backend: Literal["memory", "sqlite"] = "memory"
+    rate_limit_db_path: str = "rate_limits.db"
+    rate_limit_max_keys: int = 100_000
+    failure_threshold_user: float = 5
+    failure_threshold_ip: float = 50
+    failure_half_life_seconds: float = 900
+    failure_sketch_width: int = 8192
+    failure_sketch_depth: int = 4
+    bulkheads: dict[str, BulkheadLimits] = {}
+    circuit_failure_threshold: int = 5
+    circuit_probe_interval_seconds: float = 5.0
+    circuit_probe_timeout_seconds: float = 3.0
+    verification_sweep_interval_seconds: float = 60.0
+    verification_token_ttl_seconds: int = 300
+    verification_token_capacity: int = 100_000
+    verification_token_mode: Literal["memory", "signed", "sqlite"] = "memory"
+    verification_token_secret: SecretStr | None = None
+    verification_token_db_path: str = "verification_tokens.db"
+    audit_log_path: str = "reset_audit.log"
+    audit_queue_size: int = 10_000
+    audit_batch_size: int = 256
+    audit_flush_interval_seconds: float = 1.0
+    audit_max_bytes: int = 100 * 1024 * 1024
+    audit_rotate_interval_seconds: float = 0
+    audit_backup_count: int = 14
+    audit_fsync: Literal["never", "batch"] = "never"
+    audit_overflow: Literal["drop", "block"] = "drop"
+    audit_block_timeout_seconds: float = 0.1
+    password_policy: dict[str, PasswordPolicy] = {}
+    password_policy_max_age_seconds: int = 300
+    breached_password_filter_path: str | None = None
+    server_timing_sample_rate: float = 0.0
+    slow_request_threshold_ms: float = 2000
+    slow_request_log_path: str = "slow_requests.log"
+    admin_token: SecretStr | None = None
+    profile_dir: str = "profiles"
+    profile_interval_seconds: float = 0.01
+    profile_default_seconds: float = 30
+    profile_max_seconds: float = 300
+    frontend_dir: str | None = "../frontend/dist"
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
+    @model_validator(mode="after")
+    def _check_token_secret(self) -> "Settings":
+        """Require a shared secret of at least 32 bytes when signed tokens are enabled."""
+        if self.verification_token_mode == "signed":
+            secret = self.verification_token_secret
+            if secret is None or len(secret.get_secret_value().encode()) < 32:
+                raise ValueError("verification_token_secret of at least 32 bytes is required for signed tokens")
+        return self
+
+    @model_validator(mode="after")
+    def _check_brand_source(self) -> "Settings":
+        """Without a BRANDS_FILE registry, both legacy per-brand DSNs are required."""
+        if not self.brands_file:
+            missing = [name for name in ("oracle_dsn_avis", "oracle_dsn_budget") if getattr(self, name) is None]
+            if missing:
+                raise ValueError(f"{' and '.join(missing)} required when brands_file is not set")
+        return self
+
     def get_dsn(self, brand: str) -> str:
-        """Return the Oracle DSN for a given brand name.
+        """Return the primary Oracle DSN for a given brand name.
 
         Args:
-            brand: The brand identifier ("avis" or "budget").
+            brand: The brand identifier (e.g. "avis" or "budget").
 
         Returns:
-            The corresponding Oracle DSN connection string.
+            The brand's first configured Oracle DSN connection string.
 
         Raises:
             ValueError: If the brand is not recognized.
         """
-        dsn_map = {
-            "avis": self.oracle_dsn_avis,
-            "budget": self.oracle_dsn_budget,
-        }
-        dsn = dsn_map.get(brand)
-        if dsn is None:
+        config = self.brand_configs.get(brand)
+        if config is None:
             raise ValueError(f"Unknown brand: {brand}")
-        return dsn
+        return config.dsns[0]
+
+    @cached_property
+    def brand_configs(self) -> Mapping[str, BrandConfig]:
+        """Immutable brand table, loaded once per settings instance."""
+        return load_brands(self)
 
 
 settings = Settings()
+brand_registry = BrandRegistry(settings.brand_configs)
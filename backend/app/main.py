@@ -1,81 +1,515 @@
+import asyncio
+import contextlib
+import hmac
 import logging
+import signal
+import time
+from pathlib import Path
 
 from fastapi import FastAPI, Request
+from fastapi.routing import APIRoute
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
-from app.config import settings
-from app.models import CredentialCheckRequest, PasswordResetRequest, PasswordResetResponse
-from app.services.oracle import reset_password, verify_credentials
-from app.services.verification_tokens import VerificationTokenStore
+from app.config import Settings, brand_registry, settings
+from app.models import CredentialCheckRequest, PasswordChangeRequest, PasswordResetRequest, PasswordResetResponse
+from app.services.audit import create_audit_logger
+from app.services.breached_passwords import create_breached_password_filter
+from app.services.bulkhead import Bulkhead, BulkheadFullError, create_bulkheads
+from app.services.circuit_breaker import CircuitBreaker, run_probes
+from app.services.connect_params import ConnectParamsCache
+from app.services.failover import create_failover
+from app.services.failure_sketch import create_failure_tracker
+from app.services.metrics import CONTENT_TYPE, MetricsRegistry, error_code_label
+from app.services.oracle import (
+    ORA_INVALID_CREDENTIALS,
+    OracleServiceError,
+    reset_password_async,
+    verify_credentials_async,
+)
+from app.services.profiler import ProfilerBusyError, create_profiler
+from app.services.rate_limit import RateLimitExceeded, create_rate_limiter
+from app.services.single_flight import SingleFlight
+from app.services.static_assets import create_static_assets
+from app.services.timing import ServerTimingMiddleware, create_request_timing, mark_validated, span
+from app.services.verification_tokens import create_verification_store
+
+logger = logging.getLogger(__name__)
+
+audit_logger = create_audit_logger(settings)
+connect_params = ConnectParamsCache(settings)
+breakers = {
+    brand: CircuitBreaker(brand, failure_threshold=settings.circuit_failure_threshold)
+    for brand in brand_registry
+}
+bulkheads = create_bulkheads(settings)
+failover = create_failover(settings)
+rate_limiter = create_rate_limiter(settings)
+failure_tracker = create_failure_tracker(settings)
+verify_flights = SingleFlight()
+verification_store = create_verification_store(settings)
+breached_passwords = create_breached_password_filter(settings)
+request_timing = create_request_timing(settings)
+profiler = create_profiler(settings)
+static_assets = create_static_assets(settings)
 
+ENDPOINTS = ("/reset-password", "/change-password", "/verify-credentials")
+LOGON_OPERATIONS = ("reset", "verify")
 
-logging.basicConfig(
-    filename="reset_audit.log",
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    level=logging.INFO,
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    "password_reset_request_seconds",
+    "Time to answer an API request, by endpoint, brand and outcome (success or failed).",
+    ("endpoint", "brand", "outcome"),
+)
+oracle_logon_seconds = metrics.histogram(
+    "password_reset_oracle_logon_seconds",
+    "Duration of each Oracle logon attempt, including failed-over attempts.",
+    ("brand", "operation", "outcome"),
+)
+oracle_errors = metrics.counter(
+    "password_reset_oracle_errors_total", "Oracle logon attempts that failed, by error code.", ("brand", "code")
+)
+rate_limited = metrics.counter(
+    "password_reset_rate_limited_total", "Requests answered with 429 Too Many Requests.", ("endpoint",)
 )
-logger = logging.getLogger("audit")
+bulkhead_rejected = metrics.counter(
+    "password_reset_bulkhead_rejected_total",
+    "Requests answered with 503 because the brand's logon queue was full or timed out.",
+    ("brand",),
+)
+metrics.gauge(
+    "password_reset_verification_tokens",
+    "Verification tokens issued and not yet consumed or swept.",
+    (),
+    lambda: {(): len(verification_store)},
+)
+metrics.gauge(
+    "password_reset_bulkhead_active",
+    "Oracle logons currently running, per brand.",
+    ("brand",),
+    lambda: {(brand,): bulkhead.snapshot()["active"] for brand, bulkhead in bulkheads.items()},
+)
+metrics.gauge(
+    "password_reset_bulkhead_waiting",
+    "Oracle logons queued behind the bulkhead, per brand.",
+    ("brand",),
+    lambda: {(brand,): bulkhead.snapshot()["waiting"] for brand, bulkhead in bulkheads.items()},
+)
+metrics.gauge(
+    "password_reset_circuit_open",
+    "1 while the brand's circuit breaker rejects logons, else 0.",
+    ("brand",),
+    lambda: {(brand,): int(breaker.state == "open") for brand, breaker in breakers.items()},
+)
+for endpoint in ENDPOINTS:
+    rate_limited.preregister(endpoint)
+
 
+def _preregister_brand(brand: str) -> None:
+    """Export a brand's request, logon and rejection series at zero before its first request."""
+    for endpoint in ENDPOINTS:
+        for outcome in ("success", "failed"):
+            request_seconds.preregister(endpoint, brand, outcome)
+    for operation in LOGON_OPERATIONS:
+        for outcome in ("ok", "error"):
+            oracle_logon_seconds.preregister(brand, operation, outcome)
+    bulkhead_rejected.preregister(brand)
 
-limiter = Limiter(key_func=get_remote_address)
-verification_store = VerificationTokenStore(ttl_seconds=300)
 
-app = FastAPI(title="Oracle Password Reset", version="1.0.0")
-app.state.limiter = limiter
+for brand in brand_registry:
+    _preregister_brand(brand)
+
+
+def reload_brands() -> None:
+    """Re-read the brand registry and apply it in place; runs on SIGHUP.
+
+    Connect params, breakers and bulkheads for new or changed brands are in
+    place before the registry swap makes those brands valid. Removed brands
+    become invalid at the swap; their breakers and bulkheads are left for any
+    requests still in flight. Other settings need a restart. An invalid
+    registry is logged and the current one kept.
+    """
+    try:
+        new_settings = Settings()
+        configs = new_settings.brand_configs
+    except (OSError, ValueError):
+        logger.exception("Brand registry reload failed; keeping the current registry")
+        return
+    connect_params.reload(new_settings)
+    for brand, config in configs.items():
+        breakers.setdefault(brand, CircuitBreaker(brand, failure_threshold=settings.circuit_failure_threshold))
+        bulkhead = bulkheads.get(brand)
+        if bulkhead is None or bulkhead.limits != config.bulkhead:
+            bulkheads[brand] = Bulkhead(brand, config.bulkhead)
+        _preregister_brand(brand)
+    brand_registry.replace(configs)
+    logger.info("Reloaded brand registry: %d brands", len(configs))
+
+
+def _route_codes() -> dict:
+    """Map each API handler's code object to its path, so profiles can be split by route."""
+    return {route.endpoint.__code__: route.path for route in app.routes if isinstance(route, APIRoute)}
+
+
+def start_profile(seconds: float | None = None) -> Path:
+    """Start sampling this worker's stacks and return the file the profile will be written to.
+
+    Raises:
+        ValueError: If `seconds` is out of range.
+        ProfilerBusyError: If a profile is already running.
+    """
+    if seconds is None:
+        seconds = settings.profile_default_seconds
+    path = profiler.start(seconds, _route_codes())
+    logger.info("Profiling for %gs into %s", seconds, path)
+    return path
+
+
+def _start_profile_on_signal() -> None:
+    """SIGUSR2: profile for PROFILE_DEFAULT_SECONDS."""
+    try:
+        start_profile()
+    except ProfilerBusyError:
+        logger.warning("Ignoring SIGUSR2: a profile is already running")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the audit and slow-request writers, circuit probes and, if enabled, the token sweeper."""
+    audit_logger.start()
+    if request_timing.slow_log is not None:
+        request_timing.slow_log.start()
+    loop = asyncio.get_running_loop()
+    # Signal handlers need the main thread on a Unix platform; test clients run the app elsewhere.
+    signal_handlers = {"SIGHUP": reload_brands, "SIGUSR2": _start_profile_on_signal}
+    installed = []
+    for name, handler in signal_handlers.items():
+        signum = getattr(signal, name, None)
+        if signum is None:
+            continue
+        try:
+            loop.add_signal_handler(signum, handler)
+        except (ValueError, RuntimeError):
+            break
+        installed.append(signum)
+    tasks = [
+        asyncio.create_task(
+            run_probes(
+                breakers,
+                connect_params,
+                settings.circuit_probe_interval_seconds,
+                settings.circuit_probe_timeout_seconds,
+            )
+        )
+    ]
+    if settings.verification_sweep_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(verification_store.run_sweeper(settings.verification_sweep_interval_seconds))
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    for signum in installed:
+        loop.remove_signal_handler(signum)
+    if request_timing.slow_log is not None:
+        request_timing.slow_log.stop()
+    audit_logger.stop()
+
+
+app = FastAPI(title="Oracle Password Reset", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
-    allow_methods=["POST"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
 )
+app.add_middleware(ServerTimingMiddleware, timing=request_timing)
+
+
+def _finish(endpoint: str, brand: str, outcome: str, start: float) -> float:
+    """Record the request's latency since a `time.perf_counter()` reading and return it in milliseconds."""
+    elapsed = time.perf_counter() - start
+    request_seconds.observe(elapsed, endpoint, brand, outcome)
+    return elapsed * 1000
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a `time.perf_counter()` reading, for requests the latency histogram does not count."""
+    return (time.perf_counter() - start) * 1000
+
+
+async def _timed_logon(brand: str, operation: str, logon, *args) -> str:
+    """Await one Oracle logon attempt, recording its latency and any error code."""
+    start = time.perf_counter()
+    try:
+        result = await logon(*args)
+    except OracleServiceError as e:
+        oracle_logon_seconds.observe(time.perf_counter() - start, brand, operation, "error")
+        oracle_errors.inc(brand, error_code_label(e.code, e.full_code))
+        raise
+    oracle_logon_seconds.observe(time.perf_counter() - start, brand, operation, "ok")
+    return result
+
+
+async def _guarded_logon(brand: str, username: str, ip: str, operation: str, idempotent: bool, logon, *args) -> str:
+    """Run an Oracle logon through the brand's bulkhead, circuit breaker and failover, counting ORA-1017 failures.
+
+    `logon(*args, target)` is called with each of the brand's ConnectParams in
+    turn; `idempotent` says whether it may be retried after an ambiguous error.
+    Every attempt is timed under `operation` in the logon histogram.
+    """
+    with span("dsn"):
+        targets = connect_params.targets(brand)
+    try:
+        return await bulkheads[brand].run(
+            breakers[brand].call, failover.call, targets, _timed_logon, idempotent, brand, operation, logon, *args
+        )
+    except OracleServiceError as e:
+        if e.code == ORA_INVALID_CREDENTIALS:
+            failure_tracker.record_failure(username, brand, ip)
+        raise
+
+
+async def _verify_and_issue_token(brand: str, username: str, ip: str, current_password: str) -> tuple[str, str]:
+    """Verify the credentials and issue the user's verification token.
+
+    Runs once per coalesced verify, so every caller sharing the flight gets the
+    same token; issuing one per caller would replace the others' tokens, since
+    a user holds at most one.
+    """
+    message = await _guarded_logon(
+        brand, username, ip, "verify", True, verify_credentials_async, username, current_password
+    )
+    with span("token"):
+        verification_token = await verification_store.create_token_async(username, brand)
+    return message, verification_token
 
 
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+    rate_limited.inc(request.url.path)
     return JSONResponse(
         status_code=429,
         content={"success": False, "message": "Too many requests. Please try again later."},
+        headers={"Retry-After": str(exc.retry_after)},
     )
 
 
-@app.post("/reset-password", response_model=PasswordResetResponse)
-@limiter.limit("5/minute")
-def handle_reset_password(request: Request, body: PasswordResetRequest):
-    ip = request.client.host
-    dsn = settings.get_dsn(body.brand)
+@app.exception_handler(BulkheadFullError)
+async def bulkhead_full_handler(request: Request, exc: BulkheadFullError):
+    bulkhead_rejected.inc(exc.brand)
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "message": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.get("/healthz")
+async def healthz():
+    """Readiness from cached circuit state; ready while at least one brand is reachable."""
+    brands = {
+        brand: {**breakers[brand].snapshot(), "bulkhead": bulkheads[brand].snapshot()} for brand in brand_registry
+    }
+    ready = any(state["state"] != "open" for state in brands.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ok" if ready else "unavailable", "brands": brands},
+    )
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Counters, latency histograms and gauges in the Prometheus text format."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
 
+def _frontend_response(request: Request, name: str) -> Response:
+    """Serve a file of the built frontend bundle, or 404 when none was built."""
+    if static_assets is None:
+        return Response(status_code=404)
+    return static_assets.response(
+        name, request.headers.get("Accept-Encoding", ""), request.headers.get("If-None-Match")
+    )
+
+
+@app.get("/", include_in_schema=False)
+async def frontend_index(request: Request):
+    """The frontend page, served same-origin so API calls need no CORS preflight."""
+    return _frontend_response(request, "index.html")
+
+
+@app.get("/assets/{name}", include_in_schema=False)
+async def frontend_asset(request: Request, name: str):
+    """Content-hashed frontend assets, cached by browsers as immutable."""
+    return _frontend_response(request, f"assets/{name}")
+
+
+@app.post("/admin/profile", status_code=202)
+async def admin_profile(request: Request, seconds: float | None = None):
+    """Sample this worker's stacks for `seconds` (bearer ADMIN_TOKEN required) into PROFILE_DIR.
+
+    Answers 404 while no admin token is configured.
+    """
+    if settings.admin_token is None:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    expected = f"Bearer {settings.admin_token.get_secret_value()}"
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+        return JSONResponse(status_code=401, content={"detail": "Invalid admin token"})
     try:
-        verification_store.consume_token(body.verification_token, body.username, body.brand)
-        message = reset_password(body.username, body.current_password, body.new_password, dsn)
-        logger.info("user=%s brand=%s ip=%s status=SUCCESS", body.username, body.brand, ip)
+        path = start_profile(seconds)
+    except ProfilerBusyError as e:
+        return JSONResponse(status_code=409, content={"detail": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    return JSONResponse(status_code=202, content={"path": str(path)})
+
+
+@app.get("/brands")
+async def brands():
+    """Configured brands in registry order, for the frontend's brand picker."""
+    return JSONResponse(
+        content=[
+            {"name": brand, "display_name": brand_registry.get(brand).display_name} for brand in brand_registry
+        ],
+        headers={"Cache-Control": f"public, max-age={settings.password_policy_max_age_seconds}"},
+    )
+
+
+@app.get("/password-policy")
+async def password_policy():
+    """Per-brand password rules, so the frontend can validate as the user types."""
+    return JSONResponse(
+        content={
+            brand: brand_registry.get(brand).password_policy.model_dump(mode="json") for brand in brand_registry
+        },
+        headers={"Cache-Control": f"public, max-age={settings.password_policy_max_age_seconds}"},
+    )
+
+
+async def _change_password(
+    endpoint: str, body: PasswordChangeRequest, ip: str, start: float, verification_token: str | None = None
+) -> PasswordResetResponse:
+    """Change the password with a single `newpassword` logon, auditing SUCCESS or FAILED.
+
+    With a verification token (the two-step flow) the token is consumed first;
+    without one the logon itself is the credential check.
+    """
+    breaker = breakers[body.brand]
+
+    try:
+        failure_tracker.check(body.username, body.brand, ip)
+        breaker.ensure_available()
+        if breached_passwords is not None:
+            with span("breached"):
+                breached_passwords.ensure_not_breached(body.new_password)
+        if verification_token is not None:
+            with span("token"):
+                await verification_store.consume_token_async(verification_token, body.username, body.brand)
+        message = await _guarded_logon(
+            body.brand,
+            body.username,
+            ip,
+            "reset",
+            False,
+            reset_password_async,
+            body.username,
+            body.current_password,
+            body.new_password,
+        )
+        latency_ms = _finish(endpoint, body.brand, "success", start)
+        with span("audit"):
+            await audit_logger.log_async(
+                "SUCCESS", brand=body.brand, user=body.username, ip=ip, latency_ms=latency_ms
+            )
         return PasswordResetResponse(success=True, message=message)
 
+    except BulkheadFullError as e:
+        with span("audit"):
+            await audit_logger.log_async(
+                "SHED", brand=body.brand, user=body.username, ip=ip, reason=str(e), latency_ms=_elapsed_ms(start)
+            )
+        raise
+
     except ValueError as e:
-        logger.warning("user=%s brand=%s ip=%s status=FAILED reason=%s", body.username, body.brand, ip, e)
+        latency_ms = _finish(endpoint, body.brand, "failed", start)
+        with span("audit"):
+            await audit_logger.log_async(
+                "FAILED", brand=body.brand, user=body.username, ip=ip, reason=str(e), latency_ms=latency_ms
+            )
         return PasswordResetResponse(success=False, message=str(e))
 
 
+@app.post("/reset-password", response_model=PasswordResetResponse)
+async def handle_reset_password(request: Request, body: PasswordResetRequest):
+    mark_validated(brand=body.brand, user=body.username)
+    start = time.perf_counter()
+    ip = request.client.host
+    with span("rate_limit"):
+        await rate_limiter.check_async("reset", ip, body.username, body.brand)
+    return await _change_password("/reset-password", body, ip, start, body.verification_token)
+
+
+@app.post("/change-password", response_model=PasswordResetResponse)
+async def handle_change_password(request: Request, body: PasswordChangeRequest):
+    """Verify and reset in one Oracle logon, for clients that collect both passwords up front."""
+    mark_validated(brand=body.brand, user=body.username)
+    start = time.perf_counter()
+    ip = request.client.host
+    with span("rate_limit"):
+        await rate_limiter.check_async("reset", ip, body.username, body.brand)
+    return await _change_password("/change-password", body, ip, start)
+
+
 @app.post("/verify-credentials", response_model=PasswordResetResponse)
-@limiter.limit("5/minute")
-def handle_verify_credentials(request: Request, body: CredentialCheckRequest):
+async def handle_verify_credentials(request: Request, body: CredentialCheckRequest):
+    mark_validated(brand=body.brand, user=body.username)
+    start = time.perf_counter()
     ip = request.client.host
-    dsn = settings.get_dsn(body.brand)
+    with span("rate_limit"):
+        await rate_limiter.check_async("verify", ip, body.username, body.brand)
 
     try:
-        message = verify_credentials(body.username, body.current_password, dsn)
-        verification_token = verification_store.create_token(body.username, body.brand)
-        logger.info("user=%s brand=%s ip=%s status=VERIFY_SUCCESS", body.username, body.brand, ip)
+        failure_tracker.check(body.username, body.brand, ip)
+        message, verification_token = await verify_flights.do(
+            verify_flights.key(body.brand, body.username, body.current_password),
+            _verify_and_issue_token,
+            body.brand,
+            body.username,
+            ip,
+            body.current_password,
+        )
+        latency_ms = _finish("/verify-credentials", body.brand, "success", start)
+        with span("audit"):
+            await audit_logger.log_async(
+                "VERIFY_SUCCESS", brand=body.brand, user=body.username, ip=ip, latency_ms=latency_ms
+            )
         return PasswordResetResponse(
             success=True,
             message=message,
             verification_token=verification_token,
         )
 
+    except BulkheadFullError as e:
+        with span("audit"):
+            await audit_logger.log_async(
+                "VERIFY_SHED",
+                brand=body.brand,
+                user=body.username,
+                ip=ip,
+                reason=str(e),
+                latency_ms=_elapsed_ms(start),
+            )
+        raise
+
     except ValueError as e:
-        logger.warning("user=%s brand=%s ip=%s status=VERIFY_FAILED reason=%s", body.username, body.brand, ip, e)
+        latency_ms = _finish("/verify-credentials", body.brand, "failed", start)
+        with span("audit"):
+            await audit_logger.log_async(
+                "VERIFY_FAILED", brand=body.brand, user=body.username, ip=ip, reason=str(e), latency_ms=latency_ms
+            )
         return PasswordResetResponse(success=False, message=str(e))
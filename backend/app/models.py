@@ -1,24 +1,50 @@
-from typing import Literal
+from typing import Annotated
 
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+from app.config import brand_registry
+from app.services.password_policy import check_password
 
 ORACLE_USERNAME_PATTERN = r"^[a-zA-Z][a-zA-Z0-9_$#]*$"
+# Oracle rejects longer passwords; the cap also bounds the policy checks run while validating.
+ORACLE_PASSWORD_MAX_LENGTH = 1024
+
+
+def _known_brand(brand: str) -> str:
+    """Accept only brands in the current registry, so reloads take effect immediately."""
+    if brand not in brand_registry:
+        raise ValueError(f"Unknown brand: {brand}")
+    return brand
+
 
-BRAND_TYPE = Literal["avis", "budget"]
+BRAND_TYPE = Annotated[str, AfterValidator(_known_brand)]
 
 
-class PasswordResetRequest(BaseModel):
+class PasswordChangeRequest(BaseModel):
     brand: BRAND_TYPE
     username: str = Field(min_length=1, max_length=128, pattern=ORACLE_USERNAME_PATTERN)
-    current_password: str = Field(min_length=1)
-    new_password: str = Field(min_length=8)
+    current_password: str = Field(min_length=1, max_length=ORACLE_PASSWORD_MAX_LENGTH)
+    new_password: str = Field(min_length=8, max_length=ORACLE_PASSWORD_MAX_LENGTH)
+
+    @model_validator(mode="after")
+    def _check_password_policy(self) -> "PasswordChangeRequest":
+        """Reject new passwords that break the brand's policy before Oracle is contacted."""
+        violations = check_password(
+            brand_registry.get(self.brand).password_policy, self.new_password, self.username, self.current_password
+        )
+        if violations:
+            raise ValueError(" ".join(violations))
+        return self
+
+
+class PasswordResetRequest(PasswordChangeRequest):
     verification_token: str = Field(min_length=1)
 
 
 class CredentialCheckRequest(BaseModel):
     brand: BRAND_TYPE
     username: str = Field(min_length=1, max_length=128, pattern=ORACLE_USERNAME_PATTERN)
-    current_password: str = Field(min_length=1)
+    current_password: str = Field(min_length=1, max_length=ORACLE_PASSWORD_MAX_LENGTH)
 
 
 class PasswordResetResponse(BaseModel):
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+OverflowPolicy = Literal["drop", "block"]
+FsyncPolicy = Literal["never", "batch"]
+
+_STOP = object()
+_SPACE_POLL_SECONDS = 0.005
+
+
+class AuditLogger:
+    """Non-blocking structured audit trail written as JSON lines by a background thread.
+
+    `log` only builds a dict and puts it on a bounded in-memory queue, so disk
+    latency never reaches the request path. The writer thread drains the queue
+    in batches, writes each batch with one `write` call and optionally fsyncs
+    it. The file is rotated to numbered backups (`.1`, `.2`, ...) once it
+    exceeds `max_bytes` or has been open for `rotate_interval_seconds`.
+
+    When the queue is full the `drop` policy discards the record and counts it
+    (the count is written as an `AUDIT_DROPPED` record once space frees up);
+    the `block` policy waits up to `block_timeout_seconds` before dropping.
+    On the event loop, `log_async` waits by yielding to other tasks. A plain
+    `log` there drops and counts like `drop`, since blocking the loop would
+    stall every request.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 1.0,
+        max_bytes: int = 100 * 1024 * 1024,
+        rotate_interval_seconds: float = 0,
+        backup_count: int = 14,
+        fsync: FsyncPolicy = "never",
+        overflow: OverflowPolicy = "drop",
+        block_timeout_seconds: float = 0.1,
+    ) -> None:
+        """Configure the pipeline; call `start` to launch the writer thread."""
+        self._path = Path(path)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._max_bytes = max_bytes
+        self._rotate_interval = rotate_interval_seconds
+        self._backup_count = backup_count
+        self._fsync = fsync
+        self._overflow = overflow
+        self._block_timeout = block_timeout_seconds
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._file = None
+        self._opened_at = 0.0
+
+    @property
+    def dropped(self) -> int:
+        """Number of records discarded because the queue was full."""
+        return self._dropped
+
+    def log(
+        self,
+        status: str,
+        *,
+        brand: str,
+        user: str,
+        ip: str | None,
+        reason: str | None = None,
+        latency_ms: float | None = None,
+    ) -> None:
+        """Enqueue one audit record without touching the disk."""
+        record = {
+            "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+            "status": status,
+            "brand": brand,
+            "user": user,
+            "ip": ip,
+        }
+        if reason is not None:
+            record["reason"] = reason
+        if latency_ms is not None:
+            record["latency_ms"] = round(latency_ms, 1)
+        self._enqueue(record)
+
+    async def log_async(
+        self,
+        status: str,
+        *,
+        brand: str,
+        user: str,
+        ip: str | None,
+        reason: str | None = None,
+        latency_ms: float | None = None,
+    ) -> None:
+        """`log` for the event loop; under `block`, waits for queue space by yielding to other tasks."""
+        if self._overflow == "block":
+            deadline = time.monotonic() + self._block_timeout
+            while self._queue.full() and time.monotonic() < deadline:
+                await asyncio.sleep(_SPACE_POLL_SECONDS)
+        self.log(status, brand=brand, user=user, ip=ip, reason=reason, latency_ms=latency_ms)
+
+    def start(self) -> None:
+        """Launch the background writer thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush every queued record and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _enqueue(self, record: dict) -> None:
+        """Put a record on the queue, applying the overflow policy when it is full."""
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        if self._overflow == "block" and not _on_event_loop():
+            try:
+                self._queue.put(record, timeout=self._block_timeout)
+                return
+            except queue.Full:
+                pass
+        with self._dropped_lock:
+            self._dropped += 1
+
+    def _run(self) -> None:
+        """Writer loop: gather batches until the stop sentinel arrives."""
+        self._open()
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self._flush_interval)
+                except queue.Empty:
+                    item = None
+                while item is not None:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self._batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                self._write_batch(batch)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, batch: list[dict]) -> None:
+        """Serialize and append a batch, rotating first if the file is due."""
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            batch.append({
+                "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+                "status": "AUDIT_DROPPED",
+                "count": dropped,
+            })
+        if not batch:
+            return
+
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in batch).encode()
+        if self._should_rotate(len(data)):
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        if self._fsync == "batch":
+            os.fsync(self._file.fileno())
+
+    def _should_rotate(self, incoming: int) -> bool:
+        """Return True when appending `incoming` bytes would break a rotation limit."""
+        size = self._file.tell()
+        if size == 0:
+            return False
+        if self._max_bytes and size + incoming > self._max_bytes:
+            return True
+        return bool(self._rotate_interval) and time.monotonic() - self._opened_at >= self._rotate_interval
+
+    def _rotate(self) -> None:
+        """Shift numbered backups up by one and reopen a fresh file."""
+        self._file.close()
+        if self._backup_count > 0:
+            for index in range(self._backup_count - 1, 0, -1):
+                source = self._path.with_name(f"{self._path.name}.{index}")
+                if source.exists():
+                    source.replace(self._path.with_name(f"{self._path.name}.{index + 1}"))
+            self._path.replace(self._path.with_name(f"{self._path.name}.1"))
+        else:
+            self._path.unlink(missing_ok=True)
+        self._open()
+
+    def _open(self) -> None:
+        """Open the audit file for appending."""
+        self._file = open(self._path, "ab")
+        self._opened_at = time.monotonic()
+
+
+def _on_event_loop() -> bool:
+    """Return True when called from a thread that is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def create_audit_logger(settings: "Settings") -> AuditLogger:
+    """Build the audit pipeline from the `audit_*` settings."""
+    return AuditLogger(
+        settings.audit_log_path,
+        queue_size=settings.audit_queue_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_seconds=settings.audit_flush_interval_seconds,
+        max_bytes=settings.audit_max_bytes,
+        rotate_interval_seconds=settings.audit_rotate_interval_seconds,
+        backup_count=settings.audit_backup_count,
+        fsync=settings.audit_fsync,
+        overflow=settings.audit_overflow,
+        block_timeout_seconds=settings.audit_block_timeout_seconds,
+    )
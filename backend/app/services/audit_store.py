@@ -0,0 +1,260 @@
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit_events (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    brand TEXT,
+    user TEXT,
+    ip TEXT,
+    reason TEXT,
+    latency_ms REAL
+);
+DROP INDEX IF EXISTS audit_events_user_brand_ts;
+CREATE INDEX IF NOT EXISTS audit_events_user_nocase_brand_ts ON audit_events (user COLLATE NOCASE, brand, ts);
+CREATE INDEX IF NOT EXISTS audit_events_ip_ts ON audit_events (ip, ts);
+CREATE INDEX IF NOT EXISTS audit_events_ts ON audit_events (ts);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+"""
+
+# Pre-JSON format written by logging.basicConfig:
+# "2025-01-31 09:15:02,123 | INFO | user=scott brand=avis ip=10.0.0.1 status=FAILED reason=..."
+_LEGACY_LINE = re.compile(
+    r"^(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}) \| \w+ \| "
+    r"user=(?P<user>\S*) brand=(?P<brand>\S*) ip=(?P<ip>\S*) status=(?P<status>\S+)(?: reason=(?P<reason>.*))?$"
+)
+
+_INSERT_BATCH = 5_000
+
+
+@dataclass(slots=True)
+class AuditEvent:
+    """One audit record as stored in the index."""
+
+    ts: int
+    status: str
+    brand: str | None
+    user: str | None
+    ip: str | None
+    reason: str | None = None
+    latency_ms: float | None = None
+
+
+def parse_audit_line(line: str) -> AuditEvent | None:
+    """Parse a JSON-lines or legacy text audit record; return None if unrecognized."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+            return AuditEvent(
+                ts=to_epoch_ms(datetime.fromisoformat(record["ts"])),
+                status=record["status"],
+                brand=record.get("brand"),
+                user=record.get("user"),
+                ip=record.get("ip"),
+                reason=record.get("reason"),
+                latency_ms=record.get("latency_ms"),
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+    match = _LEGACY_LINE.match(line)
+    if match is None:
+        return None
+    ts = datetime.strptime(match["ts"], "%Y-%m-%d %H:%M:%S,%f").astimezone(timezone.utc)
+    return AuditEvent(
+        ts=to_epoch_ms(ts),
+        status=match["status"],
+        brand=match["brand"],
+        user=match["user"],
+        ip=match["ip"],
+        reason=match["reason"],
+    )
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Convert a datetime (naive values are taken as local time) to epoch milliseconds."""
+    return int(value.timestamp() * 1000)
+
+
+class AuditStore:
+    """SQLite index over the audit stream for fast per-user, per-IP and time-range queries.
+
+    Events are keyed by epoch-millisecond timestamps with composite indexes on
+    (user, brand, ts) and (ip, ts), so the common lookups are index range scans.
+    Usernames match case-insensitively, as unquoted Oracle usernames do; the
+    user index is built with the same NOCASE collation so it still serves them.
+    Ingestion remembers the inode and byte offset of every log it has read and
+    resumes from there; when the log has been rotated, the remainder of the old
+    file is read from its `.1` backup before starting on the new one.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Open (creating if needed) the index database at `path`."""
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def insert(self, events: list[AuditEvent]) -> None:
+        """Insert a batch of events in one transaction."""
+        with self._conn:
+            self._insert(events)
+
+    def _insert(self, events: list[AuditEvent]) -> None:
+        """Insert events inside the caller's transaction."""
+        self._conn.executemany(
+            "INSERT INTO audit_events (ts, status, brand, user, ip, reason, latency_ms) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(e.ts, e.status, e.brand, e.user, e.ip, e.reason, e.latency_ms) for e in events],
+        )
+
+    def ingest(self, log_path: str) -> int:
+        """Index every complete record appended to `log_path` since the last call.
+
+        Returns:
+            The number of events inserted.
+        """
+        path = Path(log_path).resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return 0
+
+        row = self._conn.execute("SELECT inode, offset FROM ingest_state WHERE path = ?", (str(path),)).fetchone()
+        inserted = 0
+        offset = 0
+        if row is not None:
+            inode, offset = row
+            if inode != stat.st_ino:
+                rotated = path.with_name(f"{path.name}.1")
+                if rotated.exists() and rotated.stat().st_ino == inode:
+                    inserted += self._ingest_from(path, rotated, offset)
+                offset = 0
+            elif stat.st_size < offset:
+                offset = 0
+
+        return inserted + self._ingest_from(path, path, offset)
+
+    def _ingest_from(self, log_path: Path, path: Path, offset: int) -> int:
+        """Stream complete lines of `path` from `offset`, recording progress as the state of `log_path`.
+
+        Each batch is inserted in the same transaction that advances the saved
+        inode and offset, so an interrupted ingest resumes after the last
+        committed batch instead of inserting it again.
+
+        Returns:
+            The number of events inserted.
+        """
+        inserted = 0
+        batch: list[AuditEvent] = []
+        with open(path, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                event = parse_audit_line(raw.decode("utf-8", errors="replace"))
+                if event is not None:
+                    batch.append(event)
+                if len(batch) >= _INSERT_BATCH:
+                    self._commit(log_path, inode, offset, batch)
+                    inserted += len(batch)
+                    batch.clear()
+        self._commit(log_path, inode, offset, batch)
+        return inserted + len(batch)
+
+    def _commit(self, log_path: Path, inode: int, offset: int, events: list[AuditEvent]) -> None:
+        """Insert a batch and save how far the log has been read, in one transaction."""
+        with self._conn:
+            if events:
+                self._insert(events)
+            self._conn.execute(
+                "INSERT INTO ingest_state (path, inode, offset) VALUES (?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET inode = excluded.inode, offset = excluded.offset",
+                (str(log_path), inode, offset),
+            )
+
+    def query(
+        self,
+        *,
+        since: int | None = None,
+        until: int | None = None,
+        user: str | None = None,
+        brand: str | None = None,
+        ip: str | None = None,
+        statuses: list[str] | None = None,
+        limit: int = 1000,
+    ) -> list[AuditEvent]:
+        """Return the newest `limit` matching events in timestamp order, newest last."""
+        where, params = _build_filters(since, until, user, brand, ip, statuses)
+        rows = self._conn.execute(
+            f"SELECT ts, status, brand, user, ip, reason, latency_ms FROM audit_events{where} "
+            "ORDER BY ts DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [AuditEvent(*row) for row in reversed(rows)]
+
+    def counts_per_minute(
+        self,
+        *,
+        since: int | None = None,
+        until: int | None = None,
+        user: str | None = None,
+        brand: str | None = None,
+        ip: str | None = None,
+        statuses: list[str] | None = None,
+    ) -> list[tuple[int, str, int]]:
+        """Return (minute start in epoch ms, status, count) rows for matching events."""
+        where, params = _build_filters(since, until, user, brand, ip, statuses)
+        return self._conn.execute(
+            f"SELECT ts / 60000 * 60000 AS minute, status, COUNT(*) FROM audit_events{where} "
+            "GROUP BY minute, status ORDER BY minute, status",
+            params,
+        ).fetchall()
+
+
+def _build_filters(
+    since: int | None,
+    until: int | None,
+    user: str | None,
+    brand: str | None,
+    ip: str | None,
+    statuses: list[str] | None,
+) -> tuple[str, list]:
+    """Build a WHERE clause whose equality terms line up with the composite indexes."""
+    clauses: list[str] = []
+    params: list = []
+    if user is not None:
+        clauses.append("user = ? COLLATE NOCASE")
+        params.append(user)
+    for column, value in (("brand", brand), ("ip", ip)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("ts < ?")
+        params.append(until)
+    if statuses:
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
@@ -0,0 +1,109 @@
+import re
+import tomllib
+from collections.abc import Iterator, Mapping
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.services.bulkhead import DEFAULT_BULKHEAD_LIMITS, BulkheadLimits
+from app.services.password_policy import DEFAULT_POLICY, PasswordPolicy
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+BRAND_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_-]*$")
+
+
+class BrandConfig(BaseModel):
+    """Everything the service needs to know about one brand's database."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    display_name: str
+    dsns: tuple[str, ...] = Field(min_length=1)
+    password_policy: PasswordPolicy = DEFAULT_POLICY
+    bulkhead: BulkheadLimits = DEFAULT_BULKHEAD_LIMITS
+
+
+class BrandRegistry:
+    """Immutable brand-name-to-BrandConfig table, swapped wholesale on reload.
+
+    Readers go through a MappingProxyType that `replace` rebinds in a single
+    assignment, so a lookup sees either the old table or the new one, never a
+    mix. Lookups are one dict probe and allocate nothing.
+    """
+
+    def __init__(self, brands: Mapping[str, BrandConfig]) -> None:
+        self._brands = MappingProxyType(dict(brands))
+
+    def get(self, name: str) -> BrandConfig:
+        """Return a brand's configuration.
+
+        Raises:
+            ValueError: If the brand is not recognized.
+        """
+        brand = self._brands.get(name)
+        if brand is None:
+            raise ValueError(f"Unknown brand: {name}")
+        return brand
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._brands
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._brands)
+
+    def __len__(self) -> int:
+        return len(self._brands)
+
+    def replace(self, brands: Mapping[str, BrandConfig]) -> None:
+        """Atomically swap in a new table."""
+        self._brands = MappingProxyType(dict(brands))
+
+
+def _brands_from_file(path: str) -> dict[str, BrandConfig]:
+    """Read brands from a TOML registry file, one `[brands.<name>]` table each."""
+    with open(path, "rb") as f:
+        document = tomllib.load(f)
+    brands = {}
+    for name, entry in document.get("brands", {}).items():
+        entry = dict(entry)
+        if "dsn" in entry:
+            entry["dsns"] = [entry.pop("dsn")]
+        entry.setdefault("display_name", name.title())
+        brands[name] = BrandConfig(name=name, **entry)
+    return brands
+
+
+def _brands_from_settings(settings: "Settings") -> dict[str, BrandConfig]:
+    """Build the avis/budget registry from the ORACLE_DSN_<BRAND> settings and their overrides."""
+    brands = {}
+    for name, dsn in (("avis", settings.oracle_dsn_avis), ("budget", settings.oracle_dsn_budget)):
+        brands[name] = BrandConfig(
+            name=name,
+            display_name=name.title(),
+            dsns=settings.oracle_dsns.get(name) or [dsn],
+            password_policy=settings.password_policy.get(name, DEFAULT_POLICY),
+            bulkhead=settings.bulkheads.get(name, DEFAULT_BULKHEAD_LIMITS),
+        )
+    return brands
+
+
+def load_brands(settings: "Settings") -> Mapping[str, BrandConfig]:
+    """Load brand configurations from BRANDS_FILE, or from the legacy per-brand settings.
+
+    Raises:
+        ValueError: If a brand name is not a lowercase identifier or no brand is configured.
+    """
+    if settings.brands_file:
+        brands = _brands_from_file(settings.brands_file)
+    else:
+        brands = _brands_from_settings(settings)
+    for name in brands:
+        if not BRAND_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid brand name: {name!r}")
+    if not brands:
+        raise ValueError("No brands configured")
+    return MappingProxyType(brands)
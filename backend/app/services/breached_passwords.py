@@ -0,0 +1,191 @@
+import hashlib
+import math
+import mmap
+import os
+import random
+import struct
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+MAGIC = b"PWCUCKO1"
+# magic, number of buckets, number of entries
+HEADER = struct.Struct("<8sQQ")
+_DATA_OFFSET = HEADER.size
+
+SLOTS_PER_BUCKET = 4
+# A digest's first 8 bytes pick its bucket; the next 4 are its fingerprint.
+KEY = struct.Struct("<QI")
+BUCKET = struct.Struct(f"<{SLOTS_PER_BUCKET}I")
+# Cuckoo filters with 4-slot buckets fill reliably to ~95%; size for 90% at capacity.
+LOAD_FACTOR = 0.9
+MAX_KICKS = 500
+
+BREACHED_PASSWORD_MESSAGE = "This password has appeared in a data breach. Choose a different password."
+
+
+class BreachedPasswordError(ValueError):
+    """Raised when a new password is found in the breached-password filter."""
+
+
+def filter_buckets(capacity: int) -> int:
+    """Number of buckets needed to hold `capacity` entries at LOAD_FACTOR."""
+    return max(1, math.ceil(capacity / (SLOTS_PER_BUCKET * LOAD_FACTOR)))
+
+
+def _locate(digest: bytes, num_buckets: int) -> tuple[int, int]:
+    """Return (fingerprint, bucket) for a SHA-1 digest; 0 marks an empty slot."""
+    hashed, fingerprint = KEY.unpack_from(digest)
+    return fingerprint or 1, hashed % num_buckets
+
+
+def _alternate(fingerprint: int, bucket: int, num_buckets: int) -> int:
+    """The fingerprint's other bucket.
+
+    (h(fingerprint) - bucket) mod n is an involution, so either bucket can be
+    computed from the other while entries are relocated during a build.
+    """
+    return (fingerprint * 0x5BD1E995 - bucket) % num_buckets
+
+
+class CuckooFilterBuilder:
+    """Writes a cuckoo filter of SHA-1 password digests straight into a file.
+
+    Each entry is a 32-bit fingerprint stored in one of two 4-slot buckets.
+    The table lives in a writable mmap of the output file rather than in
+    process memory, so building a filter for hundreds of millions of entries
+    needs only as much RAM as the page cache is willing to lend. The file is
+    written under a temporary name and renamed into place by `close()`, so
+    workers never open a half-built filter.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self._path = path
+        self._tmp_path = f"{path}.tmp"
+        self._num_buckets = filter_buckets(capacity)
+        self._count = 0
+        self._duplicates = 0
+        self._random = random.Random(0)
+        size = _DATA_OFFSET + self._num_buckets * BUCKET.size
+        with open(self._tmp_path, "wb") as f:
+            f.truncate(size)
+        self._file = open(self._tmp_path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    @property
+    def duplicates(self) -> int:
+        """Number of digests skipped because they were already present."""
+        return self._duplicates
+
+    def _bucket_offset(self, bucket: int) -> int:
+        return _DATA_OFFSET + bucket * BUCKET.size
+
+    def _place(self, fingerprint: int, bucket: int) -> bool:
+        """Store the fingerprint in a free slot of `bucket`; False if the bucket is full."""
+        offset = self._bucket_offset(bucket)
+        slots = list(BUCKET.unpack_from(self._map, offset))
+        if 0 not in slots:
+            return False
+        slots[slots.index(0)] = fingerprint
+        BUCKET.pack_into(self._map, offset, *slots)
+        return True
+
+    def add_digest(self, digest: bytes) -> None:
+        """Add a 20-byte SHA-1 digest.
+
+        Raises:
+            ValueError: If no slot can be freed, i.e. the capacity was too small.
+        """
+        fingerprint, first = _locate(digest, self._num_buckets)
+        second = _alternate(fingerprint, first, self._num_buckets)
+        for bucket in (first, second):
+            if fingerprint in BUCKET.unpack_from(self._map, self._bucket_offset(bucket)):
+                self._duplicates += 1
+                return
+        if self._place(fingerprint, first) or self._place(fingerprint, second):
+            self._count += 1
+            return
+        bucket = self._random.choice((first, second))
+        for _ in range(MAX_KICKS):
+            offset = self._bucket_offset(bucket)
+            slots = list(BUCKET.unpack_from(self._map, offset))
+            victim = self._random.randrange(SLOTS_PER_BUCKET)
+            slots[victim], fingerprint = fingerprint, slots[victim]
+            BUCKET.pack_into(self._map, offset, *slots)
+            bucket = _alternate(fingerprint, bucket, self._num_buckets)
+            if self._place(fingerprint, bucket):
+                self._count += 1
+                return
+        raise ValueError(f"Filter is full after {self._count} entries; rebuild with a larger capacity")
+
+    def add_password(self, password: str) -> None:
+        """Add a plaintext password (e.g. from a banned-words list)."""
+        self.add_digest(hashlib.sha1(password.encode()).digest())
+
+    def discard(self) -> None:
+        """Abandon the build and remove the temporary file."""
+        self._map.close()
+        self._file.close()
+        os.unlink(self._tmp_path)
+
+    def close(self) -> int:
+        """Write the header, flush, and atomically publish the filter. Returns the entry count."""
+        self._map[:_DATA_OFFSET] = HEADER.pack(MAGIC, self._num_buckets, self._count)
+        self._map.flush()
+        self._map.close()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self._path)
+        return self._count
+
+
+class BreachedPasswordFilter:
+    """Read-only, memory-mapped view of a filter built by `CuckooFilterBuilder`.
+
+    Every worker maps the same file, so the table is held once in the shared
+    page cache instead of once per process, and a lookup touches at most two
+    16-byte buckets. Listed passwords are never reported clean; an unlisted
+    password is flagged with probability of roughly 2e-9.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._num_buckets, self._count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or len(self._map) != _DATA_OFFSET + self._num_buckets * BUCKET.size:
+            self._map.close()
+            raise ValueError(f"Not a breached-password filter: {path}")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """Return True if a 20-byte SHA-1 digest is (probably) in the filter."""
+        # _locate and _alternate inlined: this runs on every reset request.
+        num_buckets = self._num_buckets
+        hashed, fingerprint = KEY.unpack_from(digest)
+        fingerprint = fingerprint or 1
+        first = hashed % num_buckets
+        if fingerprint in BUCKET.unpack_from(self._map, _DATA_OFFSET + first * BUCKET.size):
+            return True
+        second = (fingerprint * 0x5BD1E995 - first) % num_buckets
+        return fingerprint in BUCKET.unpack_from(self._map, _DATA_OFFSET + second * BUCKET.size)
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(hashlib.sha1(password.encode()).digest())
+
+    def ensure_not_breached(self, password: str) -> None:
+        """Raise BreachedPasswordError if `password` is in the filter."""
+        if password in self:
+            raise BreachedPasswordError(BREACHED_PASSWORD_MESSAGE)
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def create_breached_password_filter(settings: "Settings") -> BreachedPasswordFilter | None:
+    """Open the configured filter, or return None when breach checking is disabled."""
+    if not settings.breached_password_filter_path:
+        return None
+    return BreachedPasswordFilter(settings.breached_password_filter_path)
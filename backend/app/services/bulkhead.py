@@ -0,0 +1,92 @@
+import asyncio
+import math
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, TypeVar
+
+from pydantic import BaseModel, ConfigDict
+
+from app.services.timing import span
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+T = TypeVar("T")
+
+
+class BulkheadFullError(Exception):
+    """Raised when a brand's logon queue is full or a queued request's deadline passes."""
+
+    def __init__(self, brand: str, retry_after: int) -> None:
+        super().__init__(f"The {brand} database is busy. Please try again shortly.")
+        self.brand = brand
+        self.retry_after = retry_after
+
+
+class BulkheadLimits(BaseModel):
+    """Admission limits for one brand's Oracle logons."""
+
+    model_config = ConfigDict(frozen=True)
+
+    max_concurrent: int = 20
+    max_queue: int = 100
+    queue_timeout_seconds: float = 5.0
+
+
+DEFAULT_BULKHEAD_LIMITS = BulkheadLimits()
+
+
+class Bulkhead:
+    """Caps one brand's concurrent Oracle logons and bounds the queue behind them.
+
+    At most `max_concurrent` calls run at once, which also caps the sessions a
+    logon storm can open against the brand's listener. Up to `max_queue`
+    further calls wait their turn; each gives up after `queue_timeout_seconds`.
+    A call that finds the queue full, or whose wait times out, raises
+    BulkheadFullError straight away. Brands get separate bulkheads, so a slow
+    database only ever holds up its own requests.
+    """
+
+    def __init__(self, brand: str, limits: BulkheadLimits) -> None:
+        self.brand = brand
+        self.limits = limits
+        self._semaphore = asyncio.Semaphore(limits.max_concurrent)
+        self._active = 0
+        self._waiting = 0
+
+    def snapshot(self) -> dict:
+        """Current occupancy, for /healthz."""
+        return {"active": self._active, "waiting": self._waiting, **self.limits.model_dump()}
+
+    def _busy(self) -> BulkheadFullError:
+        return BulkheadFullError(self.brand, max(1, math.ceil(self.limits.queue_timeout_seconds)))
+
+    async def run(self, fn: Callable[..., Awaitable[T]], *args) -> T:
+        """Await `fn(*args)` once a slot is free.
+
+        Raises:
+            BulkheadFullError: If the queue is full or the deadline passes first.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.limits.max_queue:
+                raise self._busy()
+            self._waiting += 1
+            try:
+                with span("queue"):
+                    await asyncio.wait_for(self._semaphore.acquire(), self.limits.queue_timeout_seconds)
+            except TimeoutError:
+                raise self._busy() from None
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self._active += 1
+        try:
+            return await fn(*args)
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+
+def create_bulkheads(settings: "Settings") -> dict[str, Bulkhead]:
+    """One bulkhead per configured brand, sized from its registry entry."""
+    return {brand: Bulkhead(brand, config.bulkhead) for brand, config in settings.brand_configs.items()}
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Literal, TypeVar
+
+from app.services.connect_params import ConnectParamsCache
+from app.services.oracle import OracleServiceError
+
+T = TypeVar("T")
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(ValueError):
+    """Raised instead of attempting a logon while a brand's circuit is open."""
+
+
+class CircuitBreaker:
+    """Fail-fast guard around one brand's Oracle logons.
+
+    The circuit opens after `failure_threshold` consecutive transient failures
+    (listener/network errors, see OracleServiceError.transient). While open,
+    calls raise CircuitOpenError without touching the network. A background
+    listener probe (`run_probes`) moves an open circuit to half-open once the
+    listener accepts TCP connections again; the next real logon is then let
+    through as a trial and closes the circuit on success or reopens it on a
+    transient failure. Errors such as ORA-1017 prove the database answered and
+    count as successes.
+    """
+
+    def __init__(self, brand: str, failure_threshold: int = 5) -> None:
+        """Create a closed circuit for `brand`."""
+        self.brand = brand
+        self._failure_threshold = failure_threshold
+        self._state: CircuitState = "closed"
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+        self._opened_at: float | None = None
+        self._last_probe_ok: bool | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        """Current circuit state."""
+        return self._state
+
+    def snapshot(self) -> dict:
+        """Cached health view of this circuit; never touches the network."""
+        return {
+            "state": self._state,
+            "consecutive_failures": self._consecutive_failures,
+            "open_for_seconds": round(time.monotonic() - self._opened_at, 1) if self._opened_at else None,
+            "last_probe_ok": self._last_probe_ok,
+        }
+
+    def ensure_available(self) -> None:
+        """Raise CircuitOpenError if a call would currently be rejected."""
+        if self._state == "open" or (self._state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError(
+                f"The {self.brand} database is temporarily unavailable. Please try again in a few minutes."
+            )
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args) -> T:
+        """Await `fn(*args)` through the breaker, recording its outcome."""
+        self.ensure_available()
+        trial = self._state == "half_open"
+        if trial:
+            self._trial_in_flight = True
+        try:
+            result = await fn(*args)
+        except OracleServiceError as e:
+            if e.transient:
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        finally:
+            if trial:
+                self._trial_in_flight = False
+        self.record_success()
+        return result
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failure count."""
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold or on a failed trial."""
+        self._consecutive_failures += 1
+        if self._state == "half_open" or self._consecutive_failures >= self._failure_threshold:
+            if self._state != "open":
+                self._opened_at = time.monotonic()
+            self._state = "open"
+
+    def record_probe(self, ok: bool) -> None:
+        """Store a probe result; a successful probe half-opens an open circuit."""
+        self._last_probe_ok = ok
+        if ok and self._state == "open":
+            self._state = "half_open"
+
+
+async def probe_listener(host: str, port: int, timeout: float) -> bool:
+    """Return True if a TCP connection to the listener succeeds within `timeout`."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def run_probes(
+    breakers: Mapping[str, CircuitBreaker],
+    connect_params: ConnectParamsCache,
+    interval_seconds: float,
+    timeout_seconds: float,
+) -> None:
+    """Probe the listeners of every open circuit each `interval_seconds` until cancelled.
+
+    A circuit half-opens as soon as any one of the brand's addresses answers.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        # Copy: a brand-registry reload may add breakers while a probe is awaited.
+        for brand, breaker in list(breakers.items()):
+            if breaker.state != "open":
+                continue
+            ok = False
+            for params in connect_params.targets(brand):
+                if await probe_listener(params.host, params.port, timeout_seconds):
+                    ok = True
+                    break
+            breaker.record_probe(ok)
@@ -0,0 +1,71 @@
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+import oracledb
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+
+def build_connect_params(settings: "Settings", dsn: str) -> oracledb.ConnectParams:
+    """Parse a DSN once into ConnectParams carrying the connection settings.
+
+    tnsnames aliases are resolved against `oracle_config_dir` here, so the
+    per-request connect does not read tnsnames.ora or re-parse the DSN.
+    """
+    wallet_password = settings.oracle_wallet_password
+    params = oracledb.ConnectParams(
+        tcp_connect_timeout=settings.oracle_tcp_connect_timeout,
+        retry_count=settings.oracle_retry_count,
+        retry_delay=settings.oracle_retry_delay,
+        config_dir=settings.oracle_config_dir,
+        wallet_location=settings.oracle_wallet_location,
+        wallet_password=wallet_password.get_secret_value() if wallet_password else None,
+    )
+    params.parse_connect_string(dsn)
+    return params
+
+
+class ConnectParamsCache:
+    """Prebuilt oracledb.ConnectParams for each of a brand's addresses.
+
+    The table is built eagerly from the settings and replaced wholesale by
+    `reload`, so lookups never see a half-built configuration. oracledb copies
+    the params on every connect, so sharing one instance between concurrent
+    logons is safe.
+    """
+
+    def __init__(self, settings: "Settings") -> None:
+        """Build connect parameters for every configured brand."""
+        self._params = self._build(settings)
+
+    def get(self, brand: str) -> oracledb.ConnectParams:
+        """Return the cached connect parameters for a brand's primary address.
+
+        Raises:
+            ValueError: If the brand is not recognized.
+        """
+        return self.targets(brand)[0]
+
+    def targets(self, brand: str) -> tuple[oracledb.ConnectParams, ...]:
+        """Return the cached connect parameters for all of a brand's addresses, in failover order.
+
+        Raises:
+            ValueError: If the brand is not recognized.
+        """
+        targets = self._params.get(brand)
+        if targets is None:
+            raise ValueError(f"Unknown brand: {brand}")
+        return targets
+
+    def reload(self, settings: "Settings") -> None:
+        """Invalidate the cache by rebuilding it from new settings."""
+        self._params = self._build(settings)
+
+    @staticmethod
+    def _build(settings: "Settings") -> MappingProxyType:
+        """Parse every brand's DSNs into an immutable brand-to-params mapping."""
+        return MappingProxyType({
+            brand: tuple(build_connect_params(settings, dsn) for dsn in config.dsns)
+            for brand, config in settings.brand_configs.items()
+        })
@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+import random
+from collections.abc import Awaitable, Callable, Sequence
+from typing import TYPE_CHECKING, TypeVar
+
+from app.services.oracle import OracleServiceError, OracleTarget
+from app.services.timing import span
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+T = TypeVar("T")
+
+
+class Failover:
+    """Bounded, jittered retries of one logon across a brand's addresses.
+
+    A failed attempt moves straight on to the brand's next address; once every
+    address has been tried the next pass waits a "full jitter" backoff
+    (uniform in [0, min(max, base * 2**pass)]). At most `attempts` logons are
+    made in total. Idempotent logons (verify) are retried on any transient
+    error. A `newpassword` logon is retried only on connect-phase errors,
+    because after ORA-03113 and the like the change may already have been
+    committed, and a retry would then fail as a wrong current password.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff_seconds: float = 0.2,
+        backoff_max_seconds: float = 2.0,
+        load_balance: bool = False,
+    ) -> None:
+        self._attempts = max(1, attempts)
+        self._backoff_seconds = backoff_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self._load_balance = load_balance
+        self._rotation = itertools.count()
+
+    def backoff(self, completed_passes: int) -> float:
+        """Seconds to wait before starting pass number `completed_passes` (1-based)."""
+        ceiling = min(self._backoff_max_seconds, self._backoff_seconds * 2 ** (completed_passes - 1))
+        return random.uniform(0, ceiling)
+
+    async def call(
+        self, targets: Sequence[OracleTarget], logon: Callable[..., Awaitable[T]], idempotent: bool, *args
+    ) -> T:
+        """Await `logon(*args, target)`, failing over and retrying as the error allows.
+
+        Raises:
+            OracleServiceError: The last attempt's error, or the first one that is not retryable.
+        """
+        first = next(self._rotation) % len(targets) if self._load_balance else 0
+        for attempt in range(self._attempts):
+            if attempt and attempt % len(targets) == 0:
+                with span("backoff"):
+                    await asyncio.sleep(self.backoff(attempt // len(targets)))
+            try:
+                return await logon(*args, targets[(first + attempt) % len(targets)])
+            except OracleServiceError as e:
+                retryable = e.transient if idempotent else e.connect_phase
+                if not retryable or attempt == self._attempts - 1:
+                    raise
+
+
+def create_failover(settings: "Settings") -> Failover:
+    """Build the logon retry policy from settings."""
+    return Failover(
+        attempts=settings.oracle_failover_attempts,
+        backoff_seconds=settings.oracle_failover_backoff_seconds,
+        backoff_max_seconds=settings.oracle_failover_backoff_max_seconds,
+        load_balance=settings.oracle_load_balance,
+    )
@@ -0,0 +1,151 @@
+import hashlib
+import math
+import time
+from array import array
+from secrets import token_bytes
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+# Rescale stored counters before the running weight overflows a double.
+_MAX_SCALE = 1e150
+
+
+class FailureLimitExceeded(ValueError):
+    """Raised before contacting Oracle when a username or IP has failed too often."""
+
+
+class DecayingCountMinSketch:
+    """Fixed-memory approximate counters whose contributions decay exponentially.
+
+    A count-min sketch of `depth` rows by `width` float counters: adding a key
+    bumps one counter per row and the estimate is the row minimum, so memory
+    stays `depth * width` doubles however many distinct keys are seen, and
+    estimates can only overcount. Decay is applied lazily: each hit is added
+    with weight `exp(t / tau)` and estimates divide by the current weight, so no
+    periodic pass over the table is needed except a rare rescale.
+    """
+
+    def __init__(self, width: int, depth: int, half_life_seconds: float) -> None:
+        """Allocate a zeroed sketch; hash salt is random per process."""
+        self._width = width
+        self._depth = depth
+        self._rate = math.log(2) / half_life_seconds
+        self._counters = array("d", bytes(8 * width * depth))
+        self._salt = token_bytes(16)
+        self._epoch = time.monotonic()
+        self._lock = Lock()
+
+    def add(self, key: str, now: float | None = None) -> None:
+        """Record one occurrence of `key`."""
+        weight = self._weight(now)
+        with self._lock:
+            if weight > _MAX_SCALE:
+                self._rescale_locked(now)
+                weight = self._weight(now)
+            for index in self._indexes(key):
+                self._counters[index] += weight
+
+    def estimate(self, key: str, now: float | None = None) -> float:
+        """Return the decayed count for `key` (never an undercount)."""
+        weight = self._weight(now)
+        return min(self._counters[index] for index in self._indexes(key)) / weight
+
+    def clear(self) -> None:
+        """Zero every counter."""
+        with self._lock:
+            self._counters = array("d", bytes(8 * self._width * self._depth))
+            self._epoch = time.monotonic()
+
+    def _weight(self, now: float | None) -> float:
+        """Weight of a hit at `now` relative to the current epoch."""
+        now = time.monotonic() if now is None else now
+        # Capped so a long idle spell reads as "fully decayed" instead of overflowing.
+        return math.exp(min(self._rate * (now - self._epoch), 700.0))
+
+    def _rescale_locked(self, now: float | None) -> None:
+        """Move the epoch to `now`, dividing every counter by the old weight."""
+        weight = self._weight(now)
+        for index in range(len(self._counters)):
+            self._counters[index] /= weight
+        self._epoch = time.monotonic() if now is None else now
+
+    def _indexes(self, key: str) -> list[int]:
+        """One counter index per row, from a salted BLAKE2b digest of the key."""
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self._depth, key=self._salt).digest()
+        width = self._width
+        return [
+            row * width + int.from_bytes(digest[8 * row: 8 * row + 8], "little") % width
+            for row in range(self._depth)
+        ]
+
+
+class FailureTracker:
+    """Sheds logons for usernames and IPs with many recent ORA-1017 failures.
+
+    Thresholds should sit below the database profile's FAILED_LOGIN_ATTEMPTS
+    so the service stops sending doomed logons before Oracle locks the account
+    (ORA-28000). A threshold of 0 disables that check.
+    """
+
+    def __init__(
+        self,
+        user_threshold: float,
+        ip_threshold: float,
+        half_life_seconds: float,
+        width: int = 8192,
+        depth: int = 4,
+    ) -> None:
+        """Create trackers sharing one sketch for user and IP keys."""
+        self._user_threshold = user_threshold
+        self._ip_threshold = ip_threshold
+        self._sketch = DecayingCountMinSketch(width, depth, half_life_seconds)
+
+    def check(self, username: str, brand: str, ip: str) -> None:
+        """Raise FailureLimitExceeded if the user or IP is over its threshold."""
+        if self._user_threshold and self._over(_user_key(username, brand), self._user_threshold):
+            raise FailureLimitExceeded(
+                "Too many failed attempts for this account. Please wait a few minutes before trying again."
+            )
+        if self._ip_threshold and self._over(_ip_key(ip), self._ip_threshold):
+            raise FailureLimitExceeded("Too many failed attempts. Please wait a few minutes before trying again.")
+
+    def record_failure(self, username: str, brand: str, ip: str) -> None:
+        """Count one failed logon against the user and the IP."""
+        self._sketch.add(_user_key(username, brand))
+        self._sketch.add(_ip_key(ip))
+
+    def reset(self) -> None:
+        """Forget every recorded failure."""
+        self._sketch.clear()
+
+    def _over(self, key: str, threshold: float) -> bool:
+        """Compare a decayed count with its threshold.
+
+        The decayed estimate is rounded to whole failures, so N failures
+        recorded a moment ago count as N rather than slightly less than N.
+        """
+        return round(self._sketch.estimate(key)) >= threshold
+
+
+def _user_key(username: str, brand: str) -> str:
+    """Sketch key for an account; unquoted Oracle usernames are case-insensitive."""
+    return f"u|{brand}|{username.upper()}"
+
+
+def _ip_key(ip: str) -> str:
+    """Sketch key for a client address."""
+    return f"i|{ip}"
+
+
+def create_failure_tracker(settings: "Settings") -> FailureTracker:
+    """Build the failure tracker from the `failure_*` settings."""
+    return FailureTracker(
+        user_threshold=settings.failure_threshold_user,
+        ip_threshold=settings.failure_threshold_ip,
+        half_life_seconds=settings.failure_half_life_seconds,
+        width=settings.failure_sketch_width,
+        depth=settings.failure_sketch_depth,
+    )
@@ -0,0 +1,248 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Logon and request latencies sit between a few milliseconds (a local listener
+# rejecting a bad password) and the connect timeout.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+class _Metric(ABC):
+    """Name, help text, label names, pre-registered series and per-thread value tables.
+
+    Each thread records into its own dict of label values to value, so the hot
+    path takes no lock. A thread registers its dict once, under a lock; scrapes
+    copy every dict (a single C-level call, atomic under the GIL) and merge the
+    copies. Dicts of finished threads stay registered so their counts survive.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._registered: set[LabelValues] = set()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: list[dict] = []
+
+    def _new_shard(self) -> dict:
+        """Create and register the calling thread's value table."""
+        values = self._local.values = {}
+        with self._lock:
+            self._shards.append(values)
+        return values
+
+    def _snapshots(self) -> list[dict]:
+        """A copy of every thread's value table."""
+        with self._lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+    def preregister(self, *labelvalues: str) -> None:
+        """Export a series at zero before its first event, so rates are defined from the start."""
+        self._check_labels(labelvalues)
+        self._registered.add(labelvalues)
+
+    def _check_labels(self, labelvalues: LabelValues) -> None:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labelvalues}")
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+
+    def _labels(self, labelvalues: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Exposition lines for this metric: HELP, TYPE, then one line per series."""
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    type_name = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        """Add `amount` to the series for `labelvalues`; label values are positional, in `labelnames` order."""
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._new_shard()
+        values[labelvalues] = values.get(labelvalues, 0) + amount
+
+    def values(self) -> dict[LabelValues, float]:
+        """Current totals, summed over all threads."""
+        totals = dict.fromkeys(self._registered, 0)
+        for shard in self._snapshots():
+            for labelvalues, value in shard.items():
+                totals[labelvalues] = totals.get(labelvalues, 0) + value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{self._labels(labelvalues)} {_format(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Fixed-bucket latency distribution per label set.
+
+    Each series is a list of per-bucket counts with the running sum in the
+    last slot; buckets are cumulated only when rendered. A scrape racing a
+    recording thread can see the sum one observation ahead of the counts,
+    which Prometheus tolerates.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        if list(buckets) != sorted(buckets) or not buckets:
+            raise ValueError(f"{name} buckets must be a non-empty increasing sequence")
+        self.buckets = tuple(float(bound) for bound in buckets)
+        # One count per finite bucket, one for +Inf, then the sum.
+        self._width = len(self.buckets) + 2
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        """Record `value` in the series for `labelvalues`."""
+        try:
+            values = self._local.values
+        except AttributeError:
+            values = self._new_shard()
+        series = values.get(labelvalues)
+        if series is None:
+            series = values[labelvalues] = [0] * self._width
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def values(self) -> dict[LabelValues, list[float]]:
+        """Per-bucket counts followed by the sum, summed over all threads."""
+        totals = {labelvalues: [0] * self._width for labelvalues in self._registered}
+        for shard in self._snapshots():
+            for labelvalues, series in shard.items():
+                merged = totals.setdefault(labelvalues, [0] * self._width)
+                for i, value in enumerate(list(series)):
+                    merged[i] += value
+        return totals
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        bounds = [*(_format(bound) for bound in self.buckets), "+Inf"]
+        for labelvalues, series in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{self._labels(labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labelvalues)} {_format(series[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labelvalues)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time values read from the application at scrape time.
+
+    Nothing is recorded on the hot path; `collect` returns the current value
+    for each label set when /metrics is requested.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str],
+        collect: Callable[[], dict[LabelValues, float]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labelvalues, value in sorted(self._collect().items()):
+            lines.append(f"{self.name}{self._labels(labelvalues)} {_format(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics created up front, rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str],
+        collect: Callable[[], dict[LabelValues, float]],
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, collect))
+
+    def render(self) -> str:
+        """Every metric in exposition format 0.0.4."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def error_code_label(code: int | None, full_code: str | None) -> str:
+    """Label value for a driver error: ORA-01017, DPY-6005 or "unknown"."""
+    if code is not None:
+        return f"ORA-{code:05d}"
+    return full_code or "unknown"
+
+
+def _format(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
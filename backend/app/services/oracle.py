@@ -1,13 +1,94 @@
 import oracledb
 
+from app.services.timing import span
+
+ORA_INVALID_CREDENTIALS = 1017
+
 ORA_ERROR_MESSAGES = {
     1017: "Invalid username or current password.",
     28003: "New password does not meet database complexity requirements.",
     28007: "Password cannot be reused.",
 }
 
+# Listener/network failures that say nothing about the credentials and are
+# worth failing fast on while the database is unreachable.
+TRANSIENT_ORA_CODES = frozenset({
+    3113,   # end-of-file on communication channel
+    3135,   # connection lost contact
+    12170,  # connect timeout occurred
+    12514,  # listener does not currently know of service
+    12516,  # listener could not find available handler
+    12519,  # no appropriate service handler found
+    12520,  # listener could not find handler for server type
+    12528,  # listener: all appropriate instances are blocking new connections
+    12537,  # TNS: connection closed
+    12541,  # no listener
+    12543,  # destination host unreachable
+    12545,  # target host or object does not exist
+    12547,  # lost contact
+})
+
+# Thin-mode driver errors raised before any Oracle error code is available.
+TRANSIENT_DRIVER_CODES = frozenset({
+    "DPY-4011",  # database or network closed the connection
+    "DPY-6000",  # listener refused connection
+    "DPY-6005",  # cannot connect to database
+})
+
+
+# Failures raised before the server authenticated the session. Nothing can
+# have been committed, so even a `newpassword` logon is safe to retry; the
+# other transient errors can strike after the password change went through.
+CONNECT_PHASE_ORA_CODES = frozenset({12170, 12514, 12516, 12519, 12520, 12528, 12541, 12543, 12545})
+CONNECT_PHASE_DRIVER_CODES = frozenset({"DPY-6000", "DPY-6005"})
+
+TRANSIENT_ERROR_MESSAGE = "The database could not be reached. Please try again in a few minutes."
+
+
+class OracleServiceError(ValueError):
+    """User-facing Oracle failure that keeps the driver's error code for classification."""
+
+    def __init__(self, message: str, code: int | None = None, full_code: str | None = None) -> None:
+        super().__init__(message)
+        self.code = code
+        self.full_code = full_code
+
+    @property
+    def transient(self) -> bool:
+        """True when the failure points at the listener or network, not the request."""
+        return self.code in TRANSIENT_ORA_CODES or self.full_code in TRANSIENT_DRIVER_CODES
+
+    @property
+    def connect_phase(self) -> bool:
+        """True when the logon failed before authentication, so no change can have been committed."""
+        return self.code in CONNECT_PHASE_ORA_CODES or self.full_code in CONNECT_PHASE_DRIVER_CODES
 
-def reset_password(username: str, current_password: str, new_password: str, dsn: str) -> str:
+
+# A DSN string, or ConnectParams prebuilt once per brand by ConnectParamsCache.
+OracleTarget = str | oracledb.ConnectParams
+
+
+def _target(dsn: OracleTarget) -> dict:
+    """Return the connect keyword for a DSN string or prebuilt ConnectParams."""
+    if isinstance(dsn, oracledb.ConnectParams):
+        return {"params": dsn}
+    return {"dsn": dsn}
+
+
+def _map_database_error(e: oracledb.DatabaseError) -> OracleServiceError:
+    """Translate an Oracle driver error into an OracleServiceError with a user-friendly message."""
+    error = e.args[0] if e.args else None
+    code = getattr(error, "code", None)
+    full_code = getattr(error, "full_code", None)
+    full_code = full_code if isinstance(full_code, str) else None
+    if code in TRANSIENT_ORA_CODES or full_code in TRANSIENT_DRIVER_CODES:
+        message = TRANSIENT_ERROR_MESSAGE
+    else:
+        message = ORA_ERROR_MESSAGES.get(code, "An unexpected database error occurred. Please contact the DBA.")
+    return OracleServiceError(message, code, full_code)
+
+
+def reset_password(username: str, current_password: str, new_password: str, dsn: OracleTarget) -> str:
     """Connect as the user with their current password and change it to the new one.
 
     Oracle handles the password change natively via the `newpassword` parameter
@@ -18,7 +99,7 @@ def reset_password(username: str, current_password: str, new_password: str, dsn:
         username: The Oracle database username.
         current_password: The user's current password.
         new_password: The desired new password.
-        dsn: The Oracle DSN connection string for the target database.
+        dsn: The Oracle DSN connection string, or prebuilt ConnectParams, for the target database.
 
     Returns:
         A success message string.
@@ -27,29 +108,28 @@ def reset_password(username: str, current_password: str, new_password: str, dsn:
         ValueError: With a user-friendly message if the operation fails.
     """
     try:
-        with oracledb.connect(
-            user=username,
-            password=current_password,
-            dsn=dsn,
-            newpassword=new_password,
-        ):
+        with span("connect"):
+            connection = oracledb.connect(
+                user=username,
+                password=current_password,
+                **_target(dsn),
+                newpassword=new_password,
+            )
+        with span("close"), connection:
             pass
         return "Password changed successfully."
 
     except oracledb.DatabaseError as e:
-        error = e.args[0] if e.args else None
-        code = getattr(error, "code", None)
-        message = ORA_ERROR_MESSAGES.get(code, "An unexpected database error occurred. Please contact the DBA.")
-        raise ValueError(message) from e
+        raise _map_database_error(e) from e
 
 
-def verify_credentials(username: str, current_password: str, dsn: str) -> str:
+def verify_credentials(username: str, current_password: str, dsn: OracleTarget) -> str:
     """Verify the provided Oracle credentials by attempting a connection.
 
     Args:
         username: The Oracle database username.
         current_password: The user's current password.
-        dsn: The Oracle DSN connection string for the target database.
+        dsn: The Oracle DSN connection string, or prebuilt ConnectParams, for the target database.
 
     Returns:
         A success message string.
@@ -58,16 +138,61 @@ def verify_credentials(username: str, current_password: str, dsn: str) -> str:
         ValueError: With a user-friendly message if verification fails.
     """
     try:
-        with oracledb.connect(
-            user=username,
-            password=current_password,
-            dsn=dsn,
-        ):
+        with span("connect"):
+            connection = oracledb.connect(
+                user=username,
+                password=current_password,
+                **_target(dsn),
+            )
+        with span("close"), connection:
             pass
         return "Credentials verified."
 
     except oracledb.DatabaseError as e:
-        error = e.args[0] if e.args else None
-        code = getattr(error, "code", None)
-        message = ORA_ERROR_MESSAGES.get(code, "An unexpected database error occurred. Please contact the DBA.")
-        raise ValueError(message) from e
+        raise _map_database_error(e) from e
+
+
+async def reset_password_async(username: str, current_password: str, new_password: str, dsn: OracleTarget) -> str:
+    """Asyncio variant of `reset_password` built on thin mode's `connect_async`.
+
+    The logon runs on the event loop instead of a worker thread, so the number
+    of in-flight password changes is not bounded by Starlette's threadpool.
+
+    Raises:
+        ValueError: With a user-friendly message if the operation fails.
+    """
+    try:
+        with span("connect"):
+            connection = await oracledb.connect_async(
+                user=username,
+                password=current_password,
+                **_target(dsn),
+                newpassword=new_password,
+            )
+        with span("close"):
+            await connection.close()
+        return "Password changed successfully."
+
+    except oracledb.DatabaseError as e:
+        raise _map_database_error(e) from e
+
+
+async def verify_credentials_async(username: str, current_password: str, dsn: OracleTarget) -> str:
+    """Asyncio variant of `verify_credentials` built on thin mode's `connect_async`.
+
+    Raises:
+        ValueError: With a user-friendly message if verification fails.
+    """
+    try:
+        with span("connect"):
+            connection = await oracledb.connect_async(
+                user=username,
+                password=current_password,
+                **_target(dsn),
+            )
+        with span("close"):
+            await connection.close()
+        return "Credentials verified."
+
+    except oracledb.DatabaseError as e:
+        raise _map_database_error(e) from e
@@ -0,0 +1,157 @@
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, model_validator
+
+SPECIAL_CHARACTERS = frozenset("!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~ ")
+
+
+class PasswordPolicy(BaseModel):
+    """Password rules checked locally before a reset is sent to Oracle.
+
+    The presets mirror Oracle's verify functions: `ora12c` is
+    ora12c_verify_function and `ora12c_strong` is
+    ora12c_strong_verify_function. A policy may be given as a preset name, as
+    explicit fields, or as a preset plus overrides (`{"preset": "ora12c",
+    "min_length": 12}`). The default only enforces the 8-character minimum the
+    API has always required.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    min_length: int = 8
+    min_letters: int = 0
+    min_uppercase: int = 0
+    min_lowercase: int = 0
+    min_digits: int = 0
+    min_special: int = 0
+    disallow_username: bool = False
+    disallowed_words: tuple[str, ...] = ()
+    min_differing_chars: int = 0
+
+    @model_validator(mode="before")
+    @classmethod
+    def _expand_preset(cls, value: Any) -> Any:
+        """Accept a preset name, or a mapping with a `preset` key plus overrides."""
+        if isinstance(value, str):
+            value = {"preset": value}
+        if isinstance(value, dict) and "preset" in value:
+            overrides = {key: val for key, val in value.items() if key != "preset"}
+            name = value["preset"]
+            if name not in PRESETS:
+                raise ValueError(f"Unknown password policy preset: {name}")
+            return {**PRESETS[name], **overrides}
+        return value
+
+
+PRESETS: dict[str, dict[str, Any]] = {
+    "default": {},
+    "ora12c": {
+        "min_length": 8,
+        "min_letters": 1,
+        "min_digits": 1,
+        "disallow_username": True,
+        "disallowed_words": ("oracle",),
+        "min_differing_chars": 3,
+    },
+    "ora12c_strong": {
+        "min_length": 9,
+        "min_uppercase": 2,
+        "min_lowercase": 2,
+        "min_digits": 2,
+        "min_special": 2,
+        "disallow_username": True,
+        "disallowed_words": ("oracle",),
+        "min_differing_chars": 4,
+    },
+}
+
+DEFAULT_POLICY = PasswordPolicy()
+
+
+def check_password(policy: PasswordPolicy, password: str, username: str, old_password: str | None) -> list[str]:
+    """Return the rules `password` breaks under `policy` (empty when it passes).
+
+    Args:
+        policy: The brand's password policy.
+        password: The proposed new password.
+        username: The account name, for the username-in-password rule.
+        old_password: The current password, for the differing-characters rule.
+    """
+    violations = []
+    if len(password) < policy.min_length:
+        violations.append(f"Password must be at least {policy.min_length} characters long.")
+
+    letters = uppercase = lowercase = digits = special = 0
+    for char in password:
+        if char.isalpha():
+            letters += 1
+            if char.isupper():
+                uppercase += 1
+            elif char.islower():
+                lowercase += 1
+        elif char.isdigit():
+            digits += 1
+        elif char in SPECIAL_CHARACTERS:
+            special += 1
+    for count, required, label in (
+        (letters, policy.min_letters, "letter"),
+        (uppercase, policy.min_uppercase, "uppercase letter"),
+        (lowercase, policy.min_lowercase, "lowercase letter"),
+        (digits, policy.min_digits, "digit"),
+        (special, policy.min_special, "special character"),
+    ):
+        if count < required:
+            violations.append(f"Password must contain at least {required} {label}{'s' if required > 1 else ''}.")
+
+    lowered = password.lower()
+    if policy.disallow_username and username:
+        name = username.lower()
+        if name in lowered or name[::-1] in lowered:
+            violations.append("Password must not contain the username.")
+    for word in policy.disallowed_words:
+        if word.lower() in lowered:
+            violations.append(f'Password must not contain the word "{word}".')
+
+    if policy.min_differing_chars and old_password is not None:
+        if not _differs_by_at_least(password, old_password, policy.min_differing_chars):
+            violations.append(
+                f"Password must differ from the current password by at least {policy.min_differing_chars} characters."
+            )
+    return violations
+
+
+def _differs_by_at_least(a: str, b: str, n: int) -> bool:
+    """Return True if the Levenshtein distance between `a` and `b` is at least `n`.
+
+    Row i keeps only the 2n + 1 cells of columns i - n .. i + n; every other
+    cell is at least n away from the diagonal and so already counts as n.
+    Distances are capped at n, and the scan stops as soon as a whole band
+    reaches it, so this costs O(len * n) time and O(n) memory.
+    """
+    if abs(len(a) - len(b)) >= n:
+        return True
+    width = 2 * n + 1
+    # previous[k] and current[k] hold column j = i - n + k of rows i - 1 and i.
+    previous = [j if 0 <= j < n else n for j in range(-n, n + 1)]
+    for i in range(1, len(a) + 1):
+        current = [n] * width
+        band_min = n
+        for k in range(max(0, n - i), min(width, len(b) - i + n + 1)):
+            j = i - n + k
+            if j == 0:
+                value = min(i, n)
+            else:
+                value = previous[k] + (a[i - 1] != b[j - 1])
+                if k + 1 < width and previous[k + 1] + 1 < value:
+                    value = previous[k + 1] + 1
+                if k > 0 and current[k - 1] + 1 < value:
+                    value = current[k - 1] + 1
+                if value > n:
+                    value = n
+            current[k] = value
+            if value < band_min:
+                band_min = value
+        if band_min >= n:
+            return True
+        previous = current
+    return previous[len(b) - len(a) + n] >= n
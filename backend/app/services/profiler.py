@@ -0,0 +1,123 @@
+import collections
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is still running."""
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler that writes flamegraph-compatible collapsed stacks.
+
+    While running, a daemon thread snapshots every other thread's stack with
+    `sys._current_frames()` every `interval_seconds`; nothing is installed in
+    the threads being sampled, so requests run unmodified. When the run ends
+    the samples are written to `output_dir` as one `a;b;c count` line per
+    distinct stack, ready for flamegraph.pl or speedscope.
+
+    Each stack's root frame is the route it was sampled in, found by matching
+    the stack's code objects against `routes` (handler code to route path).
+    Samples outside any handler — the idle event loop, the audit writer, a
+    task a handler is awaiting, such as a shared single-flight logon — are
+    rooted at `[thread name]` instead.
+    """
+
+    def __init__(self, output_dir: str, interval_seconds: float = 0.01, max_seconds: float = 300) -> None:
+        self.output_dir = Path(output_dir)
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """True while a profile is being collected."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, routes: Mapping[CodeType, str] | None = None) -> Path:
+        """Sample for `seconds` in the background and return the path the profile will be written to.
+
+        Raises:
+            ValueError: If `seconds` is not positive or exceeds `max_seconds`.
+            ProfilerBusyError: If a profile is already running.
+        """
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be greater than 0 and at most {self.max_seconds:g}")
+        with self._lock:
+            if self.running:
+                raise ProfilerBusyError("A profile is already running.")
+            now = datetime.now(UTC)
+            stamp = f"{now:%Y%m%dT%H%M%S}.{now.microsecond // 1000:03d}Z"
+            path = self.output_dir / f"profile-{os.getpid()}-{stamp}.collapsed"
+            self._thread = threading.Thread(
+                target=self._run, args=(seconds, dict(routes or {}), path), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        return path
+
+    def join(self, timeout: float | None = None) -> None:
+        """Wait for the current profile, if any, to be written."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, seconds: float, routes: dict[CodeType, str], path: Path) -> None:
+        """Sampling loop: collect stacks until the deadline, then write them out."""
+        counts: collections.Counter[str] = collections.Counter()
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    counts[_collapse(frame, routes, names.get(ident, str(ident)))] += 1
+            frame = None  # Do not keep the last sampled stack's locals alive while sleeping.
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.interval_seconds, remaining))
+        self._write(path, counts)
+
+    def _write(self, path: Path, counts: collections.Counter[str]) -> None:
+        """Write the collapsed stacks atomically, most frequent first."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w") as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, path)
+
+
+def _collapse(frame: FrameType | None, routes: Mapping[CodeType, str], thread_name: str) -> str:
+    """Render a stack root-first as `root;file:function;...`, rooted at its route if it is in one."""
+    labels = []
+    route = None
+    while frame is not None:
+        code = frame.f_code
+        if route is None:
+            route = routes.get(code)
+        labels.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+        frame = frame.f_back
+    labels.append(route or f"[{thread_name}]")
+    labels.reverse()
+    return ";".join(label.replace(";", ",").replace(" ", "_") for label in labels)
+
+
+def create_profiler(settings: "Settings") -> SamplingProfiler:
+    """Build the on-demand profiler from the `profile_*` settings."""
+    return SamplingProfiler(
+        settings.profile_dir,
+        interval_seconds=settings.profile_interval_seconds,
+        max_seconds=settings.profile_max_seconds,
+    )
@@ -0,0 +1,246 @@
+import asyncio
+import math
+import re
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request exceeds one of its rate limits."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Rate limit exceeded; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """A limit of `limit` requests per `window_seconds`."""
+
+    limit: int
+    window_seconds: int
+
+
+def parse_rate(value: str) -> RateLimit:
+    """Parse strings such as "5/minute" into a RateLimit."""
+    match = _RATE_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"Invalid rate limit {value!r}; expected '<count>/<second|minute|hour|day>'")
+    return RateLimit(int(match[1]), _PERIODS[match[2]])
+
+
+def slide(state: tuple[int, int, int] | None, rate: RateLimit, now: float) -> tuple[tuple[int, int, int], float]:
+    """Apply one hit to a sliding-window-counter state.
+
+    The state is (window index, hits in the current window, hits in the
+    previous window). The rate over the last full window is estimated by
+    weighting the previous window's count by how much of it still overlaps,
+    which needs O(1) memory per key instead of one timestamp per request.
+
+    Returns:
+        The new state and 0 if the hit was allowed, or the unchanged state and
+        the seconds until a retry would be allowed.
+    """
+    window = rate.window_seconds
+    index = int(now // window)
+    if state is None or state[0] < index - 1:
+        current, previous = 0, 0
+    elif state[0] == index - 1:
+        current, previous = 0, state[1]
+    else:
+        current, previous = state[1], state[2]
+
+    elapsed = now / window - index
+    if previous * (1 - elapsed) + current + 1 <= rate.limit:
+        return (index, current + 1, previous), 0
+
+    budget = rate.limit - 1
+    if current <= budget and previous:
+        allowed_at = (index + 1 - (budget - current) / previous) * window
+    else:
+        allowed_at = (index + 1 + max(0.0, 1 - budget / current)) * window if current else (index + 1) * window
+    return (index, current, previous), max(allowed_at - now, 0.0)
+
+
+class RateLimitStorage(ABC):
+    """Where sliding-window counters live."""
+
+    @abstractmethod
+    def hit(self, key: str, rate: RateLimit, now: float) -> float:
+        """Record a hit for `key`; return 0 if allowed, else seconds until retry."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every counter."""
+
+    async def hit_async(self, key: str, rate: RateLimit, now: float) -> float:
+        """`hit` for the event loop; storage that can block overrides this to run it on a worker thread."""
+        return self.hit(key, rate, now)
+
+
+class MemoryRateLimitStorage(RateLimitStorage):
+    """Per-process counters in an LRU-bounded dict of at most `max_keys` keys."""
+
+    def __init__(self, max_keys: int) -> None:
+        """Create an empty store that evicts the least recently used key beyond `max_keys`."""
+        self._max_keys = max_keys
+        self._states: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def hit(self, key: str, rate: RateLimit, now: float) -> float:
+        with self._lock:
+            state, retry_after = slide(self._states.get(key), rate, now)
+            self._states[key] = state
+            self._states.move_to_end(key)
+            if len(self._states) > self._max_keys:
+                self._states.popitem(last=False)
+        return retry_after
+
+    def reset(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+class SQLiteRateLimitStorage(RateLimitStorage):
+    """Counters shared by every worker on a host through a WAL-mode SQLite file.
+
+    Each hit is one `BEGIN IMMEDIATE` read-modify-write, which can wait up to
+    the 5 s busy timeout for another worker's write, so `hit_async` runs it
+    on a worker thread. Rows record when they stop mattering (two windows
+    after their last window), and every `prune_every` hits expired rows are
+    deleted and the table is trimmed to the `max_keys` most recently useful
+    keys.
+    """
+
+    def __init__(self, path: str, max_keys: int, prune_every: int = 1000) -> None:
+        """Open (creating if needed) the counter database at `path`."""
+        self._max_keys = max_keys
+        self._prune_every = prune_every
+        self._hits = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                window INTEGER NOT NULL,
+                current INTEGER NOT NULL,
+                previous INTEGER NOT NULL,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS rate_limits_expires_at ON rate_limits (expires_at);
+            """
+        )
+        self._lock = Lock()
+
+    def hit(self, key: str, rate: RateLimit, now: float) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT window, current, previous FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                state, retry_after = slide(row, rate, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (key, window, current, previous, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, *state, (state[0] + 2) * rate.window_seconds),
+                )
+                self._hits += 1
+                if self._hits % self._prune_every == 0:
+                    self._prune_locked(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return retry_after
+
+    async def hit_async(self, key: str, rate: RateLimit, now: float) -> float:
+        """Run `hit` on a worker thread, so waiting on another worker's write lock never stalls the event loop."""
+        return await asyncio.to_thread(self.hit, key, rate, now)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits")
+
+    def _prune_locked(self, now: float) -> None:
+        """Drop expired rows, then the soonest-expiring rows beyond `max_keys`."""
+        self._conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()
+        if count > self._max_keys:
+            self._conn.execute(
+                "DELETE FROM rate_limits WHERE key IN "
+                "(SELECT key FROM rate_limits ORDER BY expires_at LIMIT ?)",
+                (count - self._max_keys,),
+            )
+
+
+class RateLimiter:
+    """Approximate sliding-window limits keyed per IP and per (brand, username).
+
+    The per-IP limit bounds what one source can send in total; the per-user
+    limit is not keyed on the address, so spreading guesses for one account
+    over many IPs does not multiply its quota. Keys are scoped per endpoint,
+    like the old per-route limits.
+    """
+
+    def __init__(self, storage: RateLimitStorage, per_ip: RateLimit, per_user: RateLimit) -> None:
+        """Create a limiter over `storage` with the given per-IP and per-user limits."""
+        self.storage = storage
+        self.per_ip = per_ip
+        self.per_user = per_user
+        self.enabled = True
+
+    def check(self, scope: str, ip: str, username: str, brand: str) -> None:
+        """Count one request, raising RateLimitExceeded if any limit is exceeded."""
+        if not self.enabled:
+            return
+        now = time.time()
+        retry_after = self.storage.hit(f"{scope}|ip|{ip}", self.per_ip, now)
+        if not retry_after:
+            retry_after = self.storage.hit(f"{scope}|user|{brand}|{username.upper()}", self.per_user, now)
+        if retry_after:
+            raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+
+    async def check_async(self, scope: str, ip: str, username: str, brand: str) -> None:
+        """`check` for request handlers: storage that can block is run off the event loop."""
+        if not self.enabled:
+            return
+        now = time.time()
+        retry_after = await self.storage.hit_async(f"{scope}|ip|{ip}", self.per_ip, now)
+        if not retry_after:
+            retry_after = await self.storage.hit_async(f"{scope}|user|{brand}|{username.upper()}", self.per_user, now)
+        if retry_after:
+            raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+
+    def reset(self) -> None:
+        """Forget every counter."""
+        self.storage.reset()
+
+
+def create_rate_limiter(settings: "Settings") -> RateLimiter:
+    """Build the rate limiter selected by the `rate_limit_*` settings."""
+    if settings.rate_limit_backend == "sqlite":
+        storage = SQLiteRateLimitStorage(settings.rate_limit_db_path, max_keys=settings.rate_limit_max_keys)
+    else:
+        storage = MemoryRateLimitStorage(max_keys=settings.rate_limit_max_keys)
+    return RateLimiter(
+        storage,
+        per_ip=parse_rate(settings.rate_limit_per_ip),
+        per_user=parse_rate(settings.rate_limit_per_user),
+    )
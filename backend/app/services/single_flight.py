@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+import hmac
+from collections.abc import Awaitable, Callable
+from secrets import token_bytes
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent identical logons into one Oracle round trip.
+
+    Calls are keyed on (brand, username, HMAC of the password). The HMAC key
+    is random per process, so the digest cannot be checked against a password
+    guess outside this worker, and the entry is dropped as soon as the shared
+    call finishes. The first caller's work runs as its own task, so a client
+    that disconnects does not cancel the logon for the callers sharing it.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty in-flight table with a fresh per-process HMAC key."""
+        self._hmac_key = token_bytes(32)
+        self._in_flight: dict[tuple[str, str, bytes], asyncio.Task] = {}
+
+    def key(self, brand: str, username: str, password: str) -> tuple[str, str, bytes]:
+        """Build the coalescing key without retaining the password itself."""
+        digest = hmac.digest(self._hmac_key, password.encode(), hashlib.sha256)
+        return brand, username, digest
+
+    async def do(self, key: tuple[str, str, bytes], fn: Callable[..., Awaitable[T]], *args) -> T:
+        """Await `fn(*args)`, sharing the result with concurrent callers using the same key."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        """Return the number of calls currently in flight."""
+        return len(self._in_flight)
@@ -0,0 +1,98 @@
+import asyncio
+import sqlite3
+import time
+from secrets import token_urlsafe
+from threading import Lock
+
+from app.services.verification_tokens import (
+    TOKEN_EXPIRED_MESSAGE,
+    VerificationTokenBackend,
+    VerificationTokenError,
+    _digest,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verification_tokens (
+    token_hash BLOB PRIMARY KEY,
+    brand TEXT NOT NULL,
+    username TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS verification_tokens_expires_at ON verification_tokens (expires_at);
+"""
+
+
+class SQLiteVerificationTokenStore(VerificationTokenBackend):
+    """One-time verification tokens shared by every worker on a host through SQLite.
+
+    The database runs in WAL mode so readers never block the single writer, and
+    tokens survive rolling restarts. Only a SHA-256 digest of each token is
+    stored. Consumption is a single `DELETE ... RETURNING`, so two workers racing
+    on the same token cannot both succeed. Expiry uses wall-clock time because
+    the deadline is shared between processes, and is indexed so cleanup only
+    touches rows that have actually expired. A write can wait up to the 5 s busy
+    timeout for another worker's, so the `*_async` methods the app calls run
+    on a worker thread.
+    """
+
+    def __init__(self, ttl_seconds: int, path: str) -> None:
+        """Open (creating if needed) the token database at `path`."""
+        self._ttl = ttl_seconds
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = Lock()
+
+    def create_token(self, username: str, brand: str) -> str:
+        """Create and persist a short-lived token proving the user verified their identity."""
+        token = token_urlsafe(32)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM verification_tokens WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT INTO verification_tokens (token_hash, brand, username, expires_at) VALUES (?, ?, ?, ?)",
+                (_digest(token), brand, username, now + self._ttl),
+            )
+        return token
+
+    def consume_token(self, token: str, username: str, brand: str) -> None:
+        """Atomically delete a token and validate the identity it was issued for."""
+        with self._lock:
+            row = self._conn.execute(
+                "DELETE FROM verification_tokens WHERE token_hash = ? RETURNING brand, username, expires_at",
+                (_digest(token),),
+            ).fetchone()
+
+        if row is None or row[2] <= time.time():
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
+        if row[0] != brand:
+            raise VerificationTokenError("Verification does not match the provided brand.")
+        if row[1] != username:
+            raise VerificationTokenError("Verification does not match the provided username.")
+
+    def sweep_expired(self) -> None:
+        """Delete every expired token using the expiry index."""
+        with self._lock:
+            self._conn.execute("DELETE FROM verification_tokens WHERE expires_at <= ?", (time.time(),))
+
+    async def create_token_async(self, username: str, brand: str) -> str:
+        """Run `create_token` on a worker thread."""
+        return await asyncio.to_thread(self.create_token, username, brand)
+
+    async def consume_token_async(self, token: str, username: str, brand: str) -> None:
+        """Run `consume_token` on a worker thread."""
+        await asyncio.to_thread(self.consume_token, token, username, brand)
+
+    async def sweep_expired_async(self) -> None:
+        """Run `sweep_expired` on a worker thread."""
+        await asyncio.to_thread(self.sweep_expired)
+
+    def __len__(self) -> int:
+        """Return the number of stored tokens, including expired rows not yet swept."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM verification_tokens").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
@@ -0,0 +1,103 @@
+import hashlib
+import mimetypes
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from starlette.responses import Response
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+# Preference order when the client accepts several encodings.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+INDEX_CACHE_CONTROL = "no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class StaticAsset:
+    """One file of the frontend bundle with its precompressed variants, each with a strong ETag."""
+
+    __slots__ = ("content_type", "cache_control", "variants")
+
+    def __init__(self, path: Path, cache_control: str) -> None:
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.variants: dict[str | None, tuple[bytes, str]] = {}
+        for encoding, suffix in ((None, ""), *ENCODINGS):
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                data = variant.read_bytes()
+                self.variants[encoding] = (data, f'"{hashlib.sha256(data).hexdigest()[:32]}"')
+
+    def response(self, accept_encoding: str, if_none_match: str | None) -> Response:
+        """The best variant for `accept_encoding`, or 304 if the client already has it."""
+        encoding = _negotiate(accept_encoding, self.variants)
+        data, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if if_none_match and (if_none_match.strip() == "*" or etag in _etags(if_none_match)):
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=data, headers=headers, media_type=self.content_type)
+
+
+class StaticAssets:
+    """The built frontend (see app.tools.build_frontend), held in memory and served same-origin.
+
+    `index.html` is revalidated on every load (`no-cache` plus its ETag, so an
+    unchanged page costs a 304). Everything under `assets/` has a content hash
+    in its name and is cached for a year as immutable: a new build changes the
+    names, so browsers never revalidate an asset and never see a stale one.
+    Each file is served brotli- or gzip-compressed when the client accepts it
+    and the build produced that variant.
+    """
+
+    def __init__(self, directory: str) -> None:
+        root = Path(directory)
+        self._files = {"index.html": StaticAsset(root / "index.html", INDEX_CACHE_CONTROL)}
+        assets = root / "assets"
+        if assets.is_dir():
+            for path in assets.iterdir():
+                if path.is_file() and not path.name.endswith((".br", ".gz")):
+                    self._files[f"assets/{path.name}"] = StaticAsset(path, IMMUTABLE_CACHE_CONTROL)
+
+    def response(self, name: str, accept_encoding: str, if_none_match: str | None) -> Response:
+        """Serve bundle file `name` ("index.html" or "assets/..."); 404 if the bundle has no such file."""
+        asset = self._files.get(name)
+        if asset is None:
+            return Response(status_code=404)
+        return asset.response(accept_encoding, if_none_match)
+
+
+def _negotiate(accept_encoding: str, variants: dict) -> str | None:
+    """Pick the preferred encoding the client accepts (q > 0) and the bundle has."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    for encoding, _ in ENCODINGS:
+        if encoding in variants and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def _etags(if_none_match: str) -> set[str]:
+    """ETags listed in an If-None-Match header, weak or strong (weak comparison, as RFC 9110 requires)."""
+    return {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def create_static_assets(settings: "Settings") -> StaticAssets | None:
+    """Load the frontend bundle from FRONTEND_DIR, or None if it has not been built."""
+    if not settings.frontend_dir or not (Path(settings.frontend_dir) / "index.html").is_file():
+        return None
+    return StaticAssets(settings.frontend_dir)
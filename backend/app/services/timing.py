@@ -0,0 +1,175 @@
+import contextlib
+import random
+import time
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.audit import AuditLogger
+
+if TYPE_CHECKING:
+    from app.config import Settings
+
+_NOT_TIMED = contextlib.nullcontext()
+
+
+class RequestTimer:
+    """Phase durations collected while one sampled request is handled.
+
+    Repeated phases (one `connect` per failover attempt, say) add up under a
+    single name. Tasks started for the request, such as a single-flight logon,
+    inherit the timer through the context variable and record into it too.
+    """
+
+    __slots__ = ("start", "phases", "tags")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.tags: dict[str, str] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add `seconds` to the phase `name`."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Seconds since the request arrived."""
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """The phases and the total so far as a `Server-Timing` header value."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current_timer: ContextVar[RequestTimer | None] = ContextVar("request_timer", default=None)
+
+
+class _Span:
+    __slots__ = ("_timer", "_name", "_start")
+
+    def __init__(self, timer: RequestTimer, name: str) -> None:
+        self._timer = timer
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._timer.add(self._name, time.perf_counter() - self._start)
+
+
+def span(name: str) -> contextlib.AbstractContextManager:
+    """Time the enclosed block as phase `name` of the current request.
+
+    Outside a sampled request this returns a shared no-op context manager, so
+    unsampled requests pay for one context-variable lookup per phase.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        return _NOT_TIMED
+    return _Span(timer, name)
+
+
+def mark_validated(**tags: str) -> None:
+    """Record the time from arrival to the handler as the `validate` phase and tag the request.
+
+    Called first thing in a handler: everything before it is reading the body,
+    routing and Pydantic validation. Tags such as brand and user appear in the
+    slow-request log.
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add("validate", timer.elapsed())
+        timer.tags.update(tags)
+
+
+class SlowRequestLog(AuditLogger):
+    """JSON-lines log of requests over the slow threshold, with their phase breakdown.
+
+    Shares the audit writer's queue, batching and rotation, but in its own file.
+    """
+
+    def log_request(self, method: str, path: str, status: int, timer: RequestTimer, total_seconds: float) -> None:
+        """Enqueue one slow request without touching the disk."""
+        self._enqueue({
+            "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+            "method": method,
+            "path": path,
+            "status": status,
+            **timer.tags,
+            "total_ms": round(total_seconds * 1000, 1),
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in timer.phases.items()},
+        })
+
+
+class RequestTiming:
+    """Sampling and slow-request settings read by ServerTimingMiddleware on every request.
+
+    `sample_rate` is the fraction of requests that are timed (0 turns timing
+    off, 1 times every request). Sampled requests get a `Server-Timing`
+    header; those taking at least `slow_threshold_ms` are also written to
+    `slow_log`, if one is configured.
+    """
+
+    def __init__(self, sample_rate: float, slow_threshold_ms: float, slow_log: SlowRequestLog | None) -> None:
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_log = slow_log
+
+    def sampled(self) -> bool:
+        """Decide whether to time the next request."""
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+
+class ServerTimingMiddleware:
+    """Time sampled HTTP requests and report their phases in a `Server-Timing` header.
+
+    A pure ASGI middleware: unsampled requests pass straight through. The
+    header is added when the response starts, so it covers everything up to
+    the response body; the slow-request check runs once the response is sent.
+    """
+
+    def __init__(self, app: ASGIApp, timing: RequestTiming) -> None:
+        self.app = app
+        self.timing = timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.timing.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timer.server_timing())
+            await send(message)
+
+        token = _current_timer.set(timer)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(token)
+            total = timer.elapsed()
+            slow_log = self.timing.slow_log
+            if slow_log is not None and total * 1000 >= self.timing.slow_threshold_ms:
+                slow_log.log_request(scope["method"], scope["path"], status, timer, total)
+
+
+def create_request_timing(settings: "Settings") -> RequestTiming:
+    """Build request timing from the `server_timing_*` and `slow_request_*` settings.
+
+    The slow-request log is only opened when timing is sampled at all.
+    """
+    slow_log = None
+    if settings.server_timing_sample_rate > 0:
+        slow_log = SlowRequestLog(settings.slow_request_log_path)
+    return RequestTiming(settings.server_timing_sample_rate, settings.slow_request_threshold_ms, slow_log)
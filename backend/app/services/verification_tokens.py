@@ -1,7 +1,20 @@
+import asyncio
+import base64
+import hashlib
+import heapq
+import hmac
+import json
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
-from secrets import token_urlsafe
+from secrets import token_bytes, token_urlsafe
 from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.config import Settings
 
 
 class VerificationTokenError(ValueError):
@@ -10,55 +23,276 @@ class VerificationTokenError(ValueError):
 
 @dataclass(slots=True)
 class VerifiedCredential:
-    """Identity record stored against a short-lived verification token."""
+    """Identity record stored against a short-lived verification token.
+
+    `expires_at` is on the `time.monotonic` clock, so a wall-clock step cannot
+    extend or cut short a token's life.
+    """
 
     brand: str
     username: str
-    expires_at: datetime
+    expires_at: float
+
+
+TOKEN_EXPIRED_MESSAGE = "Verification expired. Please verify credentials again."
+
+
+class VerificationTokenBackend(ABC):
+    """Interface shared by every verification token implementation."""
+
+    @abstractmethod
+    def create_token(self, username: str, brand: str) -> str:
+        """Issue a one-time token proving the user verified their identity."""
+
+    @abstractmethod
+    def consume_token(self, token: str, username: str, brand: str) -> None:
+        """Validate and invalidate a token, raising VerificationTokenError on mismatch."""
+
+    @abstractmethod
+    def sweep_expired(self) -> None:
+        """Drop state belonging to expired tokens."""
+
+    async def create_token_async(self, username: str, brand: str) -> str:
+        """`create_token` for the event loop; backends doing blocking I/O run it on a worker thread."""
+        return self.create_token(username, brand)
+
+    async def consume_token_async(self, token: str, username: str, brand: str) -> None:
+        """`consume_token` for the event loop; backends doing blocking I/O run it on a worker thread."""
+        self.consume_token(token, username, brand)
+
+    async def sweep_expired_async(self) -> None:
+        """`sweep_expired` for the event loop; backends doing blocking I/O run it on a worker thread."""
+        self.sweep_expired()
 
+    async def run_sweeper(self, interval_seconds: float) -> None:
+        """Call `sweep_expired` every `interval_seconds` until cancelled."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.sweep_expired_async()
 
-class VerificationTokenStore:
-    """In-memory store for short-lived one-time verification tokens."""
 
-    def __init__(self, ttl_seconds: int) -> None:
-        """Initialize token storage with a token time-to-live in seconds."""
-        self._ttl = timedelta(seconds=ttl_seconds)
-        self._tokens: dict[str, VerifiedCredential] = {}
+class VerificationTokenStore(VerificationTokenBackend):
+    """In-memory store for short-lived one-time verification tokens, bounded by `capacity`.
+
+    Each (brand, username) has at most one outstanding token: a newer verify
+    replaces the older token. When the store is full, the token closest to
+    expiry is evicted to make room, and its owner has to verify again.
+
+    Entries are kept small, because a flood of verifies fills the store
+    before any token expires. Tokens are keyed by their raw 32-byte SHA-256
+    digest rather than the 43-character token string, which also keeps usable
+    tokens out of memory dumps. Expiries are monotonic floats and brand names
+    are interned, so each credential shares one brand string.
+
+    Every token has the same TTL on a monotonic clock, so tokens expire in the
+    order they were issued. Expiry and eviction therefore pop digests off the
+    front of a FIFO queue. Replaced and consumed tokens stay in the queue until
+    they reach the front; the queue is compacted once they outnumber the live
+    tokens.
+    """
+
+    def __init__(self, ttl_seconds: int, capacity: int = 100_000) -> None:
+        """Initialize token storage with a token time-to-live in seconds and a maximum number of live tokens."""
+        if capacity < 1:
+            raise ValueError("Verification token capacity must be at least 1.")
+        self._ttl = ttl_seconds
+        self._capacity = capacity
+        self._tokens: dict[bytes, VerifiedCredential] = {}
+        self._users: dict[str, dict[str, bytes]] = {}
+        self._expiry_queue: deque[bytes] = deque()
+        self._evicted = 0
         self._lock = Lock()
 
+    @property
+    def evicted(self) -> int:
+        """Number of live tokens dropped to stay within capacity."""
+        return self._evicted
+
     def create_token(self, username: str, brand: str) -> str:
-        """Create and persist a short-lived token proving the user verified their identity."""
+        """Create a short-lived token proving the user verified their identity, replacing any earlier one."""
         token = token_urlsafe(32)
-        credential = VerifiedCredential(
-            brand=brand,
-            username=username,
-            expires_at=datetime.now(UTC) + self._ttl,
-        )
+        digest = _digest(token)
+        now = time.monotonic()
+        brand = sys.intern(brand)
         with self._lock:
-            self._cleanup_expired_locked()
-            self._tokens[token] = credential
+            self._cleanup_expired_locked(now)
+            users = self._users.setdefault(brand, {})
+            previous = users.get(username)
+            if previous is not None:
+                del self._tokens[previous]
+            elif len(self._tokens) >= self._capacity:
+                self._evict_oldest_locked()
+            self._tokens[digest] = VerifiedCredential(brand, username, now + self._ttl)
+            users[username] = digest
+            self._expiry_queue.append(digest)
+            if len(self._expiry_queue) > 2 * len(self._tokens) + 64:
+                self._expiry_queue = deque(d for d in self._expiry_queue if d in self._tokens)
         return token
 
     def consume_token(self, token: str, username: str, brand: str) -> None:
         """Validate and invalidate a verification token in one atomic operation."""
+        digest = _digest(token)
+        now = time.monotonic()
         with self._lock:
-            self._cleanup_expired_locked()
-            credential = self._tokens.pop(token, None)
+            self._cleanup_expired_locked(now)
+            credential = self._tokens.pop(digest, None)
+            if credential is not None:
+                self._forget_user_locked(credential, digest)
 
-        if credential is None:
-            raise VerificationTokenError("Verification expired. Please verify credentials again.")
+        if credential is None or credential.expires_at <= now:
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
         if credential.brand != brand:
             raise VerificationTokenError("Verification does not match the provided brand.")
         if credential.username != username:
             raise VerificationTokenError("Verification does not match the provided username.")
 
-    def _cleanup_expired_locked(self) -> None:
-        """Delete all expired tokens while lock ownership is held by caller."""
-        now = datetime.now(UTC)
-        expired_tokens = [
-            token
-            for token, credential in self._tokens.items()
-            if credential.expires_at <= now
-        ]
-        for token in expired_tokens:
-            self._tokens.pop(token, None)
+    def sweep_expired(self) -> None:
+        """Drop every expired token; safe to call from a background task."""
+        with self._lock:
+            self._cleanup_expired_locked(time.monotonic())
+
+    def __len__(self) -> int:
+        """Return the number of live (unconsumed, not yet swept) tokens."""
+        return len(self._tokens)
+
+    def _forget_user_locked(self, credential: VerifiedCredential, digest: bytes) -> None:
+        """Remove the user's index entry if it still points at `digest`."""
+        users = self._users[credential.brand]
+        if users.get(credential.username) == digest:
+            del users[credential.username]
+
+    def _evict_oldest_locked(self) -> None:
+        """Drop the live token issued first, which is also the next to expire."""
+        queue = self._expiry_queue
+        while queue:
+            digest = queue.popleft()
+            credential = self._tokens.pop(digest, None)
+            if credential is not None:
+                self._forget_user_locked(credential, digest)
+                self._evicted += 1
+                return
+
+    def _cleanup_expired_locked(self, now: float) -> None:
+        """Pop expired and already-removed digests off the queue front while the caller holds the lock."""
+        queue = self._expiry_queue
+        tokens = self._tokens
+        while queue:
+            credential = tokens.get(queue[0])
+            if credential is not None and credential.expires_at > now:
+                return
+            digest = queue.popleft()
+            if credential is not None:
+                del tokens[digest]
+                self._forget_user_locked(credential, digest)
+
+
+class SignedVerificationTokenStore(VerificationTokenBackend):
+    """Stateless verification tokens signed with a shared HMAC-SHA256 secret.
+
+    A token is `<payload>.<signature>`, both base64url encoded, where the payload
+    carries the brand, username, expiry (unix seconds) and a random nonce. Any
+    worker or node holding the same secret can validate it without shared state.
+    One-time use is enforced by a replay cache of consumed nonces that forgets
+    each nonce once its token would have expired anyway; that cache is local to
+    the process, so a replayed token is only caught by the worker that saw it.
+    """
+
+    def __init__(self, ttl_seconds: int, secret: bytes) -> None:
+        """Initialize the signer with a token time-to-live and the shared secret."""
+        if len(secret) < 32:
+            raise ValueError("Verification token secret must be at least 32 bytes.")
+        self._ttl = ttl_seconds
+        self._secret = secret
+        self._consumed: dict[bytes, int] = {}
+        self._consumed_heap: list[tuple[int, bytes]] = []
+        self._lock = Lock()
+
+    def create_token(self, username: str, brand: str) -> str:
+        """Issue a signed token proving the user verified their identity."""
+        expires_at = int(time.time()) + self._ttl
+        nonce = _b64encode(token_bytes(16))
+        payload = _b64encode(json.dumps([brand, username, expires_at, nonce], separators=(",", ":")).encode())
+        return f"{payload}.{self._sign(payload)}"
+
+    def consume_token(self, token: str, username: str, brand: str) -> None:
+        """Validate a signed token and record its nonce so it cannot be used again."""
+        # Issued tokens are base64url; anything else (including lone surrogates) cannot be encoded or compared.
+        if not token.isascii():
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
+        payload, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, self._sign(payload)):
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
+        try:
+            token_brand, token_username, expires_at, nonce = json.loads(_b64decode(payload))
+        except (ValueError, TypeError) as e:
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE) from e
+
+        now = int(time.time())
+        if expires_at <= now:
+            raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
+
+        nonce_key = _b64decode(nonce)
+        with self._lock:
+            self._cleanup_expired_locked(now)
+            if nonce_key in self._consumed:
+                raise VerificationTokenError(TOKEN_EXPIRED_MESSAGE)
+            self._consumed[nonce_key] = expires_at
+            heapq.heappush(self._consumed_heap, (expires_at, nonce_key))
+
+        if token_brand != brand:
+            raise VerificationTokenError("Verification does not match the provided brand.")
+        if token_username != username:
+            raise VerificationTokenError("Verification does not match the provided username.")
+
+    def sweep_expired(self) -> None:
+        """Forget consumed nonces whose tokens have expired."""
+        with self._lock:
+            self._cleanup_expired_locked(int(time.time()))
+
+    def __len__(self) -> int:
+        """Return the number of nonces held in the replay cache."""
+        return len(self._consumed)
+
+    def _sign(self, payload: str) -> str:
+        """Return the base64url HMAC-SHA256 signature of an encoded payload."""
+        return _b64encode(hmac.digest(self._secret, payload.encode(), hashlib.sha256))
+
+    def _cleanup_expired_locked(self, now: int) -> None:
+        """Pop expired nonces off the heap top while lock ownership is held by caller."""
+        heap = self._consumed_heap
+        while heap and heap[0][0] <= now:
+            _, nonce_key = heapq.heappop(heap)
+            self._consumed.pop(nonce_key, None)
+
+
+def create_verification_store(settings: "Settings") -> VerificationTokenBackend:
+    """Build the verification token store selected by `verification_token_mode`."""
+    ttl = settings.verification_token_ttl_seconds
+    if settings.verification_token_mode == "sqlite":
+        from app.services.sqlite_tokens import SQLiteVerificationTokenStore
+
+        return SQLiteVerificationTokenStore(ttl_seconds=ttl, path=settings.verification_token_db_path)
+    if settings.verification_token_mode == "signed":
+        return SignedVerificationTokenStore(
+            ttl_seconds=ttl,
+            secret=settings.verification_token_secret.get_secret_value().encode(),
+        )
+    return VerificationTokenStore(ttl_seconds=ttl, capacity=settings.verification_token_capacity)
+
+
+def _digest(token: str) -> bytes:
+    """Return the SHA-256 digest under which a token is stored; a client-sent token may hold lone surrogates."""
+    return hashlib.sha256(token.encode("utf-8", "surrogatepass")).digest()
+
+
+def _b64encode(data: bytes) -> str:
+    """Encode bytes as unpadded base64url."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    """Decode unpadded base64url, raising ValueError on malformed input."""
+    try:
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed base64url data.") from e
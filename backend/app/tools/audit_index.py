@@ -0,0 +1,116 @@
+"""Index the audit log into SQLite and query it.
+
+Usage (from the backend directory):
+
+    uv run python -m app.tools.audit_index ingest reset_audit.log
+    uv run python -m app.tools.audit_index ingest reset_audit.log --follow
+    uv run python -m app.tools.audit_index query --user SCOTT --brand budget --since 2025-01-28 --until 2025-01-29
+    uv run python -m app.tools.audit_index query --ip 10.0.0.7 --status FAILED VERIFY_FAILED --per-minute
+
+Naive timestamps given to --since/--until are interpreted as local time.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.services.audit_store import AuditStore, to_epoch_ms
+
+DEFAULT_INDEX_PATH = "audit_index.db"
+
+
+def _timestamp(value: str) -> int:
+    """Parse an ISO date or datetime argument into epoch milliseconds."""
+    try:
+        return to_epoch_ms(datetime.fromisoformat(value))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid ISO timestamp: {value!r}") from e
+
+
+def _format_ts(ts: int) -> str:
+    """Render epoch milliseconds as an ISO UTC timestamp."""
+    return datetime.fromtimestamp(ts / 1000, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _ingest(store: AuditStore, args: argparse.Namespace) -> None:
+    """Index new records once, or keep tailing the log with --follow."""
+    while True:
+        count = store.ingest(args.log)
+        if count or not args.follow:
+            print(f"indexed {count} events from {args.log}", file=sys.stderr)
+        if not args.follow:
+            return
+        time.sleep(args.poll_interval)
+
+
+def _query(store: AuditStore, args: argparse.Namespace) -> None:
+    """Print matching events (or per-minute counts) as JSON lines."""
+    filters = {
+        "since": args.since,
+        "until": args.until,
+        "user": args.user,
+        "brand": args.brand,
+        "ip": args.ip,
+        "statuses": args.status,
+    }
+    if args.per_minute:
+        for minute, status, count in store.counts_per_minute(**filters):
+            print(json.dumps({"minute": _format_ts(minute), "status": status, "count": count}))
+        return
+    # One extra row tells whether the limit cut anything off; query keeps the newest.
+    events = store.query(**filters, limit=args.limit + 1)
+    if len(events) > args.limit:
+        events = events[1:]
+        print(f"more than {args.limit} events match; showing the newest {args.limit} (raise --limit)", file=sys.stderr)
+    for event in events:
+        record = {
+            "ts": _format_ts(event.ts),
+            "status": event.status,
+            "brand": event.brand,
+            "user": event.user,
+            "ip": event.ip,
+        }
+        if event.reason is not None:
+            record["reason"] = event.reason
+        if event.latency_ms is not None:
+            record["latency_ms"] = event.latency_ms
+        print(json.dumps(record))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="SQLite index path (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="index new audit records")
+    ingest.add_argument("log", help="audit log to read")
+    ingest.add_argument("--follow", action="store_true", help="keep tailing the log")
+    ingest.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls with --follow")
+
+    query = commands.add_parser("query", help="search indexed audit records")
+    query.add_argument("--since", type=_timestamp, help="inclusive start (ISO date or datetime)")
+    query.add_argument("--until", type=_timestamp, help="exclusive end (ISO date or datetime)")
+    query.add_argument("--user")
+    query.add_argument("--brand")
+    query.add_argument("--ip")
+    query.add_argument("--status", nargs="+", help="one or more status values")
+    query.add_argument("--limit", type=int, default=1000, help="newest events to print (default: %(default)s)")
+    query.add_argument("--per-minute", action="store_true", help="print counts per minute and status")
+
+    args = parser.parse_args(argv)
+    store = AuditStore(args.index)
+    try:
+        if args.command == "ingest":
+            _ingest(store, args)
+        else:
+            _query(store, args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Build the memory-mapped cuckoo filter of breached passwords.
+
+Usage (from the backend directory):
+
+    uv run python -m app.tools.build_breached_filter breached.filter pwned-passwords-sha1.txt
+    uv run python -m app.tools.build_breached_filter banned.filter banned-words.txt --plaintext
+    xzcat list.txt.xz | uv run python -m app.tools.build_breached_filter breached.filter - --capacity 900000000
+
+Input lines are SHA-1 hex digests, optionally followed by ":count" as in the
+Have I Been Pwned downloads, or plaintext passwords with --plaintext. Inputs
+are streamed; when --capacity is omitted the files are read once up front to
+count their lines. Point BREACHED_PASSWORD_FILTER_PATH at the output and
+restart the workers to pick it up.
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Iterator
+
+from app.services.breached_passwords import BUCKET, CuckooFilterBuilder, filter_buckets
+
+
+def _lines(paths: list[str], plaintext: bool = False) -> Iterator[str]:
+    """Yield non-empty lines from each input ("-" is stdin).
+
+    Hash lists are stripped of surrounding whitespace. Plaintext passwords
+    lose only their line ending, since leading or trailing spaces are part
+    of the password.
+    """
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+        try:
+            for line in stream:
+                line = line.rstrip("\r\n") if plaintext else line.strip()
+                if line:
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="filter file to write")
+    parser.add_argument("inputs", nargs="+", help='hash or password lists ("-" for stdin)')
+    parser.add_argument("--capacity", type=int, help="expected number of entries (default: count input lines)")
+    parser.add_argument("--plaintext", action="store_true", help="inputs are plaintext passwords, not SHA-1 hex")
+    args = parser.parse_args(argv)
+
+    capacity = args.capacity
+    if capacity is None:
+        if "-" in args.inputs:
+            parser.error("--capacity is required when reading from stdin")
+        capacity = sum(1 for _ in _lines(args.inputs, args.plaintext))
+    size_mib = filter_buckets(capacity) * BUCKET.size / 2**20
+    print(f"building {size_mib:.1f} MiB filter for {capacity} entries", file=sys.stderr)
+
+    start = time.perf_counter()
+    builder = CuckooFilterBuilder(args.output, capacity)
+    skipped = 0
+    try:
+        for line in _lines(args.inputs, args.plaintext):
+            if args.plaintext:
+                builder.add_password(line)
+                continue
+            try:
+                digest = bytes.fromhex(line.partition(":")[0])
+            except ValueError:
+                digest = b""
+            if len(digest) != 20:
+                skipped += 1
+                continue
+            builder.add_digest(digest)
+    except ValueError as e:
+        builder.discard()
+        parser.error(str(e))
+    count = builder.close()
+    print(
+        f"wrote {count} entries to {args.output} in {time.perf_counter() - start:.1f}s "
+        f"({builder.duplicates} duplicates, {skipped} lines skipped)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
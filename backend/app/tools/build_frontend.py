@@ -0,0 +1,193 @@
+"""Build the frontend into the hashed, precompressed bundle the backend serves.
+
+Usage (from the backend directory):
+
+    uv run python -m app.tools.build_frontend                 # ../frontend -> ../frontend/dist
+    uv run python -m app.tools.build_frontend SOURCE_DIR OUTPUT_DIR
+
+Every stylesheet and script index.html references by relative path is
+processed and written to OUTPUT_DIR/assets under a content-hashed name
+(styles.3f2a9c01d4.css), and index.html is rewritten to point at it:
+
+- CSS rules whose class selectors use no class found in index.html or any
+  script are dropped, as are @keyframes nothing refers to; the rest is
+  minified.
+- Every file gets a .gz sibling (and .br when the `brotli` package is
+  installed) if compression makes it smaller.
+
+The backend serves OUTPUT_DIR (FRONTEND_DIR) from memory: hashed assets as
+immutable, index.html revalidated by ETag. Rebuild after editing the
+frontend and restart the workers.
+"""
+
+import argparse
+import gzip
+import hashlib
+import re
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone is served when brotli is not installed.
+    brotli = None
+
+ASSET_REFERENCE = re.compile(r'(?P<attr>href|src)="(?P<path>[\w.-]+\.(?:css|js))"')
+TOKEN_SEPARATORS = re.compile(r"[\s\"'`<>=(){};,]+")
+CLASS_SELECTOR = re.compile(r"\.((?:\\.|[\w-])+)")
+HASH_LENGTH = 10
+
+
+def used_tokens(*texts: str) -> set[str]:
+    """Every word that could be a class name in the markup and scripts, like Tailwind's content scan."""
+    tokens = set()
+    for text in texts:
+        for token in TOKEN_SEPARATORS.split(text):
+            tokens.add(token)
+            tokens.add(token.lstrip("."))
+    return tokens
+
+
+def _split_top_level(text: str, separator: str) -> list[str]:
+    """Split on `separator` outside quotes, parentheses and brackets."""
+    parts, depth, quote, current = [], 0, None, []
+    for char in text:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _blocks(css: str) -> list[tuple[str, str]]:
+    """Split a stylesheet into top-level (prelude, body) pairs."""
+    blocks, depth, start, prelude = [], 0, 0, ""
+    for i, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                prelude = css[start:i]
+                start = i + 1
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append((" ".join(prelude.split()), css[start:i]))
+                start = i + 1
+    return blocks
+
+
+def _selector_used(selector: str, tokens: set[str]) -> bool:
+    classes = [re.sub(r"\\(.)", r"\1", name) for name in CLASS_SELECTOR.findall(selector)]
+    return all(name in tokens for name in classes)
+
+
+def _minify_selector(selector: str) -> str:
+    return re.sub(r"\s*([>~+,])\s*", r"\1", " ".join(selector.split()))
+
+
+def _minify_declarations(body: str) -> str:
+    declarations = []
+    for declaration in _split_top_level(body, ";"):
+        name, _, value = declaration.partition(":")
+        if name.strip():
+            declarations.append(f"{name.strip()}:{' '.join(value.split())}")
+    return ";".join(declarations)
+
+
+def purge_css(css: str, tokens: set[str]) -> str:
+    """Drop rules no used class can match and unreferenced @keyframes, and minify what is left."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules, keyframes = [], []
+    for prelude, body in _blocks(css):
+        if prelude.startswith("@keyframes"):
+            keyframes.append((prelude.split()[1], f"{prelude}{{{_minify_keyframes(body)}}}"))
+        elif prelude.startswith("@"):
+            inner = purge_css(body, tokens)
+            if inner:
+                rules.append(f"{prelude}{{{inner}}}")
+        else:
+            selectors = [s for s in _split_top_level(prelude, ",") if _selector_used(s, tokens)]
+            if selectors:
+                rules.append(f"{_minify_selector(','.join(selectors))}{{{_minify_declarations(body)}}}")
+    kept = "".join(rules)
+    animations = "".join(text for name, text in keyframes if re.search(rf"\b{re.escape(name)}\b", kept))
+    return animations + kept
+
+
+def _minify_keyframes(body: str) -> str:
+    return "".join(f"{' '.join(step.split())}{{{_minify_declarations(block)}}}" for step, block in _blocks(body))
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _write(path: Path, data: bytes) -> list[tuple[str, int]]:
+    """Write `data` and its smaller compressed variants; return (name, size) for each file written."""
+    path.write_bytes(data)
+    written = [(path.name, len(data))]
+    variants = {".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            path.with_name(path.name + suffix).write_bytes(compressed)
+            written.append((path.name + suffix, len(compressed)))
+    return written
+
+
+def build(source: Path, output: Path) -> list[tuple[str, int]]:
+    """Build `source` (index.html and the files it references) into `output`, replacing it."""
+    html = (source / "index.html").read_text()
+    references = {match["path"] for match in ASSET_REFERENCE.finditer(html)}
+    texts = {name: (source / name).read_text() for name in sorted(references)}
+    tokens = used_tokens(html, *(text for name, text in texts.items() if name.endswith(".js")))
+
+    staging = output.with_name(output.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    (staging / "assets").mkdir(parents=True)
+    written = []
+    hashed = {}
+    for name, text in texts.items():
+        data = (purge_css(text, tokens) if name.endswith(".css") else text).encode()
+        stem, _, extension = name.rpartition(".")
+        hashed[name] = f"assets/{stem}.{_content_hash(data)}.{extension}"
+        written += [(f"assets/{file}", size) for file, size in _write(staging / hashed[name], data)]
+
+    html = ASSET_REFERENCE.sub(lambda m: f'{m["attr"]}="{hashed[m["path"]]}"', html)
+    written += _write(staging / "index.html", html.encode())
+    shutil.rmtree(output, ignore_errors=True)
+    staging.rename(output)
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    frontend = Path(__file__).resolve().parents[3] / "frontend"
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", type=Path, default=frontend, help="frontend source directory")
+    parser.add_argument("output", nargs="?", type=Path, help="bundle directory (default: SOURCE/dist)")
+    args = parser.parse_args(argv)
+    output = args.output or args.source / "dist"
+
+    if not (args.source / "index.html").is_file():
+        parser.error(f"{args.source} has no index.html")
+    for name, size in build(args.source, output):
+        print(f"{size:>8}  {name}", file=sys.stderr)
+    if brotli is None:
+        print("brotli not installed; wrote gzip variants only", file=sys.stderr)
+    print(f"wrote {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Rotate many service-account passwords from a CSV or NDJSON stream.
+
+Usage (from the backend directory):
+
+    uv run python -m app.tools.rotate_passwords --results q3.results.ndjson < q3.csv
+    uv run python -m app.tools.rotate_passwords --results q3.results.ndjson --input-fd 3 3< q3.ndjson
+
+Each input row has brand, username, current_password and new_password (the
+CSV header row names the columns; NDJSON objects use them as keys). Rows
+are read only from stdin or the descriptor given with --input-fd, never from
+the command line, so passwords stay out of `ps` and shell history. The
+input is read as rotations finish, so at most --max-pending rows are held in
+memory whatever the file size.
+
+Each row is checked like a /change-password request: brand, username, the
+brand's password policy and, when configured, the breached-password filter.
+Then `reset_password` makes the same `newpassword` logon the web app does,
+failing over to the brand's other addresses on connect-phase errors. At
+most --concurrency rotations run per brand at a time.
+
+Every outcome is appended to --results as one JSON line (without passwords)
+and to the audit log in the web app's format. The results file is also the
+checkpoint: rerun with the same file to skip accounts it already records,
+and add --retry-failed to try the failures again. Each row is recorded as
+IN_PROGRESS just before its logon. A rerun always retries rows an
+interrupted run left IN_PROGRESS, and if such a row fails with ORA-01017
+(Oracle may have committed the change before the interruption) the new
+password is checked and the row recorded as done when it is in effect. Other
+ORA-01017 failures cost only the one failed logon, so a wrong current
+password does not bring the account closer to lockout.
+
+A row that fails for any reason is recorded as FAILED and the other rows
+carry on. An account that appears twice in the input is rotated once; later
+rows for it are skipped with a warning on stderr.
+
+Exit status is 1 if any row failed.
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TextIO
+
+from pydantic import ValidationError
+
+from app.config import brand_registry, settings
+from app.models import PasswordChangeRequest
+from app.services.audit import AuditLogger, create_audit_logger
+from app.services.breached_passwords import BreachedPasswordFilter, create_breached_password_filter
+from app.services.connect_params import ConnectParamsCache
+from app.services.failover import Failover, create_failover
+from app.services.oracle import ORA_INVALID_CREDENTIALS, OracleServiceError, reset_password, verify_credentials
+
+ALREADY_ROTATED_MESSAGE = "New password was already in effect."
+
+
+def read_rows(stream: TextIO, fmt: str = "auto") -> Iterator[tuple[int, object]]:
+    """Yield (row number, row) lazily; rows that are not valid JSON are yielded as None.
+
+    "auto" reads NDJSON when the first line starts with "{" and CSV otherwise.
+    """
+    first = stream.readline()
+    if fmt == "auto":
+        fmt = "ndjson" if first.lstrip().startswith("{") else "csv"
+    lines = itertools.chain([first], stream)
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(lines), 1)
+        return
+    numbered = enumerate((line for line in lines if line.strip()), 1)
+    for number, line in numbered:
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError:
+            yield number, None
+
+
+def _account(row: object) -> tuple[str, str]:
+    """(brand, username) of a row, as far as it has them, for results and the checkpoint."""
+    if not isinstance(row, dict):
+        return "", ""
+    return str(row.get("brand") or ""), str(row.get("username") or "")
+
+
+def load_checkpoint(path: Path) -> dict[tuple[str, str], str]:
+    """Last recorded status for each (brand, username) in a results file; empty if it does not exist."""
+    done = {}
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by a crash; that row is simply redone
+                if not isinstance(result, dict):
+                    continue
+                brand, user, status = result.get("brand"), result.get("user"), result.get("status")
+                if brand and user and status:
+                    done[brand, user] = status
+    return done
+
+
+class ResultWriter:
+    """Appends one JSON line per finished row and syncs it, so a crash loses no recorded outcome."""
+
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, result: dict) -> None:
+        self._file.write(json.dumps(result, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def _reset_in_thread(username: str, current_password: str, new_password: str, target) -> str:
+    return await asyncio.to_thread(reset_password, username, current_password, new_password, target)
+
+
+async def _verify_in_thread(username: str, password: str, target) -> str:
+    return await asyncio.to_thread(verify_credentials, username, password, target)
+
+
+class PasswordRotator:
+    """Validates and rotates one row at a time, at most `concurrency` logons per brand."""
+
+    def __init__(
+        self,
+        connect_params: ConnectParamsCache,
+        failover: Failover,
+        audit_logger: AuditLogger,
+        breached_passwords: BreachedPasswordFilter | None = None,
+        concurrency: int = 4,
+    ) -> None:
+        self._connect_params = connect_params
+        self._failover = failover
+        self._audit_logger = audit_logger
+        self._breached_passwords = breached_passwords
+        self._limits: dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(concurrency))
+
+    async def rotate(
+        self, number: int, row: object, checkpoint: ResultWriter | None = None, resume: bool = False
+    ) -> dict:
+        """Rotate one row and audit it; return its result record (never containing a password).
+
+        With `checkpoint`, an IN_PROGRESS record is written there before the
+        logon. `resume` marks a row an interrupted run left IN_PROGRESS.
+        """
+        brand, user = _account(row)
+        result = {"row": number, "brand": brand, "user": user}
+        start = time.perf_counter()
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("Row is not a JSON object.")
+            request = PasswordChangeRequest.model_validate(row)
+            if self._breached_passwords is not None:
+                self._breached_passwords.ensure_not_breached(request.new_password)
+            async with self._limits[request.brand]:
+                if checkpoint is not None:
+                    checkpoint.write({**result, "status": "IN_PROGRESS"})
+                result["message"] = await self._change(request, resume)
+            result["status"] = "SUCCESS"
+        except ValidationError as e:
+            result["status"] = "FAILED"
+            result["reason"] = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+                for error in e.errors()
+            )
+        except ValueError as e:
+            result["status"] = "FAILED"
+            result["reason"] = str(e)
+        except Exception as e:
+            # An error the Oracle service does not map (say, a driver InterfaceError) fails this row only.
+            result["status"] = "FAILED"
+            result["reason"] = f"{type(e).__name__}: {e}"
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        await self._audit_logger.log_async(
+            result["status"],
+            brand=brand,
+            user=user,
+            ip=None,
+            reason=result.get("reason"),
+            latency_ms=result["latency_ms"],
+        )
+        return result
+
+    async def _change(self, request: PasswordChangeRequest, resume: bool) -> str:
+        """Change the password; when resuming, ORA-01017 succeeds if the new password is already in effect."""
+        targets = self._connect_params.targets(request.brand)
+        try:
+            return await self._failover.call(
+                targets, _reset_in_thread, False, request.username, request.current_password, request.new_password
+            )
+        except OracleServiceError as e:
+            if not resume or e.code != ORA_INVALID_CREDENTIALS:
+                raise
+            try:
+                await self._failover.call(targets, _verify_in_thread, True, request.username, request.new_password)
+            except ValueError:
+                raise e from None
+            return ALREADY_ROTATED_MESSAGE
+
+
+async def rotate_all(
+    rows: Iterator[tuple[int, object]],
+    rotator: PasswordRotator,
+    results: ResultWriter,
+    done: dict[tuple[str, str], str],
+    retry_failed: bool = False,
+    max_pending: int = 1000,
+) -> Counter:
+    """Rotate every row not already done, reading ahead at most `max_pending` rows; return counts by status.
+
+    Rows `done` records as IN_PROGRESS are always retried, with `resume` set.
+    A later row for an account already scheduled in this run is skipped with a
+    warning: its current password would no longer be valid once the first row
+    ran, and the failed logon would count towards the account's lockout.
+    """
+    counts = Counter()
+    pending = asyncio.Semaphore(max_pending)
+    tasks = set()
+    scheduled: dict[tuple[str, str], int] = {}
+
+    async def run(number: int, row: object, resume: bool) -> None:
+        try:
+            result = await rotator.rotate(number, row, checkpoint=results, resume=resume)
+            results.write(result)
+            counts[result["status"]] += 1
+        finally:
+            pending.release()
+
+    while (item := await asyncio.to_thread(next, rows, None)) is not None:
+        number, row = item
+        status = done.get(_account(row))
+        if status == "SUCCESS" or (status == "FAILED" and not retry_failed):
+            counts["SKIPPED"] += 1
+            continue
+        account = _account(row)
+        if all(account):
+            if account in scheduled:
+                brand, username = account
+                print(
+                    f"row {number}: skipped, {brand}/{username} is already rotated by row {scheduled[account]}",
+                    file=sys.stderr,
+                )
+                counts["SKIPPED"] += 1
+                continue
+            scheduled[account] = number
+        await pending.acquire()
+        task = asyncio.create_task(run(number, row, status == "IN_PROGRESS"))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    return counts
+
+
+async def _run(
+    args: argparse.Namespace,
+    rows: Iterator[tuple[int, object]],
+    rotator: PasswordRotator,
+    results: ResultWriter,
+    done: dict[tuple[str, str], str],
+) -> Counter:
+    """Size the thread pool for every brand's logons at once, then rotate."""
+    workers = args.concurrency * max(len(list(brand_registry)), 1) + 1
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(workers, thread_name_prefix="rotate"))
+    return await rotate_all(rows, rotator, results, done, args.retry_failed, args.max_pending)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--results", type=Path, required=True, help="results file, also the resume checkpoint")
+    parser.add_argument("--input-fd", type=int, default=0, help="descriptor to read rows from (default: stdin)")
+    parser.add_argument("--format", choices=("auto", "csv", "ndjson"), default="auto")
+    parser.add_argument("--concurrency", type=int, default=4, help="rotations in flight per brand")
+    parser.add_argument("--max-pending", type=int, default=1000, help="rows read ahead of finished rotations")
+    parser.add_argument("--retry-failed", action="store_true", help="retry rows the results file records as failed")
+    parser.add_argument("--audit-log", default=settings.audit_log_path, help="audit log (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.max_pending < 1:
+        parser.error("--concurrency and --max-pending must be at least 1")
+    if os.isatty(args.input_fd):
+        parser.error(f"descriptor {args.input_fd} is a terminal; redirect the CSV or NDJSON file into it")
+
+    done = load_checkpoint(args.results)
+    audit_logger = create_audit_logger(settings.model_copy(update={"audit_log_path": args.audit_log}))
+    rotator = PasswordRotator(
+        ConnectParamsCache(settings),
+        create_failover(settings),
+        audit_logger,
+        create_breached_password_filter(settings),
+        args.concurrency,
+    )
+    results = ResultWriter(args.results)
+    audit_logger.start()
+    try:
+        with open(args.input_fd, encoding="utf-8", newline="", closefd=False) as stream:
+            counts = asyncio.run(_run(args, read_rows(stream, args.format), rotator, results, done))
+    finally:
+        results.close()
+        audit_logger.stop()
+    summary = ", ".join(f"{status.lower()} {counts[status]}" for status in ("SUCCESS", "FAILED", "SKIPPED"))
+    print(f"{summary} (results in {args.results})", file=sys.stderr)
+    if counts["FAILED"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
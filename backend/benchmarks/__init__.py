@@ -0,0 +1,6 @@
+import os
+
+# Benchmarks import app modules that build Settings at import time; give them
+# placeholder DSNs so they run without a .env, as tests/conftest.py does.
+os.environ.setdefault("ORACLE_DSN_AVIS", "localhost:1521/avis_benchdb")
+os.environ.setdefault("ORACLE_DSN_BUDGET", "localhost:1521/budget_benchdb")
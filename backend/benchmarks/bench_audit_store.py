@@ -0,0 +1,97 @@
+"""Benchmark: AuditStore query latency over a large synthetic audit history.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_audit_store --events 10000000
+
+Events are spread over 180 days across 50k users and 20k IPs. The index is
+built once in a temporary directory (or reused with --index), then each query
+shape is timed.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.audit_store import AuditEvent, AuditStore
+
+STATUSES = ("VERIFY_SUCCESS", "VERIFY_FAILED", "SUCCESS", "FAILED")
+START_MS = 1735689600000  # 2025-01-01T00:00:00Z
+SPAN_MS = 180 * 86_400_000
+DAY_MS = 86_400_000
+
+
+def populate(store: AuditStore, events: int, users: int, ips: int) -> None:
+    """Insert `events` random events in batches."""
+    rng = random.Random(42)
+    batch = []
+    for _ in range(events):
+        batch.append(AuditEvent(
+            ts=START_MS + rng.randrange(SPAN_MS),
+            status=rng.choice(STATUSES),
+            brand=rng.choice(("avis", "budget")),
+            user=f"USER{rng.randrange(users)}",
+            ip=f"10.{rng.randrange(ips) // 256}.{rng.randrange(ips) % 256}.1",
+            latency_ms=rng.uniform(20, 400),
+        ))
+        if len(batch) == 50_000:
+            store.insert(batch)
+            batch.clear()
+    if batch:
+        store.insert(batch)
+
+
+def timed(fn, repeats: int) -> tuple[float, float]:
+    """Return (median, max) milliseconds over `repeats` calls of `fn`."""
+    samples = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--ips", type=int, default=20_000)
+    parser.add_argument("--index", help="reuse an existing index instead of building one")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.index or os.path.join(tmp, "audit_index.db")
+        store = AuditStore(path)
+        if not args.index:
+            start = time.perf_counter()
+            populate(store, args.events, args.users, args.ips)
+            print(f"built index with {args.events:,} events in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(7)
+        day = lambda: START_MS + rng.randrange(SPAN_MS // DAY_MS) * DAY_MS  # noqa: E731
+        shapes = {
+            "user+brand, one day": lambda i: store.query(
+                user=f"USER{rng.randrange(args.users)}", brand="budget", since=(d := day()), until=d + DAY_MS
+            ),
+            "user, all time": lambda i: store.query(user=f"USER{rng.randrange(args.users)}"),
+            "ip, one week": lambda i: store.query(
+                ip=f"10.{rng.randrange(args.ips) // 256}.{rng.randrange(args.ips) % 256}.1",
+                since=(d := day()), until=d + 7 * DAY_MS,
+            ),
+            "per-minute counts, one hour": lambda i: store.counts_per_minute(
+                since=(d := day()), until=d + 3_600_000
+            ),
+        }
+        print(f"{'query':<30} {'median ms':>10} {'max ms':>10}")
+        for name, fn in shapes.items():
+            median, worst = timed(fn, args.repeats)
+            print(f"{name:<30} {median:>10.2f} {worst:>10.2f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark: build time, lookup latency and per-worker RSS of the breached-password filter.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_breached_filter --entries 1000000
+
+Random SHA-1 digests stand in for a breach list; lookups report the best of
+three passes, with a Python set lookup as a floor for interpreter overhead. RSS is read from
+/proc/self/status (Linux): RssAnon is private memory, RssFile is mapped file
+pages, which are shared between every worker mapping the same filter. A
+Python set of the same digests is measured for comparison.
+"""
+
+import argparse
+import gc
+import hashlib
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.breached_passwords import BreachedPasswordFilter, CuckooFilterBuilder
+
+
+def rss_kib() -> dict[str, int]:
+    """Return RssAnon and RssFile of this process in KiB."""
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def digests(count: int, seed: int) -> list[bytes]:
+    rng = random.Random(seed)
+    return [rng.randbytes(20) for _ in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    args = parser.parse_args()
+
+    listed = digests(args.entries, seed=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "breached.filter")
+
+        start = time.perf_counter()
+        builder = CuckooFilterBuilder(path, args.entries)
+        for digest in listed:
+            builder.add_digest(digest)
+        builder.close()
+        build_seconds = time.perf_counter() - start
+        size_mib = os.path.getsize(path) / 2**20
+        print(f"build: {args.entries} entries in {build_seconds:.1f}s "
+              f"({build_seconds / args.entries * 1e6:.2f} us/entry), file {size_mib:.1f} MiB")
+
+        probes = digests(args.lookups, seed=2)
+        passwords = [f"candidate-password-{i}" for i in range(args.lookups)]
+        gc.collect()
+        before = rss_kib()
+        breached = BreachedPasswordFilter(path)
+        for label, items, lookup in (
+            ("miss (digest)", probes, breached.contains_digest),
+            ("hit (digest)", listed[: args.lookups], breached.contains_digest),
+            ("password (sha1 + lookup)", passwords, breached.__contains__),
+        ):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                for item in items:
+                    lookup(item)
+                best = min(best, time.perf_counter() - start)
+            print(f"lookup {label:26s} {best / len(items) * 1e9:8.0f} ns")
+        after = rss_kib()
+        false_positives = sum(breached.contains_digest(d) for d in probes)
+        print(f"false positives: {false_positives}/{len(probes)}")
+        print(f"filter RSS: anon +{after['RssAnon'] - before['RssAnon']} KiB, "
+              f"shared file pages +{after['RssFile'] - before['RssFile']} KiB")
+        breached.close()
+
+    before = rss_kib()
+    as_set = {hashlib.sha1(d).digest() for d in listed}
+    after = rss_kib()
+    start = time.perf_counter()
+    for digest in probes:
+        digest in as_set
+    elapsed = time.perf_counter() - start
+    print(f"python set of {len(as_set)} digests: {elapsed / len(probes) * 1e9:.0f} ns/lookup, "
+          f"anon +{after['RssAnon'] - before['RssAnon']} KiB (private per worker)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: avis latency while the budget database is slow, with and without bulkheads.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_bulkheads
+
+Logons go to benchmarks.oracle_sim, which answers avis in --fast-ms and
+budget in --slow-seconds. A burst of budget verifies is fired at once while
+avis verifies arrive at a steady rate; the run is done once with the default
+per-brand bulkheads and once with effectively unbounded ones. Reported: avis latency percentiles, the peak number of
+concurrent budget sessions and how the budget burst was answered.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "bench_audit.log"))
+
+from httpx import AsyncClient  # noqa: E402
+
+from app import main as app_main  # noqa: E402
+from app.config import brand_registry  # noqa: E402
+from app.services.bulkhead import Bulkhead, BulkheadLimits  # noqa: E402
+from benchmarks.load import admit_one_address, app_client  # noqa: E402
+from benchmarks.oracle_sim import LogonProfile, SimulatedOracle, brand_of_app_targets  # noqa: E402
+from benchmarks.report import percentile  # noqa: E402
+
+
+async def run(args: argparse.Namespace, limits: BulkheadLimits) -> None:
+    for brand in app_main.bulkheads:
+        app_main.bulkheads[brand] = Bulkhead(brand, limits)
+    oracle = SimulatedOracle(
+        {
+            "avis": LogonProfile(median_ms=args.fast_ms, sigma=0),
+            "budget": LogonProfile(median_ms=args.slow_seconds * 1000, sigma=0),
+        },
+        brand_of_app_targets(app_main.connect_params, brand_registry),
+    )
+
+    async def verify(client: AsyncClient, brand: str, i: int) -> tuple[int, float]:
+        start = time.perf_counter()
+        res = await client.post(
+            "/verify-credentials", json={"brand": brand, "username": f"user{i}", "current_password": "tiger"}
+        )
+        return res.status_code, (time.perf_counter() - start) * 1000
+
+    with oracle.installed():
+        async with app_client(app_main, "http://bench") as client:
+            burst = [asyncio.ensure_future(verify(client, "budget", i)) for i in range(args.budget_requests)]
+            avis = []
+            for i in range(args.avis_requests):
+                avis.append(asyncio.ensure_future(verify(client, "avis", i)))
+                await asyncio.sleep(args.avis_interval_ms / 1000)
+            avis_results = await asyncio.gather(*avis)
+            burst_results = await asyncio.gather(*burst)
+
+    latencies = sorted(ms for _, ms in avis_results)
+    p50 = percentile(latencies, 50)
+    p99 = percentile(latencies, 99)
+    outcomes = Counter(status for status, _ in burst_results)
+    print(
+        f"  avis p50 {p50:7.1f} ms  p99 {p99:7.1f} ms | budget peak sessions {oracle.peak_sessions['budget']:4d} | "
+        f"budget burst responses {dict(sorted(outcomes.items()))}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-requests", type=int, default=500)
+    parser.add_argument("--avis-requests", type=int, default=200)
+    parser.add_argument("--avis-interval-ms", type=float, default=5)
+    parser.add_argument("--fast-ms", type=float, default=20)
+    parser.add_argument("--slow-seconds", type=float, default=3)
+    args = parser.parse_args()
+    admit_one_address(app_main)
+
+    print("per-brand bulkheads (defaults):")
+    asyncio.run(run(args, BulkheadLimits()))
+    print("unbounded:")
+    asyncio.run(run(args, BulkheadLimits(max_concurrent=10**6, max_queue=10**6)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: logon latency with per-request DSN resolution versus cached ConnectParams.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_connect_params
+
+A fake listener on 127.0.0.1 accepts each TCP connection and closes it
+immediately, so every attempt covers the client-side work (DSN parsing,
+tnsnames lookup, socket connect) up to the first protocol read and then
+fails. That client-side share is what the cache removes; the database's own
+logon time is the same in both cases and is left out.
+"""
+
+import argparse
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import oracledb
+
+from app.config import Settings
+from app.services.connect_params import ConnectParamsCache
+
+
+def start_fake_listener() -> int:
+    """Accept-and-close TCP server in a daemon thread; return its port."""
+    server = socket.create_server(("127.0.0.1", 0), backlog=128)
+
+    def serve() -> None:
+        while True:
+            conn, _ = server.accept()
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+
+def attempt(**kwargs) -> float:
+    """Time one connect attempt (expected to fail) in microseconds."""
+    start = time.perf_counter()
+    try:
+        oracledb.connect(user="scott", password="tiger", **kwargs)
+    except oracledb.Error:
+        pass
+    return (time.perf_counter() - start) * 1_000_000
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    """Return (p50, p99) of the samples."""
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    port = start_fake_listener()
+    easy_connect = f"127.0.0.1:{port}/avis_service"
+    with tempfile.TemporaryDirectory() as config_dir:
+        (Path(config_dir) / "tnsnames.ora").write_text(
+            f"AVIS = (DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST=127.0.0.1)(PORT={port}))"
+            "(CONNECT_DATA=(SERVICE_NAME=avis_service)))\n"
+        )
+        easy_cache = ConnectParamsCache(Settings(
+            _env_file=None, oracle_dsn_avis=easy_connect, oracle_dsn_budget=easy_connect,
+        ))
+        tns_cache = ConnectParamsCache(Settings(
+            _env_file=None, oracle_dsn_avis="AVIS", oracle_dsn_budget="AVIS", oracle_config_dir=config_dir,
+        ))
+        cases = {
+            "easy connect, per request": lambda: attempt(dsn=easy_connect, tcp_connect_timeout=10.0),
+            "easy connect, cached": lambda: attempt(params=easy_cache.get("avis")),
+            "tnsnames alias, per request": lambda: attempt(dsn="AVIS", config_dir=config_dir, tcp_connect_timeout=10.0),
+            "tnsnames alias, cached": lambda: attempt(params=tns_cache.get("avis")),
+        }
+
+        print(f"{'case':<30} {'p50 us':>10} {'p99 us':>10}")
+        for name, case in cases.items():
+            for _ in range(50):
+                case()
+            p50, p99 = percentiles([case() for _ in range(args.iterations)])
+            print(f"{name:<30} {p50:>10.1f} {p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
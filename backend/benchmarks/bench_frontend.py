@@ -0,0 +1,108 @@
+"""Benchmark: what a browser fetches to load the frontend, first and repeat visit.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_frontend
+
+The frontend is built into a temporary directory and served through the
+app in-process. Reported for a first visit (empty cache) and a repeat visit
+(index.html revalidated with its ETag, hashed assets taken from cache): the
+requests made, the response body bytes with and without compression, and the
+server time. Then a verify call made cross-origin, which needs a CORS
+preflight, is compared with the same call made same-origin. Network round
+trips are not simulated: on a real link each request on the critical path
+also costs at least one RTT.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "bench_audit.log"))
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app import main as app_main  # noqa: E402
+from app.services.static_assets import StaticAssets  # noqa: E402
+from app.tools.build_frontend import build  # noqa: E402
+
+FRONTEND = Path(__file__).resolve().parents[2] / "frontend"
+VERIFY_BODY = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+
+
+async def visit(client: AsyncClient, encoding: str, etags: dict[str, str]) -> tuple[int, int, float]:
+    """Load the page like a browser; return (requests, response body bytes, server ms)."""
+    headers = {"Accept-Encoding": encoding}
+    requests, wire, start = 0, 0, time.perf_counter()
+    page = await client.get("/", headers={**headers, "If-None-Match": etags.get("/", "")})
+    requests += 1
+    wire += int(page.headers.get("Content-Length", 0))
+    etags["/"] = page.headers["ETag"]
+    if page.status_code == 200:
+        for path in re.findall(r'(?:href|src)="(assets/[^"]+)"', page.text):
+            asset = await client.get(f"/{path}", headers=headers)
+            requests += 1
+            wire += int(asset.headers["Content-Length"])
+    for path in ("/brands", "/password-policy"):
+        res = await client.get(path, headers=headers)
+        requests += 1
+        wire += int(res.headers["Content-Length"])
+    return requests, wire, (time.perf_counter() - start) * 1000
+
+
+async def verify_ms(client: AsyncClient, cross_origin: bool, rounds: int) -> float:
+    """Median server time of a verify call, with the CORS preflight a cross-origin page sends first."""
+    samples = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        if cross_origin:
+            await client.options(
+                "/verify-credentials",
+                headers={
+                    "Origin": "http://localhost:5500",
+                    "Access-Control-Request-Method": "POST",
+                    "Access-Control-Request-Headers": "content-type",
+                },
+            )
+        await client.post("/verify-credentials", json={**VERIFY_BODY, "username": f"user{i}"})
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as dist:
+        build(FRONTEND, Path(dist))
+        app_main.static_assets = StaticAssets(dist)
+        async with AsyncClient(transport=ASGITransport(app=app_main.app), base_url="http://bench") as client:
+            for label, encoding in (("compressed", "gzip, deflate, br"), ("identity", "identity")):
+                etags: dict[str, str] = {}
+                first = await visit(client, encoding, etags)
+                repeat = await visit(client, encoding, etags)
+                for name, (requests, wire, ms) in (("first visit", first), ("repeat visit", repeat)):
+                    print(f"  {label:10s} {name:12s} {requests} requests  {wire:7d} body bytes  {ms:6.1f} ms server")
+
+            conn = MagicMock()
+            conn.close = AsyncMock()
+            with patch("app.services.oracle.oracledb.connect_async", new_callable=AsyncMock, return_value=conn):
+                cross = await verify_ms(client, True, args.rounds)
+                same = await verify_ms(client, False, args.rounds)
+            print(f"  verify, cross-origin (OPTIONS + POST): {cross:6.2f} ms server, 2 round trips")
+            print(f"  verify, same-origin (POST):            {same:6.2f} ms server, 1 round trip")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="verify calls per variant")
+    args = parser.parse_args()
+    app_main.rate_limiter.enabled = False
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
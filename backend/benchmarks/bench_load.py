@@ -0,0 +1,144 @@
+"""Benchmark: verify→reset sessions at a fixed arrival rate against a simulated Oracle.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_load --rate 50 --duration 30 --output load.json
+    uv run python -m benchmarks.bench_load --rate 50 --duration 30 --compare load.json
+
+The app runs in-process with its real bulkheads, breakers, failover, token
+store and audit log; only `oracledb.connect_async` is replaced, by
+benchmarks.oracle_sim. Logon latency is log-normal (--median-ms, --sigma,
+per brand with --brand-median-ms), a share of logons fail with the ORA codes
+in --error-mix, and --hang-rate of them hang for --hang-seconds before
+timing out. The app's lifespan runs around the load, so audit records are
+written and open breakers are probed as in production. Sessions arrive
+open-loop (see benchmarks.load). Every session comes from one address, so
+the rate limiter and the per-IP failure threshold are disabled.
+
+Printed: per endpoint and brand, requests, throughput, p50/p95/p99 latency
+and outcomes. --output saves the report as JSON; --compare checks this run
+against a saved report and exits 1 if any group got slower, slower to serve
+or less successful by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "bench_audit.log"))
+
+from app import main as app_main  # noqa: E402
+from app.config import brand_registry  # noqa: E402
+from benchmarks import report  # noqa: E402
+from benchmarks.load import LoadDriver, LoadPlan, admit_one_address, app_client  # noqa: E402
+from benchmarks.oracle_sim import LogonProfile, SimulatedOracle, brand_of_app_targets  # noqa: E402
+
+DEFAULT_ERROR_MIX = "1017=0.03,28003=0.01,28007=0.01,12541=0.005"
+
+
+def parse_pairs(text: str, key=str) -> dict:
+    """Parse "a=1,b=2.5" into {key("a"): 1.0, key("b"): 2.5}."""
+    pairs = {}
+    for item in filter(None, text.split(",")):
+        name, _, value = item.partition("=")
+        pairs[key(name.strip())] = float(value)
+    return pairs
+
+
+async def run(args: argparse.Namespace, plan: LoadPlan, oracle: SimulatedOracle) -> tuple[LoadDriver, float]:
+    with oracle.installed():
+        async with app_client(app_main, "http://bench", timeout=None) as client:
+            driver = LoadDriver(client, plan)
+            elapsed = await driver.run()
+    return driver, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20, help="sessions started per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds over which sessions start")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced")
+    parser.add_argument("--brand-weights", default="", help='share of sessions per brand, e.g. "avis=3,budget=1"')
+    parser.add_argument("--think-ms", type=float, default=500, help="mean pause between verify and reset")
+    parser.add_argument("--change-fraction", type=float, default=0.0, help="share of sessions using /change-password")
+    parser.add_argument("--median-ms", type=float, default=20, help="median logon latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal shape of logon latency (0: constant)")
+    parser.add_argument("--brand-median-ms", default="", help='per-brand median overrides, e.g. "budget=300"')
+    parser.add_argument("--error-mix", default=DEFAULT_ERROR_MIX, help="ORA code=probability pairs")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of logons that hang")
+    parser.add_argument(
+        "--hang-seconds",
+        type=float,
+        default=app_main.settings.oracle_tcp_connect_timeout,
+        help="how long a hung logon takes to time out (default: ORACLE_TCP_CONNECT_TIMEOUT)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="save the report as JSON")
+    parser.add_argument("--compare", type=Path, help="baseline report to check this run against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    brands = list(brand_registry)
+    weights = parse_pairs(args.brand_weights) or {brand: 1.0 for brand in brands}
+    medians = parse_pairs(args.brand_median_ms)
+    unknown = (set(weights) | set(medians)) - set(brands)
+    if unknown:
+        parser.error(f"unknown brands {sorted(unknown)}; configured: {brands}")
+    try:
+        errors = parse_pairs(args.error_mix, key=int)
+        profiles = {
+            brand: LogonProfile(
+                median_ms=medians.get(brand, args.median_ms),
+                sigma=args.sigma,
+                errors=errors,
+                hang_rate=args.hang_rate,
+                hang_seconds=args.hang_seconds,
+            )
+            for brand in brands
+        }
+    except ValueError as e:
+        parser.error(str(e))
+
+    plan = LoadPlan(
+        rate=args.rate,
+        duration=args.duration,
+        brand_weights=weights,
+        think_ms=args.think_ms,
+        change_fraction=args.change_fraction,
+        poisson=args.poisson,
+        seed=args.seed,
+    )
+    oracle = SimulatedOracle(profiles, brand_of_app_targets(app_main.connect_params, brands), seed=args.seed)
+    admit_one_address(app_main)
+    driver, elapsed = asyncio.run(run(args, plan, oracle))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+    result = report.build_report(
+        driver.samples,
+        elapsed,
+        config,
+        late_starts=driver.late_starts,
+        peak_sessions=dict(oracle.peak_sessions),
+        logons={f"{brand} {outcome}": count for (brand, outcome), count in sorted(oracle.outcomes.items())},
+    )
+    print(report.format_table(result))
+    print(f"\n{elapsed:.1f} s wall, {driver.late_starts} late session starts, peak sessions {result['peak_sessions']}")
+    if driver.late_starts:
+        print("  late starts mean the driver could not keep the arrival rate; latencies understate the load")
+    if args.output:
+        report.save(result, args.output)
+        print(f"wrote {args.output}")
+    if args.compare:
+        regressions = report.compare(report.load(args.compare), result, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Benchmark: replay a recorded audit log at increasing speed to find where the service saturates.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_replay reset_audit.log.1 reset_audit.log --speedup 10 25 50 100
+    uv run python -m benchmarks.bench_replay reset_audit.log --since 2025-01-28T08:00 --until 2025-01-28T10:00 \\
+        --speedup 10 50 --url http://staging:8000 --output replay.json
+
+The audit log is read as a stream (give rotated files oldest first) and the
+requests it records are replayed open-loop at each --speedup in turn, as
+described in benchmarks.replay. By default they go to the app in-process,
+with logons answered by the simulated Oracle of benchmarks.oracle_sim
+(--median-ms, --sigma, --brand-median-ms, --error-mix, --hang-rate) and the
+app's lifespan running. The driver shares the event loop with the app there,
+so the limits found are those of one worker. With --url they go to a running
+instance instead. Run that instance with RATE_LIMIT_PER_IP and
+RATE_LIMIT_PER_USER raised and FAILURE_THRESHOLD_IP=0, since every request
+comes from this host, and with SERVER_TIMING_SAMPLE_RATE=1 so it reports
+queueing delay. Usernames are replaced by synthetic ones and passwords are
+placeholders, so against real databases every logon fails as an unknown
+user; point --url at an instance backed by simulated or scratch databases.
+
+Reported for each speedup: offered and achieved request rate, latency
+percentiles, the bulkhead queueing delay, and the share of requests
+rejected (429/503), unavailable (transient errors, open breaker) or
+failed outright, with how far into the replay the first of those came. Then
+the saturation point: the first speedup whose p95 queueing delay exceeds
+--max-queue-ms or which completes less than 90% of the offered rate. Last,
+the error onset: the first speedup whose overload share exceeds
+--max-overload-ratio.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import os
+import tempfile
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "bench_audit.log"))
+
+import httpx  # noqa: E402
+
+from app import main as app_main  # noqa: E402
+from app.config import brand_registry  # noqa: E402
+from app.services.audit_store import to_epoch_ms  # noqa: E402
+from benchmarks import report  # noqa: E402
+from benchmarks.bench_load import parse_pairs  # noqa: E402
+from benchmarks.load import admit_one_address, app_client  # noqa: E402
+from benchmarks.oracle_sim import LogonProfile, SimulatedOracle, brand_of_app_targets  # noqa: E402
+from benchmarks.replay import Replayer, arrivals, find_limits, level_summary  # noqa: E402
+
+
+def _timestamp(value: str) -> int:
+    try:
+        return to_epoch_ms(datetime.fromisoformat(value))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid ISO timestamp: {value!r}") from e
+
+
+def _lines(paths: list[Path]) -> Iterator[str]:
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            yield from f
+
+
+def _client(args: argparse.Namespace) -> contextlib.AbstractAsyncContextManager[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    if args.url:
+        return httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+    return app_client(app_main, "http://replay", timeout=args.timeout, limits=limits)
+
+
+async def replay_levels(args: argparse.Namespace, brands: frozenset[str]) -> list[dict]:
+    levels = []
+    async with _client(args) as client:
+        for speedup in args.speedup:
+            replayer = Replayer(client, speedup)
+            stream = arrivals(_lines(args.logs), args.since, args.until, brands)
+            elapsed = await replayer.run(itertools.islice(stream, args.limit))
+            level = level_summary(replayer, elapsed)
+            level["groups"] = report.summarize(replayer.samples, elapsed)
+            levels.append(level)
+            print(_format_level(level), flush=True)
+    return levels
+
+
+async def _remote_brands(args: argparse.Namespace) -> frozenset[str]:
+    async with _client(args) as client:
+        res = await client.get("/brands")
+        res.raise_for_status()
+        return frozenset(brand["name"] for brand in res.json())
+
+
+def _format_level(level: dict) -> str:
+    queue = "n/a" if level["queue_p95_ms"] is None else f"{level['queue_p95_ms']:.1f}"
+    offered, achieved = level["offered_rps"] or 0.0, level["achieved_rps"] or 0.0
+    return (
+        f"{level['speedup']:>7g}x {level['requests']:8d} {offered:9.1f} {achieved:9.1f} "
+        f"{level['p50_ms']:8.1f} {level['p99_ms']:8.1f} {queue:>9s} {level['overload_ratio']:9.2%}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="+", type=Path, help="audit log files, oldest first")
+    parser.add_argument("--speedup", nargs="+", type=float, default=[10, 50], help="time compression factors")
+    parser.add_argument("--since", type=_timestamp, help="replay arrivals from (ISO date or datetime)")
+    parser.add_argument("--until", type=_timestamp, help="replay arrivals before (ISO date or datetime)")
+    parser.add_argument("--limit", type=int, help="replay at most this many requests per level")
+    parser.add_argument("--url", help="base URL of a running instance (default: the app in-process)")
+    parser.add_argument("--timeout", type=float, default=30, help="client timeout per request in seconds")
+    parser.add_argument("--median-ms", type=float, default=20, help="simulated median logon latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal shape of simulated logon latency")
+    parser.add_argument("--brand-median-ms", default="", help='per-brand median overrides, e.g. "budget=300"')
+    parser.add_argument("--error-mix", default="", help="simulated ORA code=probability pairs (default: none)")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of simulated logons that hang")
+    parser.add_argument("--max-queue-ms", type=float, default=100, help="p95 queueing delay taken as saturated")
+    parser.add_argument("--max-overload-ratio", type=float, default=0.01, help="overload share taken as error onset")
+    parser.add_argument("--output", type=Path, help="save the report as JSON")
+    args = parser.parse_args()
+    missing = [str(path) for path in args.logs if not path.is_file()]
+    if missing:
+        parser.error(f"no such audit log: {', '.join(missing)}")
+    args.speedup = sorted(args.speedup)
+
+    if args.url:
+        try:
+            brands = asyncio.run(_remote_brands(args))
+        except httpx.HTTPError as e:
+            parser.error(f"cannot list brands at {args.url}: {e}")
+        oracle = None
+    else:
+        brands = frozenset(brand_registry)
+        medians = parse_pairs(args.brand_median_ms)
+        try:
+            profile = {
+                "sigma": args.sigma,
+                "errors": parse_pairs(args.error_mix, key=int),
+                "hang_rate": args.hang_rate,
+                "hang_seconds": app_main.settings.oracle_tcp_connect_timeout,
+            }
+            profiles = {brand: LogonProfile(medians.get(brand, args.median_ms), **profile) for brand in brands}
+        except ValueError as e:
+            parser.error(str(e))
+        oracle = SimulatedOracle(profiles, brand_of_app_targets(app_main.connect_params, brands))
+        admit_one_address(app_main)
+        app_main.request_timing.sample_rate = 1.0
+
+    print(
+        f"{'speedup':>8s} {'requests':>8s} {'offered':>9s} {'achieved':>9s} {'p50 ms':>8s} {'p99 ms':>8s} "
+        f"{'queue p95':>9s} {'overload':>9s}"
+    )
+    if oracle is None:
+        levels = asyncio.run(replay_levels(args, brands))
+    else:
+        with oracle.installed():
+            levels = asyncio.run(replay_levels(args, brands))
+
+    limits = find_limits(levels, args.max_queue_ms, args.max_overload_ratio)
+    print()
+    if limits["saturation_speedup"] is None:
+        print(f"no saturation up to {args.speedup[-1]:g}x")
+    elif limits["max_sustained_rps"] is None:
+        print(f"already saturated at the lowest speedup, {limits['saturation_speedup']:g}x")
+    else:
+        print(f"saturates at {limits['saturation_speedup']:g}x; sustained {limits['max_sustained_rps']} req/s before")
+    if limits["error_onset_speedup"] is None:
+        print(f"no overload errors above {args.max_overload_ratio:.0%} up to {args.speedup[-1]:g}x")
+    else:
+        onset = next(level for level in levels if level["speedup"] == limits["error_onset_speedup"])
+        print(
+            f"overload errors from {limits['error_onset_speedup']:g}x, "
+            f"first {onset['first_overload_at_seconds']} s into the replay"
+        )
+    if any(level["late_sends"] for level in levels):
+        print("some requests were sent late: the driver could not keep up, so the offered rate is overstated")
+    if args.output:
+        config = {key: value for key, value in vars(args).items() if key != "output"}
+        config["logs"] = [str(path) for path in args.logs]
+        report.save({**report.metadata(config), "levels": levels, "limits": limits}, args.output)
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
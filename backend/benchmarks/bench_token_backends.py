@@ -0,0 +1,79 @@
+"""Benchmark: create+consume throughput of the verification token backends across worker processes.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_token_backends
+
+Each worker is a separate process, like `uvicorn --workers N`. The in-memory
+backend gives every worker its own private store (so a token issued by one
+worker cannot be consumed by another); the SQLite backend shares one WAL-mode
+database file between all of them.
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.sqlite_tokens import SQLiteVerificationTokenStore
+from app.services.verification_tokens import VerificationTokenBackend, VerificationTokenStore
+
+DEFAULT_WORKERS = (1, 4, 16)
+
+
+def _build(backend: str, db_path: str) -> VerificationTokenBackend:
+    """Create the backend under test inside a worker process."""
+    if backend == "sqlite":
+        return SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+    return VerificationTokenStore(ttl_seconds=300)
+
+
+def _worker(backend: str, db_path: str, duration: float, start_at: float, results) -> None:
+    """Run create+consume pairs until `duration` has elapsed and report the count."""
+    store = _build(backend, db_path)
+    while time.time() < start_at:
+        time.sleep(0.001)
+    deadline = time.perf_counter() + duration
+    ops = 0
+    while time.perf_counter() < deadline:
+        token = store.create_token("scott", "avis")
+        store.consume_token(token, "scott", "avis")
+        ops += 1
+    results.put(ops)
+
+
+def measure(backend: str, workers: int, duration: float) -> float:
+    """Return aggregate create+consume pairs per second across `workers` processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "tokens.db")
+        _build(backend, db_path)
+        results = multiprocessing.Queue()
+        start_at = time.time() + 0.5
+        procs = [
+            multiprocessing.Process(target=_worker, args=(backend, db_path, duration, start_at, results))
+            for _ in range(workers)
+        ]
+        for proc in procs:
+            proc.start()
+        total = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+    return total / duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'memory ops/s':>14} {'sqlite ops/s':>14}")
+    for workers in args.workers:
+        memory = measure("memory", workers, args.duration)
+        sqlite = measure("sqlite", workers, args.duration)
+        print(f"{workers:>8} {memory:>14,.0f} {sqlite:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
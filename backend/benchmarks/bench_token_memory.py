@@ -0,0 +1,79 @@
+"""Benchmark: bytes of memory per live verification token, old layout versus the current store.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.bench_token_memory
+
+Both stores are filled with --tokens live tokens for distinct users, with
+brand names arriving as fresh strings as they do from parsed request bodies.
+tracemalloc measures what stays allocated afterwards. The old layout is
+reproduced below as it was before tokens were bounded: the 43-character
+token string as key, a VerifiedCredential holding an aware datetime, and
+a (datetime, token) entry in an expiry heap. Usernames are allocated outside
+the measurement for both stores, since a real request owns them anyway.
+"""
+
+import argparse
+import gc
+import heapq
+import tracemalloc
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from secrets import token_urlsafe
+
+from app.services.verification_tokens import VerificationTokenStore
+
+
+@dataclass(slots=True)
+class _OldCredential:
+    brand: str
+    username: str
+    expires_at: datetime
+
+
+class OldLayoutStore:
+    """The in-memory token store's data layout before capacity and per-user replacement."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._tokens: dict[str, _OldCredential] = {}
+        self._expiry_heap: list[tuple[datetime, str]] = []
+
+    def create_token(self, username: str, brand: str) -> str:
+        token = token_urlsafe(32)
+        credential = _OldCredential(brand, username, datetime.now(UTC) + self._ttl)
+        self._tokens[token] = credential
+        heapq.heappush(self._expiry_heap, (credential.expires_at, token))
+        return token
+
+
+def bytes_per_token(store, tokens: int) -> float:
+    """Memory retained per token after issuing `tokens` tokens for distinct users."""
+    usernames = [f"service_user_{i:07d}" for i in range(tokens)]
+    brands = [b"avis" if i % 2 else b"budget" for i in range(tokens)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for username, brand in zip(usernames, brands):
+        store.create_token(username, brand.decode())
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return retained / tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100_000)
+    args = parser.parse_args()
+
+    old = bytes_per_token(OldLayoutStore(ttl_seconds=300), args.tokens)
+    new = bytes_per_token(VerificationTokenStore(ttl_seconds=300, capacity=args.tokens), args.tokens)
+    print(f"{'layout':>8} {'bytes/token':>12}")
+    print(f"{'old':>8} {old:>12.0f}")
+    print(f"{'current':>8} {new:>12.0f}   ({1 - new / old:.0%} less)")
+    print(f"at the default capacity of 100,000 tokens the store holds at most {new * 100_000 / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Open-loop load driver: verify→reset sessions against the ASGI app at a fixed arrival rate.
+
+Sessions start on a schedule that does not wait for earlier ones to finish,
+as real users do not, so a slow backend shows up as growing latency and
+queueing rather than as a quietly lower request rate. Each session is one
+user: verify the current password, pause to type the new one, then reset
+with the verification token. A fraction of sessions use /change-password
+instead, as clients collecting both passwords up front do.
+"""
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import AsyncIterator, Mapping
+from dataclasses import dataclass, field
+from types import ModuleType
+
+from httpx import ASGITransport, AsyncClient
+
+from app.services.failure_sketch import create_failure_tracker
+
+CURRENT_PASSWORD = "Tiger#2024pass"
+NEW_PASSWORD = "Lion#Rst2025%pw"  # passes even the ora12c_strong preset
+
+
+@dataclass(frozen=True)
+class Sample:
+    """One request: which endpoint and brand, how it was answered and how long it took."""
+
+    endpoint: str
+    brand: str
+    outcome: str
+    latency_ms: float
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    """What to send: `rate` sessions per second for `duration` seconds, split across brands by weight.
+
+    Arrivals are evenly spaced, or a Poisson process with the same mean when
+    `poisson` is set. Think time between verify and reset is exponential with
+    mean `think_ms`.
+    """
+
+    rate: float
+    duration: float
+    brand_weights: Mapping[str, float] = field(default_factory=lambda: {"avis": 1.0, "budget": 1.0})
+    think_ms: float = 500.0
+    change_fraction: float = 0.0
+    poisson: bool = False
+    seed: int | None = 0
+
+
+def admit_one_address(app_main: ModuleType) -> None:
+    """Stop the app shedding load by client address, since every simulated user comes from one.
+
+    The rate limiter is disabled and the failure tracker is rebuilt without its
+    per-IP threshold; otherwise the simulated ORA-1017s of all users add up
+    against 127.0.0.1 and trip it. The per-user threshold stays.
+    """
+    app_main.rate_limiter.enabled = False
+    app_main.failure_tracker = create_failure_tracker(app_main.settings.model_copy(update={"failure_threshold_ip": 0}))
+
+
+@contextlib.asynccontextmanager
+async def app_client(app_main: ModuleType, base_url: str, **kwargs) -> AsyncIterator[AsyncClient]:
+    """A client for the app in-process, with the app's lifespan running around it.
+
+    ASGITransport sends requests but not lifespan events, so without this the
+    audit writer, breaker probes and token sweeper would never start. On exit
+    the lifespan stops the audit writer, which first flushes queued records.
+    """
+    async with app_main.app.router.lifespan_context(app_main.app):
+        async with AsyncClient(transport=ASGITransport(app=app_main.app), base_url=base_url, **kwargs) as client:
+            yield client
+
+
+def outcome_of(status_code: int, body: dict | None) -> str:
+    """Classify a response: success or failed when answered (failures are reported in the body), else http_<status>."""
+    if status_code == 200 and body is not None:
+        return "success" if body.get("success") else "failed"
+    return f"http_{status_code}"
+
+
+class LoadDriver:
+    """Runs a LoadPlan through an httpx client and collects a Sample per request."""
+
+    def __init__(self, client: AsyncClient, plan: LoadPlan) -> None:
+        self.client = client
+        self.plan = plan
+        self.random = random.Random(plan.seed)
+        self.samples: list[Sample] = []
+        self.late_starts = 0
+
+    async def _post(self, endpoint: str, brand: str, payload: dict) -> dict | None:
+        start = time.perf_counter()
+        res = await self.client.post(endpoint, json=payload)
+        latency_ms = (time.perf_counter() - start) * 1000
+        body = res.json() if res.headers.get("content-type", "").startswith("application/json") else None
+        self.samples.append(Sample(endpoint, brand, outcome_of(res.status_code, body), latency_ms))
+        return body if res.status_code == 200 else None
+
+    async def session(self, brand: str, username: str, think_seconds: float, one_step: bool) -> None:
+        """One user's visit; stops after verify if the credentials are refused."""
+        credentials = {"brand": brand, "username": username, "current_password": CURRENT_PASSWORD}
+        if one_step:
+            await self._post("/change-password", brand, {**credentials, "new_password": NEW_PASSWORD})
+            return
+        verified = await self._post("/verify-credentials", brand, credentials)
+        if not verified or not verified.get("verification_token"):
+            return
+        await asyncio.sleep(think_seconds)
+        await self._post(
+            "/reset-password",
+            brand,
+            {**credentials, "new_password": NEW_PASSWORD, "verification_token": verified["verification_token"]},
+        )
+
+    def _arrivals(self) -> list[float]:
+        """Start offsets in seconds for every session in the plan."""
+        plan, offsets, at = self.plan, [], 0.0
+        while True:
+            at += self.random.expovariate(plan.rate) if plan.poisson else 1 / plan.rate
+            if at > plan.duration:
+                return offsets
+            offsets.append(at)
+
+    async def run(self) -> float:
+        """Drive the whole plan and wait for every session to finish; return the wall time in seconds."""
+        plan = self.plan
+        brands, weights = list(plan.brand_weights), list(plan.brand_weights.values())
+        tasks = []
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i, offset in enumerate(self._arrivals()):
+            delay = start + offset - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.01:
+                self.late_starts += 1
+            brand = self.random.choices(brands, weights)[0]
+            think = self.random.expovariate(1000 / plan.think_ms) if plan.think_ms else 0.0
+            one_step = self.random.random() < plan.change_fraction
+            tasks.append(asyncio.ensure_future(self.session(brand, f"load_user_{i}", think, one_step)))
+        await asyncio.gather(*tasks)
+        return loop.time() - start
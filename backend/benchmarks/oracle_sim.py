@@ -0,0 +1,144 @@
+"""Simulated Oracle logons for benchmarks: latency distributions, error mixes and hangs.
+
+`SimulatedOracle` stands in for `oracledb.connect_async` while installed, so
+the whole request path (bulkheads, breakers, failover, token store, audit)
+runs for real against a database that never leaves the process. Each brand
+gets a `LogonProfile`: a log-normal logon latency, a mix of ORA errors by
+probability, and a small chance of hanging until the connect timeout. Each
+logon draws from an RNG seeded with the run's seed, the user and how many
+logons that user has made, so a rerun gives every user the same answers
+however the concurrent requests interleave.
+"""
+
+import asyncio
+import contextlib
+import math
+import random
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import oracledb
+
+# Error codes the simulator can raise, with the driver's full code and message.
+SIMULATED_ERRORS = {
+    1017: ("ORA-01017", "invalid username/password; logon denied"),
+    28003: ("ORA-28003", "password verification for the specified password failed"),
+    28007: ("ORA-28007", "the password cannot be reused"),
+    12170: ("ORA-12170", "TNS:Connect timeout occurred"),
+    12541: ("ORA-12541", "TNS:no listener"),
+    3113: ("ORA-03113", "end-of-file on communication channel"),
+}
+
+
+@dataclass(frozen=True)
+class LogonProfile:
+    """How one brand's database answers logons.
+
+    Latency is log-normal with the given median and shape `sigma` (0 makes it
+    constant), capped at `max_ms`. `errors` maps an ORA code from
+    SIMULATED_ERRORS to the probability a logon fails with it; a logon hangs
+    for `hang_seconds` with probability `hang_rate` and then fails with
+    ORA-12170, as a connect timeout would.
+    """
+
+    median_ms: float = 20.0
+    sigma: float = 0.5
+    max_ms: float = 30_000.0
+    errors: Mapping[int, float] = field(default_factory=dict)
+    hang_rate: float = 0.0
+    hang_seconds: float = 10.0
+
+    def __post_init__(self) -> None:
+        unknown = set(self.errors) - set(SIMULATED_ERRORS)
+        if unknown:
+            raise ValueError(f"Cannot simulate ORA codes {sorted(unknown)}; known: {sorted(SIMULATED_ERRORS)}")
+        if sum(self.errors.values()) + self.hang_rate > 1:
+            raise ValueError("Error and hang probabilities add up to more than 1")
+
+
+class SimulatedOracle:
+    """Fake `oracledb.connect_async` answering each brand according to its LogonProfile.
+
+    `brand_of(connect_kwargs)` says which brand a logon is for. Counters record
+    logons and outcomes per brand, and the peak number of concurrent sessions.
+    """
+
+    def __init__(
+        self,
+        profiles: Mapping[str, LogonProfile],
+        brand_of: Callable[[dict], str],
+        seed: int = 0,
+    ) -> None:
+        self.profiles = dict(profiles)
+        self.brand_of = brand_of
+        self.seed = seed
+        self.logons: Counter[str] = Counter()
+        self.outcomes: Counter[tuple[str, str]] = Counter()
+        self.sessions: Counter[str] = Counter()
+        self.peak_sessions: Counter[str] = Counter()
+
+    @staticmethod
+    def _latency_seconds(rng: random.Random, profile: LogonProfile) -> float:
+        ms = profile.median_ms * math.exp(rng.gauss(0, profile.sigma)) if profile.sigma else profile.median_ms
+        return min(ms, profile.max_ms) / 1000
+
+    @staticmethod
+    def _draw(rng: random.Random, profile: LogonProfile) -> int | str | None:
+        """Pick this logon's fate: None for success, "hang", or an ORA code."""
+        roll = rng.random()
+        for code, probability in profile.errors.items():
+            if roll < probability:
+                return code
+            roll -= probability
+        return "hang" if roll < profile.hang_rate else None
+
+    async def connect_async(self, **kwargs):
+        brand = self.brand_of(kwargs)
+        profile = self.profiles[brand]
+        user = kwargs.get("user", "")
+        self.logons[user] += 1
+        rng = random.Random(f"{self.seed}:{brand}:{user}:{self.logons[user]}")
+        fate = self._draw(rng, profile)
+        self.sessions[brand] += 1
+        self.peak_sessions[brand] = max(self.peak_sessions[brand], self.sessions[brand])
+        try:
+            if fate == "hang":
+                await asyncio.sleep(profile.hang_seconds)
+                fate = 12170
+            else:
+                await asyncio.sleep(self._latency_seconds(rng, profile))
+        finally:
+            self.sessions[brand] -= 1
+        self.outcomes[brand, "ok" if fate is None else f"ORA-{fate:05d}"] += 1
+        if fate is not None:
+            full_code, message = SIMULATED_ERRORS[fate]
+            raise oracledb.DatabaseError(SimpleNamespace(code=fate, full_code=full_code, message=message))
+        connection = MagicMock()
+        connection.close = AsyncMock()
+        return connection
+
+    async def probe_listener(self, host: str, port: int, timeout: float) -> bool:
+        """The simulated listeners are always up; a breaker's probe half-opens it on the next interval."""
+        return True
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator["SimulatedOracle"]:
+        """Route the app's logons and circuit-breaker probes to this simulator for the duration of the block."""
+        with (
+            patch("app.services.oracle.oracledb.connect_async", side_effect=self.connect_async),
+            patch("app.services.circuit_breaker.probe_listener", side_effect=self.probe_listener),
+        ):
+            yield self
+
+
+def brand_of_app_targets(connect_params, brands: Iterable[str]) -> Callable[[dict], str]:
+    """Map each ConnectParams the app connects with (see ConnectParamsCache) back to its brand."""
+    by_target = {id(target): brand for brand in brands for target in connect_params.targets(brand)}
+
+    def brand_of(kwargs: dict) -> str:
+        return by_target[id(kwargs["params"])]
+
+    return brand_of
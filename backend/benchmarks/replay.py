@@ -0,0 +1,247 @@
+"""Rebuild the arrival process recorded in the audit log and replay it, time-compressed.
+
+Every attempt the app audits is one request: VERIFY_SUCCESS, VERIFY_FAILED
+and VERIFY_SHED records are /verify-credentials calls, SUCCESS, FAILED and
+SHED are password changes. Requests the bulkheads shed are replayed too,
+since they were part of the offered load. Records without a client IP come
+from the rotation CLI rather than the web app, and are left out. A record is
+written when its request finishes, so its arrival is the timestamp minus
+`latency_ms`. `arrivals` streams records in arrival order through a bounded
+reorder window, so a day of log needs no more memory than the requests
+within that window.
+
+Audited usernames are never sent. Each one is replaced by a stable
+synthetic name (`synthetic_user`), so a replay cannot fail logons against,
+and lock, the real accounts it recorded, while requests by the same user
+still share a name.
+
+`Replayer` sends them at `speedup` times the recorded rate. A change is
+sent to /reset-password with the token from the same user's replayed
+verify when there is one, and otherwise to /change-password, which makes
+the same single `newpassword` logon. Every response is classified so load
+effects can be told apart from ordinary wrong-password failures.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+import httpx
+
+from app.services.audit_store import parse_audit_line
+from app.services.oracle import TRANSIENT_ERROR_MESSAGE
+from benchmarks.load import CURRENT_PASSWORD, NEW_PASSWORD
+from benchmarks.report import percentile
+
+ENDPOINTS = {
+    "VERIFY_SUCCESS": "/verify-credentials",
+    "VERIFY_FAILED": "/verify-credentials",
+    "VERIFY_SHED": "/verify-credentials",
+    "SUCCESS": "/reset-password",
+    "FAILED": "/reset-password",
+    "SHED": "/reset-password",
+}
+
+# Outcomes that mean the service or database could not keep up, as opposed to
+# an answered request ("success", or "failed" for a refused password).
+OVERLOAD_OUTCOMES = frozenset({"rejected", "unavailable", "error"})
+
+
+@dataclass(frozen=True, slots=True)
+class Arrival:
+    """One recorded request: seconds after the first replayed arrival, endpoint, brand and synthetic user."""
+
+    offset: float
+    endpoint: str
+    brand: str
+    user: str
+
+
+@dataclass(frozen=True, slots=True)
+class ReplaySample:
+    """One replayed request; `queue_ms` is the bulkhead wait the server reported, if it reported timing."""
+
+    endpoint: str
+    brand: str
+    outcome: str
+    latency_ms: float
+    queue_ms: float | None
+    sent_at: float
+
+
+def synthetic_user(brand: str, user: str) -> str:
+    """A stable stand-in for an audited username; unquoted Oracle usernames are case-insensitive."""
+    return "replay_" + hashlib.blake2b(f"{brand}|{user.upper()}".encode(), digest_size=6).hexdigest()
+
+
+def arrivals(
+    lines: Iterable[str],
+    since_ms: int | None = None,
+    until_ms: int | None = None,
+    brands: frozenset[str] | None = None,
+    reorder_window_seconds: float = 60.0,
+) -> Iterator[Arrival]:
+    """Stream the requests recorded in audit log lines, in arrival order, under synthetic usernames.
+
+    Records arriving in [since_ms, until_ms) are kept; with `brands`, only
+    those brands. An arrival can precede the record logged before it by up to
+    its latency, so records are held in a heap until the log has moved
+    `reorder_window_seconds` past them.
+    """
+    first = None
+    for arrived, _, endpoint, brand, user in _in_arrival_order(
+        lines, since_ms, until_ms, brands, reorder_window_seconds * 1000
+    ):
+        first = arrived if first is None else first
+        yield Arrival(max(arrived - first, 0.0) / 1000, endpoint, brand, synthetic_user(brand, user))
+
+
+def _in_arrival_order(lines, since_ms, until_ms, brands, window_ms) -> Iterator[tuple[float, int, str, str, str]]:
+    heap: list[tuple[float, int, str, str, str]] = []
+    for sequence, line in enumerate(lines):
+        event = parse_audit_line(line)
+        if event is None or event.status not in ENDPOINTS or not event.brand or not event.user or event.ip is None:
+            continue
+        if brands is not None and event.brand not in brands:
+            continue
+        arrived = event.ts - (event.latency_ms or 0)
+        if (since_ms is not None and arrived < since_ms) or (until_ms is not None and arrived >= until_ms):
+            continue
+        heapq.heappush(heap, (arrived, sequence, ENDPOINTS[event.status], event.brand, event.user))
+        while heap and heap[0][0] <= event.ts - window_ms:
+            yield heapq.heappop(heap)
+    while heap:
+        yield heapq.heappop(heap)
+
+
+def classify(status_code: int, body: dict | None) -> str:
+    """success, failed (refused by Oracle or validation), rejected (429/503), unavailable or error."""
+    if status_code in (429, 503):
+        return "rejected"
+    if status_code != 200 or body is None:
+        return "error"
+    if body.get("success"):
+        return "success"
+    message = body.get("message", "")
+    if message == TRANSIENT_ERROR_MESSAGE or "temporarily unavailable" in message:
+        return "unavailable"
+    return "failed"
+
+
+def queue_ms(server_timing: str | None) -> float | None:
+    """The `queue` phase from a Server-Timing header (0 if the request did not queue), or None without one."""
+    if not server_timing:
+        return None
+    for entry in server_timing.split(","):
+        name, _, params = entry.strip().partition(";")
+        if name == "queue":
+            return float(params.removeprefix("dur="))
+    return 0.0
+
+
+class Replayer:
+    """Sends arrivals open-loop at `speedup` times their recorded pace and collects a ReplaySample each."""
+
+    def __init__(self, client: httpx.AsyncClient, speedup: float) -> None:
+        self.client = client
+        self.speedup = speedup
+        self.samples: list[ReplaySample] = []
+        self.late_sends = 0
+        self.span_seconds = 0.0
+        self._tokens: dict[tuple[str, str], str] = {}
+
+    async def _send(self, arrival: Arrival, sent_at: float) -> None:
+        credentials = {"brand": arrival.brand, "username": arrival.user, "current_password": CURRENT_PASSWORD}
+        endpoint = arrival.endpoint
+        if endpoint == "/verify-credentials":
+            payload = credentials
+        else:
+            token = self._tokens.pop((arrival.brand, arrival.user), None)
+            payload = {**credentials, "new_password": NEW_PASSWORD}
+            if token is None:
+                endpoint = "/change-password"
+            else:
+                payload["verification_token"] = token
+        start = time.perf_counter()
+        try:
+            res = await self.client.post(endpoint, json=payload)
+        except httpx.HTTPError:
+            outcome, queued, body = "error", None, None
+        else:
+            body = res.json() if res.headers.get("content-type", "").startswith("application/json") else None
+            outcome, queued = classify(res.status_code, body), queue_ms(res.headers.get("server-timing"))
+        latency_ms = (time.perf_counter() - start) * 1000
+        if body and body.get("verification_token"):
+            self._tokens[arrival.brand, arrival.user] = body["verification_token"]
+        self.samples.append(ReplaySample(endpoint, arrival.brand, outcome, latency_ms, queued, sent_at))
+
+    async def run(self, stream: Iterable[Arrival]) -> float:
+        """Replay every arrival and wait for the responses; return the wall time in seconds."""
+        loop = asyncio.get_running_loop()
+        tasks = set()
+        start = loop.time()
+        for arrival in stream:
+            self.span_seconds = arrival.offset
+            delay = start + arrival.offset / self.speedup - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.01:
+                self.late_sends += 1
+            task = asyncio.create_task(self._send(arrival, loop.time() - start))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        return loop.time() - start
+
+
+def level_summary(replayer: Replayer, elapsed_seconds: float) -> dict:
+    """Offered and achieved rate, latency, queueing delay and overload errors for one replay."""
+    samples = replayer.samples
+    replay_seconds = replayer.span_seconds / replayer.speedup
+    latencies = sorted(sample.latency_ms for sample in samples)
+    queued = sorted(sample.queue_ms for sample in samples if sample.queue_ms is not None)
+    overloaded = sorted(sample.sent_at for sample in samples if sample.outcome in OVERLOAD_OUTCOMES)
+    return {
+        "speedup": replayer.speedup,
+        "requests": len(samples),
+        "offered_rps": round(len(samples) / replay_seconds, 2) if replay_seconds else None,
+        "achieved_rps": round(len(samples) / elapsed_seconds, 2) if elapsed_seconds else None,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "queue_p50_ms": round(percentile(queued, 50), 1) if queued else None,
+        "queue_p95_ms": round(percentile(queued, 95), 1) if queued else None,
+        "overload_ratio": round(len(overloaded) / len(samples), 4) if samples else 0.0,
+        "first_overload_at_seconds": round(overloaded[0], 2) if overloaded else None,
+        "late_sends": replayer.late_sends,
+    }
+
+
+def find_limits(
+    levels: list[dict], max_queue_ms: float = 100.0, max_overload_ratio: float = 0.01, min_throughput: float = 0.9
+) -> dict:
+    """The first speedup that saturated and the first that produced overload errors.
+
+    A level is saturated when its p95 queueing delay exceeds `max_queue_ms` or
+    it completed less than `min_throughput` of the offered rate. Errors have
+    set in when more than `max_overload_ratio` of requests were rejected,
+    unavailable or failed outright. Levels are taken in the order given.
+    """
+    saturation = error_onset = None
+    sustained = None
+    for level in levels:
+        queue = level["queue_p95_ms"]
+        offered, achieved = level["offered_rps"], level["achieved_rps"]
+        saturated = (queue is not None and queue > max_queue_ms) or (
+            offered is not None and achieved is not None and achieved < offered * min_throughput
+        )
+        if saturated and saturation is None:
+            saturation = level["speedup"]
+        if saturation is None:
+            sustained = level["offered_rps"]
+        if error_onset is None and level["overload_ratio"] > max_overload_ratio:
+            error_onset = level["speedup"]
+    return {"saturation_speedup": saturation, "max_sustained_rps": sustained, "error_onset_speedup": error_onset}
@@ -0,0 +1,120 @@
+"""Latency and throughput reports for load runs, saved as JSON and compared across runs.
+
+A report has one group per endpoint and brand, plus "*" rows that pool the
+brands of an endpoint and all requests. Each group records the request
+count, throughput over the run's wall time, nearest-rank p50/p95/p99 and max
+latency in milliseconds, and the outcome counts. `compare` checks a run
+against a saved baseline and lists what got worse.
+"""
+
+import json
+import math
+import platform
+import sys
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from benchmarks.load import Sample
+
+ALL = "*"
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (the smallest value at or above q% of samples)."""
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(len(ordered) * q / 100) - 1, 0)]
+
+
+def summarize(samples: Iterable[Sample], elapsed_seconds: float) -> dict:
+    """Group samples by "endpoint brand" and compute each group's statistics."""
+    groups: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        for endpoint in (sample.endpoint, ALL):
+            for brand in (sample.brand, ALL):
+                if endpoint == ALL and brand != ALL:
+                    continue
+                groups[f"{endpoint} {brand}"].append(sample)
+
+    summary = {}
+    for key in sorted(groups):
+        members = groups[key]
+        latencies = sorted(sample.latency_ms for sample in members)
+        outcomes = Counter(sample.outcome for sample in members)
+        summary[key] = {
+            "count": len(members),
+            "throughput_rps": round(len(members) / elapsed_seconds, 3) if elapsed_seconds else 0.0,
+            **{f"p{q}_ms": round(percentile(latencies, q), 3) for q in PERCENTILES},
+            "max_ms": round(latencies[-1], 3),
+            "success_ratio": round(outcomes["success"] / len(members), 4),
+            "outcomes": dict(sorted(outcomes.items())),
+        }
+    return summary
+
+
+def metadata(config: dict) -> dict:
+    """When and where a run happened and how it was configured, for the top of a report."""
+    return {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+    }
+
+
+def build_report(samples: list[Sample], elapsed_seconds: float, config: dict, **extra) -> dict:
+    """The JSON document for one run: its metadata and the groups."""
+    return {
+        **metadata(config),
+        "elapsed_seconds": round(elapsed_seconds, 3),
+        **extra,
+        "groups": summarize(samples, elapsed_seconds),
+    }
+
+
+def save(report: dict, path: Path) -> None:
+    path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.10, min_delta_ms: float = 1.0) -> list[str]:
+    """Regressions of `current` against `baseline`, one line each; empty when nothing got worse.
+
+    A percentile regresses when it grew by more than `tolerance` (a fraction)
+    and by more than `min_delta_ms`, so millisecond-level jitter on fast
+    groups is not reported. Throughput and success ratio regress when they
+    fell by more than `tolerance` relative to the baseline. Groups that are
+    missing from the current run are reported; new groups are not.
+    """
+    regressions = []
+    for key, before in baseline["groups"].items():
+        after = current["groups"].get(key)
+        if after is None:
+            regressions.append(f"{key}: missing from this run")
+            continue
+        for q in PERCENTILES:
+            field = f"p{q}_ms"
+            if after[field] > before[field] * (1 + tolerance) and after[field] - before[field] > min_delta_ms:
+                regressions.append(f"{key}: {field} {before[field]:.1f} -> {after[field]:.1f}")
+        for field in ("throughput_rps", "success_ratio"):
+            if after[field] < before[field] * (1 - tolerance):
+                regressions.append(f"{key}: {field} {before[field]} -> {after[field]}")
+    return regressions
+
+
+def format_table(report: dict) -> str:
+    """The groups of a report as a fixed-width table for the terminal."""
+    lines = [f"{'endpoint':22s} {'brand':8s} {'count':>6s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}  outcomes"]
+    for key, group in report["groups"].items():
+        endpoint, brand = key.split(" ")
+        lines.append(
+            f"{endpoint:22s} {brand:8s} {group['count']:6d} {group['throughput_rps']:8.1f} "
+            f"{group['p50_ms']:8.1f} {group['p95_ms']:8.1f} {group['p99_ms']:8.1f}  {group['outcomes']}"
+        )
+    return "\n".join(lines)
@@ -1,10 +1,12 @@
 import os
+import tempfile
 
 os.environ.pop("ORACLE_DSN", None)
 os.environ.setdefault("ORACLE_DSN_AVIS", "localhost:1521/avis_testdb")
 os.environ.setdefault("ORACLE_DSN_BUDGET", "localhost:1521/budget_testdb")
+os.environ.setdefault("AUDIT_LOG_PATH", os.path.join(tempfile.mkdtemp(), "reset_audit.log"))
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import ASGITransport, AsyncClient
@@ -52,6 +54,46 @@ def mock_oracle_error():
     return _make
 
 
+@pytest.fixture()
+def mock_oracle_async_success():
+    """Mock oracledb.connect_async to succeed and hand back a closable connection."""
+    mock_conn = MagicMock()
+    mock_conn.close = AsyncMock()
+    with patch("app.services.oracle.oracledb.connect_async", new_callable=AsyncMock) as mock_connect:
+        mock_connect.return_value = mock_conn
+        yield mock_connect
+
+
+@pytest.fixture()
+def mock_oracle_async_error():
+    """Factory fixture: mock oracledb.connect_async to raise a DatabaseError with a given ORA code."""
+    import oracledb
+
+    def _make(code: int):
+        error = MagicMock()
+        error.code = code
+        exc = oracledb.DatabaseError(error)
+        return patch("app.services.oracle.oracledb.connect_async", new_callable=AsyncMock, side_effect=exc)
+
+    return _make
+
+
+@pytest.fixture()
+def anyio_backend():
+    """Run anyio-marked tests on asyncio only, matching the production server."""
+    return "asyncio"
+
+
+@pytest.fixture()
+def disable_rate_limit():
+    """Switch the rate limiter off so concurrency tests can fire many requests."""
+    from app.main import rate_limiter
+
+    rate_limiter.enabled = False
+    yield
+    rate_limiter.enabled = True
+
+
 @pytest.fixture()
 def mock_create_verification_token():
     """Mock verification token creation for deterministic API tests."""
@@ -64,3 +106,57 @@ def mock_consume_verification_token():
     """Mock verification token consumption to avoid state coupling in API tests."""
     with patch("app.main.verification_store.consume_token", return_value=None) as mock_consume:
         yield mock_consume
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Clear rate limit counters so API tests do not exhaust each other's quota."""
+    from app.main import rate_limiter
+
+    rate_limiter.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_failure_tracker():
+    """Forget recorded logon failures so shedding in one test cannot affect another."""
+    from app.main import failure_tracker
+
+    failure_tracker.reset()
+    yield
+
+
+@pytest.fixture()
+def override_brand():
+    """Factory fixture: change fields of a brand registry entry for the rest of the test."""
+    from app.config import brand_registry
+
+    original = {name: brand_registry.get(name) for name in brand_registry}
+
+    def _override(name: str, **changes):
+        current = {brand: brand_registry.get(brand) for brand in brand_registry}
+        brand_registry.replace({**current, name: current[name].model_copy(update=changes)})
+
+    yield _override
+    brand_registry.replace(original)
+
+
+@pytest.fixture(autouse=True)
+def reset_bulkheads():
+    """Give every test empty bulkheads; their semaphores bind to the test's event loop."""
+    from app.main import bulkheads
+    from app.services.bulkhead import Bulkhead
+
+    for brand, bulkhead in bulkheads.items():
+        bulkheads[brand] = Bulkhead(brand, bulkhead.limits)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Start every test with closed circuits so failures cannot leak between tests."""
+    from app.main import breakers
+
+    for breaker in breakers.values():
+        breaker.record_success()
+    yield
@@ -1,8 +1,15 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import oracledb
+import pytest
+
+from app.services.bulkhead import BulkheadFullError
+from app.services.verification_tokens import SignedVerificationTokenStore
 
 
 RESET_ENDPOINT = "/reset-password"
 VERIFY_ENDPOINT = "/verify-credentials"
+CHANGE_ENDPOINT = "/change-password"
 
 VALID_RESET_BODY = {
     "brand": "avis",
@@ -14,7 +21,7 @@ VALID_RESET_BODY = {
 
 
 class TestResetPasswordEndpoint:
-    def test_success(self, client, mock_oracle_success, mock_consume_verification_token):
+    def test_success(self, client, mock_oracle_async_success, mock_consume_verification_token):
         res = client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
         assert res.status_code == 200
         data = res.json()
@@ -22,15 +29,15 @@ class TestResetPasswordEndpoint:
         assert data["message"] == "Password changed successfully."
         mock_consume_verification_token.assert_called_once_with("token-123", "scott", "avis")
 
-    def test_oracle_error_returns_200_with_failure(self, client, mock_oracle_error, mock_consume_verification_token):
-        with mock_oracle_error(1017):
+    def test_oracle_error_returns_200_with_failure(self, client, mock_oracle_async_error, mock_consume_verification_token):
+        with mock_oracle_async_error(1017):
             res = client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
         assert res.status_code == 200
         data = res.json()
         assert data["success"] is False
         assert "Invalid username" in data["message"]
 
-    def test_invalid_token_returns_200_with_failure(self, client, mock_oracle_success):
+    def test_invalid_token_returns_200_with_failure(self, client, mock_oracle_async_success):
         with patch(
             "app.main.verification_store.consume_token",
             side_effect=ValueError("Verification expired. Please verify credentials again."),
@@ -89,7 +96,7 @@ class TestResetPasswordEndpoint:
 
 
 class TestVerifyCredentialsEndpoint:
-    def test_success(self, client, mock_oracle_success, mock_create_verification_token):
+    def test_success(self, client, mock_oracle_async_success, mock_create_verification_token):
         res = client.post(
             VERIFY_ENDPOINT,
             json={"brand": "avis", "username": "scott", "current_password": "tiger"},
@@ -101,7 +108,7 @@ class TestVerifyCredentialsEndpoint:
         assert data["verification_token"] == "token-123"
         mock_create_verification_token.assert_called_once_with("scott", "avis")
 
-    def test_budget_brand_success(self, client, mock_oracle_success, mock_create_verification_token):
+    def test_budget_brand_success(self, client, mock_oracle_async_success, mock_create_verification_token):
         res = client.post(
             VERIFY_ENDPOINT,
             json={"brand": "budget", "username": "scott", "current_password": "tiger"},
@@ -111,8 +118,8 @@ class TestVerifyCredentialsEndpoint:
         assert data["success"] is True
         mock_create_verification_token.assert_called_once_with("scott", "budget")
 
-    def test_oracle_error_returns_200_with_failure(self, client, mock_oracle_error):
-        with mock_oracle_error(1017):
+    def test_oracle_error_returns_200_with_failure(self, client, mock_oracle_async_error):
+        with mock_oracle_async_error(1017):
             res = client.post(
                 VERIFY_ENDPOINT,
                 json={"brand": "avis", "username": "scott", "current_password": "wrongpw"},
@@ -163,3 +170,391 @@ class TestVerifyCredentialsEndpoint:
             json={"brand": "hertz", "username": "scott", "current_password": "tiger"},
         )
         assert res.status_code == 422
+
+
+class TestChangePasswordEndpoint:
+    body = {"brand": "avis", "username": "scott", "current_password": "tiger", "new_password": "newpass123"}
+
+    def test_success_uses_a_single_newpassword_logon(self, client, mock_oracle_async_success):
+        with patch("app.main.verification_store.consume_token") as mock_consume:
+            res = client.post(CHANGE_ENDPOINT, json=self.body)
+        assert res.status_code == 200
+        assert res.json() == {"success": True, "message": "Password changed successfully.", "verification_token": None}
+        mock_oracle_async_success.assert_called_once()
+        assert mock_oracle_async_success.call_args.kwargs["newpassword"] == "newpass123"
+        mock_consume.assert_not_called()
+
+    def test_wrong_current_password_is_audited_as_failed(self, client, mock_oracle_async_error):
+        with mock_oracle_async_error(1017), patch("app.main.audit_logger.log") as mock_log:
+            res = client.post(CHANGE_ENDPOINT, json=self.body)
+        assert res.json()["success"] is False
+        assert "Invalid username" in res.json()["message"]
+        assert mock_log.call_args.args[0] == "FAILED"
+
+    def test_short_new_password_returns_422(self, client):
+        res = client.post(CHANGE_ENDPOINT, json={**self.body, "new_password": "short"})
+        assert res.status_code == 422
+
+    def test_shares_the_reset_rate_limit(self, client, mock_oracle_async_success, mock_consume_verification_token):
+        for _ in range(5):
+            assert client.post(RESET_ENDPOINT, json=VALID_RESET_BODY).status_code == 200
+        assert client.post(CHANGE_ENDPOINT, json=self.body).status_code == 429
+
+
+class TestNonAsciiVerificationTokens:
+    def test_signed_store_answers_expired(self, client, mock_oracle_async_success):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=b"0123456789abcdef0123456789abcdef")
+        with patch("app.main.verification_store", store):
+            res = client.post(RESET_ENDPOINT, json={**VALID_RESET_BODY, "verification_token": "tökén.sïg"})
+        assert res.status_code == 200
+        assert res.json()["success"] is False
+        assert "Verification expired" in res.json()["message"]
+        mock_oracle_async_success.assert_not_called()
+
+
+class TestAuditRecords:
+    def test_verify_success_is_audited(self, client, mock_oracle_async_success, mock_create_verification_token):
+        with patch("app.main.audit_logger.log") as mock_log:
+            client.post(
+                VERIFY_ENDPOINT,
+                json={"brand": "budget", "username": "scott", "current_password": "tiger"},
+            )
+        status = mock_log.call_args.args[0]
+        kwargs = mock_log.call_args.kwargs
+        assert status == "VERIFY_SUCCESS"
+        assert kwargs["brand"] == "budget"
+        assert kwargs["user"] == "scott"
+        assert kwargs["latency_ms"] >= 0
+
+    def test_reset_failure_is_audited_with_reason(self, client, mock_oracle_async_error, mock_consume_verification_token):
+        with mock_oracle_async_error(28007), patch("app.main.audit_logger.log") as mock_log:
+            client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
+        assert mock_log.call_args.args[0] == "FAILED"
+        assert mock_log.call_args.kwargs["reason"] == "Password cannot be reused."
+
+
+    @pytest.mark.parametrize(
+        ("endpoint", "body", "status"),
+        [
+            (VERIFY_ENDPOINT, {"brand": "avis", "username": "scott", "current_password": "tiger"}, "VERIFY_SHED"),
+            (RESET_ENDPOINT, VALID_RESET_BODY, "SHED"),
+        ],
+    )
+    def test_bulkhead_rejection_is_audited_as_shed(
+        self, client, mock_consume_verification_token, endpoint, body, status
+    ):
+        full = MagicMock(run=AsyncMock(side_effect=BulkheadFullError(body["brand"], retry_after=5)))
+        with patch.dict("app.main.bulkheads", {body["brand"]: full}), patch("app.main.audit_logger.log") as mock_log:
+            res = client.post(endpoint, json=body)
+        assert res.status_code == 503
+        assert mock_log.call_args.args[0] == status
+        assert mock_log.call_args.kwargs["user"] == body["username"]
+        assert "busy" in mock_log.call_args.kwargs["reason"]
+
+
+class TestHealthz:
+    def test_reports_cached_circuit_state(self, client):
+        res = client.get("/healthz")
+        assert res.status_code == 200
+        data = res.json()
+        assert data["status"] == "ok"
+        assert data["brands"]["avis"]["state"] == "closed"
+        assert data["brands"]["budget"]["state"] == "closed"
+        assert data["brands"]["avis"]["bulkhead"]["active"] == 0
+
+    def test_unavailable_when_every_circuit_is_open(self, client):
+        from app.main import breakers
+
+        for breaker in breakers.values():
+            for _ in range(10):
+                breaker.record_failure()
+        res = client.get("/healthz")
+        assert res.status_code == 503
+        assert res.json()["brands"]["budget"]["state"] == "open"
+
+
+class TestPasswordPolicyEndpoint:
+    def test_returns_cacheable_policy_per_brand(self, client):
+        res = client.get("/password-policy")
+        assert res.status_code == 200
+        assert res.headers["Cache-Control"] == "public, max-age=300"
+        data = res.json()
+        assert set(data) == {"avis", "budget"}
+        assert data["avis"]["min_length"] == 8
+
+    def test_policy_violation_returns_422_without_contacting_oracle(
+        self, client, mock_oracle_async_success, override_brand
+    ):
+        from app.services.password_policy import PasswordPolicy
+
+        override_brand("avis", password_policy=PasswordPolicy.model_validate("ora12c_strong"))
+        res = client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
+        assert res.status_code == 422
+        assert "uppercase" in res.json()["detail"][0]["msg"]
+        mock_oracle_async_success.assert_not_called()
+
+
+class TestBreachedPasswords:
+    def test_breached_password_rejected_before_token_is_consumed(
+        self, client, tmp_path, mock_oracle_async_success, mock_consume_verification_token
+    ):
+        from app.services.breached_passwords import BreachedPasswordFilter, CuckooFilterBuilder
+
+        builder = CuckooFilterBuilder(str(tmp_path / "breached.filter"), capacity=10)
+        builder.add_password(VALID_RESET_BODY["new_password"])
+        builder.close()
+        with patch("app.main.breached_passwords", BreachedPasswordFilter(str(tmp_path / "breached.filter"))):
+            res = client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
+        data = res.json()
+        assert res.status_code == 200
+        assert data["success"] is False
+        assert "data breach" in data["message"]
+        mock_consume_verification_token.assert_not_called()
+        mock_oracle_async_success.assert_not_called()
+
+
+class TestBrandRegistry:
+    @pytest.fixture()
+    def restore_registry(self):
+        from app.config import brand_registry, settings
+        from app.main import connect_params
+
+        original = {name: brand_registry.get(name) for name in brand_registry}
+        yield
+        brand_registry.replace(original)
+        connect_params.reload(settings)
+
+    def test_lists_brands(self, client):
+        res = client.get("/brands")
+        assert res.json() == [{"name": "avis", "display_name": "Avis"}, {"name": "budget", "display_name": "Budget"}]
+        assert "max-age" in res.headers["Cache-Control"]
+
+    def test_reload_onboards_and_retires_brands(
+        self, client, tmp_path, monkeypatch, restore_registry, mock_oracle_async_success
+    ):
+        from app.main import breakers, bulkheads, reload_brands
+
+        path = tmp_path / "brands.toml"
+        path.write_text('[brands.avis]\ndsn = "avis-db:1521/avis"\n\n[brands.payless]\ndsn = "payless-db:1521/payless"\n')
+        monkeypatch.setenv("BRANDS_FILE", str(path))
+        reload_brands()
+
+        body = {"brand": "payless", "username": "scott", "current_password": "tiger"}
+        res = client.post(VERIFY_ENDPOINT, json=body)
+        assert res.json()["success"] is True
+        assert mock_oracle_async_success.call_args.kwargs["params"].host == "payless-db"
+        assert "payless" in breakers and "payless" in bulkheads
+        assert client.post(VERIFY_ENDPOINT, json={**body, "brand": "budget"}).status_code == 422
+        assert set(client.get("/healthz").json()["brands"]) == {"avis", "payless"}
+
+    def test_invalid_registry_keeps_current_one(self, client, tmp_path, monkeypatch, restore_registry):
+        from app.config import brand_registry
+        from app.main import reload_brands
+
+        path = tmp_path / "brands.toml"
+        path.write_text("[brands.avis]\ndsns = []\n")
+        monkeypatch.setenv("BRANDS_FILE", str(path))
+        reload_brands()
+        assert list(brand_registry) == ["avis", "budget"]
+
+
+class TestCircuitBreakerIntegration:
+    def test_open_circuit_fails_fast_without_connecting(self, client, mock_oracle_async_success):
+        from app.main import breakers
+
+        for _ in range(10):
+            breakers["avis"].record_failure()
+        res = client.post(
+            VERIFY_ENDPOINT,
+            json={"brand": "avis", "username": "scott", "current_password": "tiger"},
+        )
+        assert res.json()["success"] is False
+        assert "temporarily unavailable" in res.json()["message"]
+        mock_oracle_async_success.assert_not_awaited()
+
+    def test_open_circuit_keeps_reset_token(self, client, mock_oracle_async_success, mock_consume_verification_token):
+        from app.main import breakers
+
+        for _ in range(10):
+            breakers["avis"].record_failure()
+        res = client.post(RESET_ENDPOINT, json=VALID_RESET_BODY)
+        assert "temporarily unavailable" in res.json()["message"]
+        mock_consume_verification_token.assert_not_called()
+
+
+class TestFailover:
+    def test_verify_fails_over_to_standby(self, client):
+        from app.main import settings
+        from app.services.connect_params import build_connect_params
+
+        error = MagicMock()
+        error.code = 12514
+        conn = MagicMock()
+        conn.close = AsyncMock()
+        targets = (
+            build_connect_params(settings, "avis-primary:1521/avis"),
+            build_connect_params(settings, "avis-standby:1521/avis"),
+        )
+        with (
+            patch("app.main.connect_params.targets", return_value=targets),
+            patch(
+                "app.services.oracle.oracledb.connect_async",
+                new_callable=AsyncMock,
+                side_effect=[oracledb.DatabaseError(error), conn],
+            ) as mock_connect,
+        ):
+            res = client.post(VERIFY_ENDPOINT, json={"brand": "avis", "username": "scott", "current_password": "tiger"})
+        assert res.json()["success"] is True
+        assert [c.kwargs["params"].host for c in mock_connect.call_args_list] == ["avis-primary", "avis-standby"]
+
+
+class TestMetricsEndpoint:
+    def test_exposes_preregistered_series_in_prometheus_format(self, client):
+        res = client.get("/metrics")
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE password_reset_request_seconds histogram" in res.text
+        assert (
+            'password_reset_request_seconds_count{endpoint="/reset-password",brand="budget",outcome="success"} 0'
+            in res.text
+        )
+        assert 'password_reset_rate_limited_total{endpoint="/verify-credentials"}' in res.text
+
+    def test_counts_requests_logons_and_error_codes(self, client, mock_oracle_async_success, mock_oracle_async_error):
+        from app.main import oracle_errors, oracle_logon_seconds, request_seconds
+
+        def count(histogram, *labels):
+            return sum(histogram.values()[labels][:-1])
+
+        before_ok = count(request_seconds, VERIFY_ENDPOINT, "avis", "success")
+        before_failed = count(request_seconds, VERIFY_ENDPOINT, "avis", "failed")
+        before_logons = count(oracle_logon_seconds, "avis", "verify", "error")
+        before_errors = oracle_errors.values().get(("avis", "ORA-01017"), 0)
+
+        body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+        client.post(VERIFY_ENDPOINT, json=body)
+        with mock_oracle_async_error(1017):
+            client.post(VERIFY_ENDPOINT, json={**body, "current_password": "wrongpw"})
+
+        assert count(request_seconds, VERIFY_ENDPOINT, "avis", "success") == before_ok + 1
+        assert count(request_seconds, VERIFY_ENDPOINT, "avis", "failed") == before_failed + 1
+        assert count(oracle_logon_seconds, "avis", "verify", "error") == before_logons + 1
+        assert oracle_errors.values()[("avis", "ORA-01017")] == before_errors + 1
+        assert 'password_reset_oracle_errors_total{brand="avis",code="ORA-01017"}' in client.get("/metrics").text
+
+    def test_counts_rate_limited_requests(self, client, mock_oracle_async_success):
+        from app.main import rate_limited
+
+        before = rate_limited.values()[(VERIFY_ENDPOINT,)]
+        body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+        for _ in range(6):
+            client.post(VERIFY_ENDPOINT, json=body)
+        assert rate_limited.values()[(VERIFY_ENDPOINT,)] == before + 1
+
+
+class TestServerTiming:
+    def test_sampled_verify_reports_each_phase(self, client, mock_oracle_async_success, monkeypatch):
+        from app.main import request_timing
+
+        monkeypatch.setattr(request_timing, "sample_rate", 1.0)
+        res = client.post(VERIFY_ENDPOINT, json={"brand": "avis", "username": "scott", "current_password": "tiger"})
+        phases = [entry.split(";")[0] for entry in res.headers["Server-Timing"].split(", ")]
+        assert phases == ["validate", "rate_limit", "dsn", "connect", "close", "token", "audit", "total"]
+
+    def test_unsampled_requests_have_no_header(self, client, mock_oracle_async_success):
+        res = client.post(VERIFY_ENDPOINT, json={"brand": "avis", "username": "scott", "current_password": "tiger"})
+        assert "Server-Timing" not in res.headers
+
+
+class TestAdminProfile:
+    @pytest.fixture()
+    def admin(self, monkeypatch, tmp_path):
+        from pydantic import SecretStr
+
+        from app.main import profiler, settings
+
+        monkeypatch.setattr(settings, "admin_token", SecretStr("s3cret-admin"))
+        monkeypatch.setattr(profiler, "output_dir", tmp_path)
+        yield profiler
+        profiler.join()
+
+    def test_hidden_without_an_admin_token(self, client):
+        assert client.post("/admin/profile").status_code == 404
+
+    def test_rejects_a_wrong_token(self, client, admin):
+        res = client.post("/admin/profile", headers={"Authorization": "Bearer guess"})
+        assert res.status_code == 401
+        assert not admin.running
+
+    def test_profiles_into_the_profile_dir(self, client, admin, tmp_path):
+        headers = {"Authorization": "Bearer s3cret-admin"}
+        res = client.post("/admin/profile?seconds=0.2", headers=headers)
+        assert res.status_code == 202
+        assert client.post("/admin/profile?seconds=0.2", headers=headers).status_code == 409
+        admin.join()
+        path = tmp_path / res.json()["path"].rsplit("/", 1)[-1]
+        assert path.exists()
+
+    def test_rejects_out_of_range_durations(self, client, admin):
+        res = client.post("/admin/profile?seconds=100000", headers={"Authorization": "Bearer s3cret-admin"})
+        assert res.status_code == 422
+
+
+class TestFrontend:
+    @pytest.fixture()
+    def bundle(self, monkeypatch, tmp_path):
+        from pathlib import Path
+
+        from app.services.static_assets import StaticAssets
+        from app.tools.build_frontend import build
+
+        build(Path(__file__).resolve().parents[2] / "frontend", tmp_path / "dist")
+        monkeypatch.setattr("app.main.static_assets", StaticAssets(str(tmp_path / "dist")))
+
+    def test_page_and_assets_are_served_same_origin(self, client, bundle):
+        import re
+
+        page = client.get("/")
+        assert page.status_code == 200
+        assert page.headers["Content-Encoding"] == "gzip"
+        assert page.headers["Cache-Control"] == "no-cache"
+        assert client.get("/", headers={"If-None-Match": page.headers["ETag"]}).status_code == 304
+
+        for path in re.findall(r'(?:href|src)="(assets/[^"]+)"', page.text):
+            asset = client.get(f"/{path}")
+            assert asset.status_code == 200
+            assert "immutable" in asset.headers["Cache-Control"]
+
+    def test_404_until_the_frontend_is_built(self, client, monkeypatch):
+        monkeypatch.setattr("app.main.static_assets", None)
+        assert client.get("/").status_code == 404
+
+
+class TestRateLimiting:
+    def test_sixth_verify_for_same_user_returns_429_with_retry_after(self, client, mock_oracle_async_success):
+        body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+        for _ in range(5):
+            assert client.post(VERIFY_ENDPOINT, json=body).status_code == 200
+        res = client.post(VERIFY_ENDPOINT, json=body)
+        assert res.status_code == 429
+        assert res.json()["success"] is False
+        assert int(res.headers["Retry-After"]) >= 1
+
+    def test_per_ip_limit_covers_every_username_from_that_ip(self, client, mock_oracle_async_success):
+        body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+        for username in ("scott", "adams", "blake", "clark", "jones"):
+            assert client.post(VERIFY_ENDPOINT, json={**body, "username": username}).status_code == 200
+        res = client.post(VERIFY_ENDPOINT, json={**body, "username": "allen"})
+        assert res.status_code == 429
+
+
+class TestFailureShedding:
+    def test_repeated_bad_passwords_are_shed_before_connecting(self, client, mock_oracle_async_error, disable_rate_limit):
+        body = {"brand": "avis", "username": "mallory", "current_password": "guess"}
+        with mock_oracle_async_error(1017) as mock_connect:
+            for _ in range(5):
+                assert "Invalid username" in client.post(VERIFY_ENDPOINT, json=body).json()["message"]
+            res = client.post(VERIFY_ENDPOINT, json=body)
+        assert res.json()["success"] is False
+        assert "Too many failed attempts" in res.json()["message"]
+        assert mock_connect.await_count == 5
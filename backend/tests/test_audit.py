@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.services.audit import AuditLogger
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestAuditLogger:
+    def test_records_are_written_as_json_lines(self, tmp_path):
+        path = tmp_path / "audit.log"
+        audit = AuditLogger(str(path))
+        audit.start()
+        audit.log("VERIFY_SUCCESS", brand="avis", user="scott", ip="10.0.0.1", latency_ms=12.34)
+        audit.log("FAILED", brand="budget", user="scott", ip="10.0.0.1", reason="Password cannot be reused.")
+        audit.stop()
+
+        first, second = read_records(path)
+        assert first["status"] == "VERIFY_SUCCESS"
+        assert first["brand"] == "avis"
+        assert first["user"] == "scott"
+        assert first["ip"] == "10.0.0.1"
+        assert first["latency_ms"] == 12.3
+        assert "ts" in first
+        assert second["status"] == "FAILED"
+        assert second["reason"] == "Password cannot be reused."
+
+    def test_records_logged_before_start_are_flushed(self, tmp_path):
+        path = tmp_path / "audit.log"
+        audit = AuditLogger(str(path))
+        for i in range(1000):
+            audit.log("SUCCESS", brand="avis", user=f"user{i}", ip="10.0.0.1")
+        audit.start()
+        audit.stop()
+
+        assert len(read_records(path)) == 1000
+
+    def test_full_queue_drops_and_reports_count(self, tmp_path):
+        path = tmp_path / "audit.log"
+        audit = AuditLogger(str(path), queue_size=2)
+        for i in range(5):
+            audit.log("SUCCESS", brand="avis", user=f"user{i}", ip="10.0.0.1")
+        assert audit.dropped == 3
+        audit.start()
+        audit.stop()
+
+        records = read_records(path)
+        assert [r["status"] for r in records] == ["SUCCESS", "SUCCESS", "AUDIT_DROPPED"]
+        assert records[-1]["count"] == 3
+
+    def test_block_policy_drops_after_timeout(self, tmp_path):
+        audit = AuditLogger(str(tmp_path / "audit.log"), queue_size=1, overflow="block", block_timeout_seconds=0.01)
+        audit.log("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        audit.log("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        assert audit.dropped == 1
+
+    @pytest.mark.anyio
+    async def test_block_policy_never_blocks_the_event_loop(self, tmp_path):
+        audit = AuditLogger(str(tmp_path / "audit.log"), queue_size=1, overflow="block", block_timeout_seconds=5)
+        start = time.monotonic()
+        audit.log("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        audit.log("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        assert time.monotonic() - start < 1
+        assert audit.dropped == 1
+
+    @pytest.mark.anyio
+    async def test_log_async_waits_for_space_while_the_loop_runs(self, tmp_path):
+        path = tmp_path / "audit.log"
+        audit = AuditLogger(str(path), queue_size=1, overflow="block", block_timeout_seconds=5)
+        audit.log("SUCCESS", brand="avis", user="first", ip="10.0.0.1")
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        waiting = asyncio.create_task(audit.log_async("SUCCESS", brand="avis", user="second", ip="10.0.0.1"))
+        await asyncio.sleep(0.1)
+        assert not waiting.done()
+        assert ticks >= 5
+        audit.start()
+        await waiting
+        ticker.cancel()
+        audit.stop()
+
+        assert audit.dropped == 0
+        assert [r["user"] for r in read_records(path)] == ["first", "second"]
+
+    @pytest.mark.anyio
+    async def test_log_async_drops_after_block_timeout(self, tmp_path):
+        audit = AuditLogger(str(tmp_path / "audit.log"), queue_size=1, overflow="block", block_timeout_seconds=0.02)
+        await audit.log_async("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        await audit.log_async("SUCCESS", brand="avis", user="scott", ip="10.0.0.1")
+        assert audit.dropped == 1
+
+    def test_size_rotation_keeps_numbered_backups(self, tmp_path):
+        path = tmp_path / "audit.log"
+        audit = AuditLogger(str(path), batch_size=1, max_bytes=200, backup_count=2, fsync="batch")
+        for i in range(20):
+            audit.log("SUCCESS", brand="avis", user=f"user{i}", ip="10.0.0.1")
+        audit.start()
+        audit.stop()
+
+        assert path.exists()
+        assert (tmp_path / "audit.log.1").exists()
+        assert (tmp_path / "audit.log.2").exists()
+        assert not (tmp_path / "audit.log.3").exists()
+        assert path.stat().st_size <= 200
+        assert read_records(path)[-1]["user"] == "user19"
@@ -0,0 +1,167 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services import audit_store
+from app.services.audit_store import AuditStore, parse_audit_line
+from app.tools import audit_index
+
+JAN_28 = 1738022400000  # 2025-01-28T00:00:00Z
+
+
+def json_line(ts: str, status: str, user: str = "scott", brand: str = "budget", ip: str = "10.0.0.1") -> str:
+    return json.dumps({"ts": ts, "status": status, "brand": brand, "user": user, "ip": ip}) + "\n"
+
+
+class TestParseAuditLine:
+    def test_json_line(self):
+        event = parse_audit_line(
+            '{"ts":"2025-01-28T09:15:02.123+00:00","status":"FAILED","brand":"avis","user":"scott",'
+            '"ip":"10.0.0.1","reason":"Password cannot be reused.","latency_ms":41.2}'
+        )
+        assert event.ts == JAN_28 + (9 * 3600 + 15 * 60 + 2) * 1000 + 123
+        assert event.status == "FAILED"
+        assert event.reason == "Password cannot be reused."
+        assert event.latency_ms == 41.2
+
+    def test_legacy_text_line(self):
+        event = parse_audit_line(
+            "2025-01-28 09:15:02,123 | WARNING | user=scott brand=avis ip=10.0.0.1 "
+            "status=VERIFY_FAILED reason=Invalid username or current password."
+        )
+        assert event.status == "VERIFY_FAILED"
+        assert event.user == "scott"
+        assert event.brand == "avis"
+        assert event.reason == "Invalid username or current password."
+
+    def test_unrecognized_line(self):
+        assert parse_audit_line("garbage") is None
+        assert parse_audit_line('{"ts": "not a time"}') is None
+
+
+class TestAuditStore:
+    def test_ingest_is_incremental(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        store = AuditStore(str(tmp_path / "index.db"))
+        log.write_text(json_line("2025-01-28T09:00:00+00:00", "VERIFY_SUCCESS"))
+        assert store.ingest(str(log)) == 1
+
+        with open(log, "a") as f:
+            f.write(json_line("2025-01-28T09:01:00+00:00", "SUCCESS"))
+            f.write('{"ts": "2025-01-28T09:02:00+00:00", "status": "SUC')
+        assert store.ingest(str(log)) == 1
+        assert store.ingest(str(log)) == 0
+
+        with open(log, "a") as f:
+            f.write('CESS", "brand": "avis", "user": "scott", "ip": "10.0.0.1"}\n')
+        assert store.ingest(str(log)) == 1
+        assert len(store.query()) == 3
+
+    def test_ingest_finishes_rotated_file(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        store = AuditStore(str(tmp_path / "index.db"))
+        log.write_text(json_line("2025-01-28T09:00:00+00:00", "VERIFY_SUCCESS"))
+        store.ingest(str(log))
+
+        with open(log, "a") as f:
+            f.write(json_line("2025-01-28T09:01:00+00:00", "SUCCESS"))
+        log.rename(tmp_path / "reset_audit.log.1")
+        log.write_text(json_line("2025-01-28T09:02:00+00:00", "VERIFY_FAILED"))
+
+        assert store.ingest(str(log)) == 2
+        assert [e.status for e in store.query()] == ["VERIFY_SUCCESS", "SUCCESS", "VERIFY_FAILED"]
+
+    def test_interrupted_ingest_resumes_after_the_last_committed_batch(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        store = AuditStore(str(tmp_path / "index.db"))
+        log.write_text("".join(json_line(f"2025-01-28T09:00:0{i}+00:00", "SUCCESS", user=f"u{i}") for i in range(5)))
+        calls = 0
+
+        def parse_until_interrupted(line):
+            nonlocal calls
+            calls += 1
+            if calls == 4:
+                raise KeyboardInterrupt
+            return parse_audit_line(line)
+
+        with (
+            patch.object(audit_store, "_INSERT_BATCH", 2),
+            patch.object(audit_store, "parse_audit_line", side_effect=parse_until_interrupted),
+            pytest.raises(KeyboardInterrupt),
+        ):
+            store.ingest(str(log))
+
+        assert len(store.query()) == 2
+        assert store.ingest(str(log)) == 3
+        assert [e.user for e in store.query()] == ["u0", "u1", "u2", "u3", "u4"]
+
+    def test_query_filters(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        log.write_text(
+            json_line("2025-01-27T23:59:00+00:00", "FAILED")
+            + json_line("2025-01-28T09:00:00+00:00", "FAILED")
+            + json_line("2025-01-28T09:00:30+00:00", "SUCCESS")
+            + json_line("2025-01-28T10:00:00+00:00", "FAILED", brand="avis")
+            + json_line("2025-01-28T11:00:00+00:00", "FAILED", user="other", ip="10.0.0.9")
+        )
+        store = AuditStore(str(tmp_path / "index.db"))
+        store.ingest(str(log))
+
+        day = {"since": JAN_28, "until": JAN_28 + 86_400_000}
+        assert len(store.query(user="scott", brand="budget", **day)) == 2
+        assert len(store.query(user="scott", brand="budget", statuses=["FAILED"], **day)) == 1
+        assert [e.user for e in store.query(ip="10.0.0.9")] == ["other"]
+
+    def test_user_match_ignores_case(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        log.write_text(
+            json_line("2025-01-28T09:00:00+00:00", "FAILED", user="scott")
+            + json_line("2025-01-28T09:00:01+00:00", "FAILED", user="SCOTT")
+        )
+        store = AuditStore(str(tmp_path / "index.db"))
+        store.ingest(str(log))
+
+        assert [e.user for e in store.query(user="Scott", brand="budget")] == ["scott", "SCOTT"]
+        assert store.counts_per_minute(user="SCOTT") == [(JAN_28 + 9 * 3_600_000, "FAILED", 2)]
+
+    def test_limit_keeps_the_newest_events(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        log.write_text("".join(json_line(f"2025-01-28T09:00:0{i}+00:00", "SUCCESS", user=f"u{i}") for i in range(5)))
+        store = AuditStore(str(tmp_path / "index.db"))
+        store.ingest(str(log))
+
+        assert [e.user for e in store.query(limit=2)] == ["u3", "u4"]
+
+    def test_cli_reports_truncation(self, tmp_path, capsys):
+        log = tmp_path / "reset_audit.log"
+        log.write_text("".join(json_line(f"2025-01-28T09:00:0{i}+00:00", "SUCCESS", user=f"u{i}") for i in range(3)))
+        index = str(tmp_path / "index.db")
+        audit_index.main(["--index", index, "ingest", str(log)])
+        capsys.readouterr()
+
+        audit_index.main(["--index", index, "query", "--limit", "2"])
+        out, err = capsys.readouterr()
+        assert [json.loads(line)["user"] for line in out.splitlines()] == ["u1", "u2"]
+        assert "showing the newest 2" in err
+
+        audit_index.main(["--index", index, "query", "--limit", "3"])
+        out, err = capsys.readouterr()
+        assert len(out.splitlines()) == 3
+        assert err == ""
+
+    def test_counts_per_minute(self, tmp_path):
+        log = tmp_path / "reset_audit.log"
+        log.write_text(
+            json_line("2025-01-28T09:00:01+00:00", "FAILED")
+            + json_line("2025-01-28T09:00:59+00:00", "FAILED")
+            + json_line("2025-01-28T09:01:00+00:00", "FAILED")
+        )
+        store = AuditStore(str(tmp_path / "index.db"))
+        store.ingest(str(log))
+
+        nine = JAN_28 + 9 * 3_600_000
+        assert store.counts_per_minute(statuses=["FAILED"]) == [
+            (nine, "FAILED", 2),
+            (nine + 60_000, "FAILED", 1),
+        ]
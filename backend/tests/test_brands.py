@@ -0,0 +1,92 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.services.brands import BrandConfig, BrandRegistry
+
+
+def make_settings(**overrides) -> Settings:
+    return Settings(_env_file=None, **overrides)
+
+
+REGISTRY_TOML = """
+[brands.avis]
+dsn = "avis-db:1521/avis_service"
+password_policy = "ora12c"
+
+[brands.payless]
+display_name = "Payless Car Rental"
+dsns = ["payless-a:1521/payless", "payless-b:1521/payless"]
+bulkhead = { max_concurrent = 5, max_queue = 10 }
+password_policy = { preset = "ora12c_strong", min_length = 12 }
+"""
+
+
+class TestBrandRegistry:
+    def test_lookup_and_membership(self):
+        avis = BrandConfig(name="avis", display_name="Avis", dsns=["avis-db:1521/avis"])
+        registry = BrandRegistry({"avis": avis})
+        assert registry.get("avis") is avis
+        assert "avis" in registry
+        assert "hertz" not in registry
+        assert list(registry) == ["avis"]
+        with pytest.raises(ValueError, match="Unknown brand: hertz"):
+            registry.get("hertz")
+
+    def test_replace_swaps_the_whole_table(self):
+        registry = BrandRegistry({"avis": BrandConfig(name="avis", display_name="Avis", dsns=["a:1/a"])})
+        registry.replace({"budget": BrandConfig(name="budget", display_name="Budget", dsns=["b:1/b"])})
+        assert list(registry) == ["budget"]
+
+    def test_entries_are_immutable(self):
+        avis = BrandConfig(name="avis", display_name="Avis", dsns=["a:1/a"])
+        with pytest.raises(ValidationError):
+            avis.dsns = ("x:1/x",)
+
+
+class TestLoadBrands:
+    def test_legacy_settings_build_avis_and_budget(self):
+        settings = make_settings(
+            oracle_dsn_avis="avis-db:1521/avis",
+            oracle_dsn_budget="budget-db:1521/budget",
+            oracle_dsns={"budget": ["budget-a:1521/budget", "budget-b:1521/budget"]},
+            bulkheads={"avis": {"max_concurrent": 7}},
+        )
+        brands = settings.brand_configs
+        assert list(brands) == ["avis", "budget"]
+        assert brands["avis"].dsns == ("avis-db:1521/avis",)
+        assert brands["avis"].bulkhead.max_concurrent == 7
+        assert brands["budget"].dsns == ("budget-a:1521/budget", "budget-b:1521/budget")
+        assert settings.get_dsn("budget") == "budget-a:1521/budget"
+
+    def test_registry_file(self, tmp_path):
+        path = tmp_path / "brands.toml"
+        path.write_text(REGISTRY_TOML)
+        settings = make_settings(brands_file=str(path))
+        brands = settings.brand_configs
+        assert list(brands) == ["avis", "payless"]
+        assert brands["avis"].display_name == "Avis"
+        assert brands["avis"].password_policy.min_digits == 1
+        assert brands["payless"].display_name == "Payless Car Rental"
+        assert brands["payless"].dsns == ("payless-a:1521/payless", "payless-b:1521/payless")
+        assert brands["payless"].bulkhead.max_concurrent == 5
+        assert brands["payless"].password_policy.min_length == 12
+
+    def test_registry_file_replaces_legacy_dsns(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("ORACLE_DSN_AVIS", raising=False)
+        monkeypatch.delenv("ORACLE_DSN_BUDGET", raising=False)
+        path = tmp_path / "brands.toml"
+        path.write_text(REGISTRY_TOML)
+        assert "budget" not in make_settings(brands_file=str(path)).brand_configs
+
+    def test_invalid_brand_name_rejected(self, tmp_path):
+        path = tmp_path / "brands.toml"
+        path.write_text('[brands."Bad Name"]\ndsn = "x:1/x"\n')
+        with pytest.raises(ValueError, match="Invalid brand name"):
+            make_settings(brands_file=str(path)).brand_configs
+
+    def test_brand_without_dsn_rejected(self, tmp_path):
+        path = tmp_path / "brands.toml"
+        path.write_text("[brands.avis]\ndsns = []\n")
+        with pytest.raises(ValidationError):
+            make_settings(brands_file=str(path)).brand_configs
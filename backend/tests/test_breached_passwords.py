@@ -0,0 +1,121 @@
+import hashlib
+
+import pytest
+
+from app.services.breached_passwords import (
+    BreachedPasswordError,
+    BreachedPasswordFilter,
+    CuckooFilterBuilder,
+    filter_buckets,
+)
+from app.tools import build_breached_filter
+
+
+def _build(path, passwords, capacity=1000):
+    builder = CuckooFilterBuilder(str(path), capacity)
+    for password in passwords:
+        builder.add_password(password)
+    return builder.close()
+
+
+class TestFilterBuckets:
+    def test_sized_for_ninety_percent_load(self):
+        assert filter_buckets(1_000_000) == 277_778
+
+
+class TestBreachedPasswordFilter:
+    def test_added_passwords_are_found(self, tmp_path):
+        path = tmp_path / "breached.filter"
+        passwords = [f"password{i}" for i in range(500)]
+        assert _build(path, passwords) == 500
+        breached = BreachedPasswordFilter(str(path))
+        assert len(breached) == 500
+        assert all(password in breached for password in passwords)
+        assert "correct horse battery staple" not in breached
+        breached.close()
+
+    def test_fills_to_capacity(self, tmp_path):
+        path = tmp_path / "breached.filter"
+        passwords = [f"listed{i}" for i in range(5000)]
+        assert _build(path, passwords, capacity=5000) == 5000
+        breached = BreachedPasswordFilter(str(path))
+        assert all(password in breached for password in passwords)
+        assert not any(f"unlisted{i}" in breached for i in range(20_000))
+        breached.close()
+
+    def test_duplicates_are_stored_once(self, tmp_path):
+        builder = CuckooFilterBuilder(str(tmp_path / "breached.filter"), 10)
+        for _ in range(20):
+            builder.add_password("password1")
+        assert builder.close() == 1
+        assert builder.duplicates == 19
+
+    def test_overfull_build_raises(self, tmp_path):
+        builder = CuckooFilterBuilder(str(tmp_path / "breached.filter"), 10)
+        with pytest.raises(ValueError, match="larger capacity"):
+            for i in range(100):
+                builder.add_password(f"password{i}")
+        builder.discard()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_ensure_not_breached(self, tmp_path):
+        path = tmp_path / "breached.filter"
+        _build(path, ["Summer2024!"])
+        breached = BreachedPasswordFilter(str(path))
+        with pytest.raises(BreachedPasswordError, match="data breach"):
+            breached.ensure_not_breached("Summer2024!")
+        breached.ensure_not_breached("Winter2024!")
+        breached.close()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "not-a-filter"
+        path.write_bytes(b"x" * 64)
+        with pytest.raises(ValueError, match="Not a breached-password filter"):
+            BreachedPasswordFilter(str(path))
+
+    def test_no_temporary_file_left_behind(self, tmp_path):
+        _build(tmp_path / "breached.filter", ["a"])
+        assert [p.name for p in tmp_path.iterdir()] == ["breached.filter"]
+
+
+class TestBuildCli:
+    def test_builds_from_hibp_hash_list(self, tmp_path):
+        source = tmp_path / "pwned.txt"
+        lines = [hashlib.sha1(p.encode()).hexdigest().upper() + f":{n}" for n, p in enumerate(["hunter22", "letmein1"])]
+        source.write_text("\n".join(lines + ["not-a-hash", ""]) + "\n")
+        output = tmp_path / "breached.filter"
+        build_breached_filter.main([str(output), str(source)])
+        breached = BreachedPasswordFilter(str(output))
+        assert len(breached) == 2
+        assert "hunter22" in breached and "letmein1" in breached
+        breached.close()
+
+    def test_builds_from_plaintext_list(self, tmp_path):
+        source = tmp_path / "banned.txt"
+        source.write_text("avisrental\nbudgetcars\n")
+        output = tmp_path / "banned.filter"
+        build_breached_filter.main([str(output), str(source), "--plaintext"])
+        breached = BreachedPasswordFilter(str(output))
+        assert "budgetcars" in breached
+        breached.close()
+
+    def test_plaintext_keeps_surrounding_spaces(self, tmp_path):
+        source = tmp_path / "banned.txt"
+        source.write_bytes(b" padded pass \r\nplain\n")
+        output = tmp_path / "banned.filter"
+        build_breached_filter.main([str(output), str(source), "--plaintext"])
+        breached = BreachedPasswordFilter(str(output))
+        assert " padded pass " in breached and "plain" in breached
+        assert "padded pass" not in breached
+        breached.close()
+
+    def test_too_small_capacity_fails_cleanly(self, tmp_path):
+        source = tmp_path / "banned.txt"
+        source.write_text("".join(f"word{i}\n" for i in range(100)))
+        with pytest.raises(SystemExit):
+            build_breached_filter.main([str(tmp_path / "out.filter"), str(source), "--plaintext", "--capacity", "10"])
+        assert not (tmp_path / "out.filter").exists()
+
+    def test_stdin_requires_capacity(self, tmp_path):
+        with pytest.raises(SystemExit):
+            build_breached_filter.main([str(tmp_path / "out.filter"), "-"])
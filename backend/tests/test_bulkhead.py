@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.services.bulkhead import Bulkhead, BulkheadFullError, BulkheadLimits
+
+
+class TestBulkhead:
+    @pytest.mark.anyio
+    async def test_caps_concurrency(self):
+        bulkhead = Bulkhead("avis", BulkheadLimits(max_concurrent=3, max_queue=10))
+        running = peak = 0
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        results = await asyncio.gather(*(bulkhead.run(work) for _ in range(10)))
+        assert results == ["ok"] * 10
+        assert peak == 3
+        assert bulkhead.snapshot()["active"] == 0
+
+    @pytest.mark.anyio
+    async def test_full_queue_rejects_immediately(self):
+        bulkhead = Bulkhead("budget", BulkheadLimits(max_concurrent=1, max_queue=1, queue_timeout_seconds=2.5))
+        release = asyncio.Event()
+        running = asyncio.ensure_future(bulkhead.run(release.wait))
+        queued = asyncio.ensure_future(bulkhead.run(release.wait))
+        await asyncio.sleep(0)
+        assert bulkhead.snapshot()["waiting"] == 1
+
+        with pytest.raises(BulkheadFullError) as excinfo:
+            await bulkhead.run(release.wait)
+        assert excinfo.value.retry_after == 3
+        assert "budget database is busy" in str(excinfo.value)
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    @pytest.mark.anyio
+    async def test_queued_call_gives_up_at_deadline(self):
+        bulkhead = Bulkhead("avis", BulkheadLimits(max_concurrent=1, max_queue=5, queue_timeout_seconds=0.05))
+        release = asyncio.Event()
+        running = asyncio.ensure_future(bulkhead.run(release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(BulkheadFullError):
+            await bulkhead.run(release.wait)
+        assert bulkhead.snapshot()["waiting"] == 0
+
+        release.set()
+        await running
+        assert await bulkhead.run(asyncio.sleep, 0, "free") == "free"
+
+    @pytest.mark.anyio
+    async def test_slot_released_when_call_fails(self):
+        bulkhead = Bulkhead("avis", BulkheadLimits(max_concurrent=1))
+
+        async def fail():
+            raise ValueError("ORA-01017")
+
+        with pytest.raises(ValueError):
+            await bulkhead.run(fail)
+        assert bulkhead.snapshot()["active"] == 0
+        assert await bulkhead.run(asyncio.sleep, 0, "ok") == "ok"
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, probe_listener
+from app.services.oracle import OracleServiceError
+
+NO_LISTENER = OracleServiceError("An unexpected database error occurred.", code=12541)
+BAD_PASSWORD = OracleServiceError("Invalid username or current password.", code=1017)
+
+
+async def failing(error):
+    raise error
+
+
+async def succeeding():
+    return "ok"
+
+
+async def trip(breaker: CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        with pytest.raises(OracleServiceError):
+            await breaker.call(failing, NO_LISTENER)
+
+
+class TestCircuitBreaker:
+    @pytest.mark.anyio
+    async def test_opens_after_consecutive_transient_failures(self):
+        breaker = CircuitBreaker("avis", failure_threshold=3)
+        await trip(breaker, 2)
+        assert breaker.state == "closed"
+
+        await trip(breaker, 1)
+        assert breaker.state == "open"
+
+    @pytest.mark.anyio
+    async def test_open_circuit_fails_fast_without_calling(self):
+        breaker = CircuitBreaker("avis", failure_threshold=1)
+        await trip(breaker, 1)
+        calls = []
+
+        async def tracked():
+            calls.append(1)
+
+        with pytest.raises(CircuitOpenError, match="avis database is temporarily unavailable"):
+            await breaker.call(tracked)
+        assert calls == []
+
+    @pytest.mark.anyio
+    async def test_credential_errors_do_not_trip(self):
+        breaker = CircuitBreaker("avis", failure_threshold=2)
+        await trip(breaker, 1)
+        with pytest.raises(OracleServiceError):
+            await breaker.call(failing, BAD_PASSWORD)
+        await trip(breaker, 1)
+        assert breaker.state == "closed"
+
+    @pytest.mark.anyio
+    async def test_probe_half_opens_and_trial_success_closes(self):
+        breaker = CircuitBreaker("avis", failure_threshold=1)
+        await trip(breaker, 1)
+
+        breaker.record_probe(False)
+        assert breaker.state == "open"
+        breaker.record_probe(True)
+        assert breaker.state == "half_open"
+
+        assert await breaker.call(succeeding) == "ok"
+        assert breaker.state == "closed"
+
+    @pytest.mark.anyio
+    async def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("avis", failure_threshold=5)
+        await trip(breaker, 5)
+        breaker.record_probe(True)
+
+        await trip(breaker, 1)
+        assert breaker.state == "open"
+
+    @pytest.mark.anyio
+    async def test_half_open_admits_one_trial_at_a_time(self):
+        breaker = CircuitBreaker("avis", failure_threshold=1)
+        await trip(breaker, 1)
+        breaker.record_probe(True)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        trial = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeeding)
+        release.set()
+        assert await trial == "ok"
+
+    def test_snapshot(self):
+        breaker = CircuitBreaker("avis")
+        assert breaker.snapshot() == {
+            "state": "closed",
+            "consecutive_failures": 0,
+            "open_for_seconds": None,
+            "last_probe_ok": None,
+        }
+
+
+class TestProbeListener:
+    @pytest.mark.anyio
+    async def test_reachable_listener(self):
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            assert await probe_listener("127.0.0.1", port, timeout=1.0) is True
+
+    @pytest.mark.anyio
+    async def test_unreachable_listener(self):
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        assert await probe_listener("127.0.0.1", port, timeout=1.0) is False
@@ -0,0 +1,177 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main as app_main
+from app.main import app
+from app.services.bulkhead import Bulkhead, BulkheadLimits
+
+VERIFY_ENDPOINT = "/verify-credentials"
+
+# Starlette runs sync endpoints on an anyio threadpool capped at 40 tokens.
+THREADPOOL_SIZE = 40
+
+
+class TestConcurrentLogons:
+    @pytest.mark.anyio
+    async def test_in_flight_logons_exceed_threadpool_size(self, disable_rate_limit):
+        requests = THREADPOOL_SIZE * 3
+        in_flight = 0
+        peak = 0
+        all_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_connect(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            if in_flight == requests:
+                all_started.set()
+            await release.wait()
+            in_flight -= 1
+            conn = MagicMock()
+            conn.close = AsyncMock()
+            return conn
+
+        roomy = Bulkhead("avis", BulkheadLimits(max_concurrent=requests))
+        with (
+            patch("app.services.oracle.oracledb.connect_async", side_effect=slow_connect),
+            patch.dict("app.main.bulkheads", {"avis": roomy}),
+        ):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                calls = [
+                    client.post(
+                        VERIFY_ENDPOINT,
+                        json={"brand": "avis", "username": f"user{i}", "current_password": "tiger"},
+                    )
+                    for i in range(requests)
+                ]
+                pending = asyncio.gather(*calls)
+                await asyncio.wait_for(all_started.wait(), timeout=10)
+                release.set()
+                responses = await pending
+
+        assert peak == requests
+        assert peak > THREADPOOL_SIZE
+        assert all(res.json()["success"] for res in responses)
+
+
+class TestDuplicateVerifyCoalescing:
+    @pytest.mark.anyio
+    async def test_identical_parallel_verifies_make_one_connect_call(self, disable_rate_limit):
+        requests = 20
+        release = asyncio.Event()
+        conn = MagicMock()
+        conn.close = AsyncMock()
+
+        async def slow_connect(**kwargs):
+            await release.wait()
+            return conn
+
+        with patch("app.services.oracle.oracledb.connect_async", side_effect=slow_connect) as mock_connect:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+                pending = asyncio.gather(*(client.post(VERIFY_ENDPOINT, json=body) for _ in range(requests)))
+                while mock_connect.call_count == 0:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                release.set()
+                responses = await pending
+
+        assert mock_connect.call_count == 1
+        assert all(res.json()["success"] for res in responses)
+        tokens = {res.json()["verification_token"] for res in responses}
+        assert len(tokens) == 1
+
+    @pytest.mark.anyio
+    async def test_every_token_from_a_coalesced_verify_can_be_consumed(self, disable_rate_limit):
+        release = asyncio.Event()
+        conn = MagicMock()
+        conn.close = AsyncMock()
+
+        async def slow_connect(**kwargs):
+            await release.wait()
+            return conn
+
+        with patch("app.services.oracle.oracledb.connect_async", side_effect=slow_connect) as mock_connect:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                body = {"brand": "avis", "username": "scott", "current_password": "tiger"}
+                pending = asyncio.gather(*(client.post(VERIFY_ENDPOINT, json=body) for _ in range(3)))
+                while mock_connect.call_count == 0:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                release.set()
+                responses = await pending
+
+        tokens = {res.json()["verification_token"] for res in responses}
+        for token in tokens:
+            app_main.verification_store.consume_token(token, "scott", "avis")
+
+    @pytest.mark.anyio
+    async def test_different_passwords_are_not_coalesced(self, disable_rate_limit):
+        release = asyncio.Event()
+        conn = MagicMock()
+        conn.close = AsyncMock()
+
+        async def slow_connect(**kwargs):
+            await release.wait()
+            return conn
+
+        with patch("app.services.oracle.oracledb.connect_async", side_effect=slow_connect) as mock_connect:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                pending = asyncio.gather(*(
+                    client.post(VERIFY_ENDPOINT, json={"brand": "avis", "username": "scott", "current_password": pw})
+                    for pw in ("tiger", "lion")
+                ))
+                while mock_connect.call_count < 2:
+                    await asyncio.sleep(0.01)
+                release.set()
+                await pending
+
+        assert mock_connect.call_count == 2
+
+
+class TestBrandBulkheads:
+    @pytest.mark.anyio
+    async def test_slow_brand_does_not_hold_up_the_other(self, disable_rate_limit):
+        release = asyncio.Event()
+
+        async def connect(**kwargs):
+            if "budget" in kwargs["params"].service_name:
+                await release.wait()
+            conn = MagicMock()
+            conn.close = AsyncMock()
+            return conn
+
+        limits = BulkheadLimits(max_concurrent=2, max_queue=2, queue_timeout_seconds=5)
+        with (
+            patch("app.services.oracle.oracledb.connect_async", side_effect=connect),
+            patch.dict("app.main.bulkheads", {"budget": Bulkhead("budget", limits)}),
+        ):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                stuck = [
+                    asyncio.ensure_future(
+                        client.post(
+                            VERIFY_ENDPOINT,
+                            json={"brand": "budget", "username": f"user{i}", "current_password": "tiger"},
+                        )
+                    )
+                    for i in range(4)
+                ]
+                await asyncio.sleep(0.1)
+                overflow = await client.post(
+                    VERIFY_ENDPOINT, json={"brand": "budget", "username": "late", "current_password": "tiger"}
+                )
+                other = await client.post(
+                    VERIFY_ENDPOINT, json={"brand": "avis", "username": "scott", "current_password": "tiger"}
+                )
+                release.set()
+                stuck = await asyncio.gather(*stuck)
+
+        assert overflow.status_code == 503
+        assert overflow.headers["Retry-After"] == "5"
+        assert "busy" in overflow.json()["message"]
+        assert other.json()["success"] is True
+        assert all(res.json()["success"] for res in stuck)
@@ -30,3 +30,23 @@ class TestSettings:
         monkeypatch.delenv("ORACLE_DSN", raising=False)
         with pytest.raises(ValidationError, match="oracle_dsn_budget"):
             Settings(_env_file=None, oracle_dsn_avis="localhost:1521/avisdb")
+
+    def test_signed_token_mode_requires_secret(self, monkeypatch):
+        monkeypatch.delenv("VERIFICATION_TOKEN_SECRET", raising=False)
+        with pytest.raises(ValidationError, match="verification_token_secret"):
+            Settings(
+                _env_file=None,
+                oracle_dsn_avis="localhost:1521/avisdb",
+                oracle_dsn_budget="localhost:1521/budgetdb",
+                verification_token_mode="signed",
+            )
+
+    def test_signed_token_mode_with_secret_accepted(self):
+        settings = Settings(
+            _env_file=None,
+            oracle_dsn_avis="localhost:1521/avisdb",
+            oracle_dsn_budget="localhost:1521/budgetdb",
+            verification_token_mode="signed",
+            verification_token_secret="s" * 32,
+        )
+        assert settings.verification_token_mode == "signed"
@@ -0,0 +1,65 @@
+import pytest
+
+from app.config import Settings
+from app.services.connect_params import ConnectParamsCache
+
+
+def make_settings(**overrides) -> Settings:
+    values = {
+        "_env_file": None,
+        "oracle_dsn_avis": "avis-db:1521/avis_service",
+        "oracle_dsn_budget": "budget-db:1522/budget_service",
+        **overrides,
+    }
+    return Settings(**values)
+
+
+class TestConnectParamsCache:
+    def test_params_are_prebuilt_per_brand(self):
+        cache = ConnectParamsCache(make_settings(oracle_tcp_connect_timeout=3.5, oracle_retry_count=2))
+
+        avis = cache.get("avis")
+        budget = cache.get("budget")
+
+        assert (avis.host, avis.port, avis.service_name) == ("avis-db", 1521, "avis_service")
+        assert (budget.host, budget.port, budget.service_name) == ("budget-db", 1522, "budget_service")
+        assert avis.tcp_connect_timeout == 3.5
+        assert avis.retry_count == 2
+
+    def test_lookup_returns_the_same_instance(self):
+        cache = ConnectParamsCache(make_settings())
+        assert cache.get("avis") is cache.get("avis")
+
+    def test_unknown_brand_rejected(self):
+        cache = ConnectParamsCache(make_settings())
+        with pytest.raises(ValueError, match="Unknown brand: hertz"):
+            cache.get("hertz")
+
+    def test_failover_addresses_are_prebuilt_in_order(self):
+        cache = ConnectParamsCache(
+            make_settings(oracle_dsns={"budget": ["budget-a:1521/budget_service", "budget-b:1521/budget_service"]})
+        )
+        assert [p.host for p in cache.targets("budget")] == ["budget-a", "budget-b"]
+        assert cache.get("budget").host == "budget-a"
+        assert [p.host for p in cache.targets("avis")] == ["avis-db"]
+
+    def test_reload_replaces_params(self):
+        cache = ConnectParamsCache(make_settings())
+        old = cache.get("avis")
+
+        cache.reload(make_settings(oracle_dsn_avis="avis-standby:1521/avis_service"))
+
+        assert cache.get("avis") is not old
+        assert cache.get("avis").host == "avis-standby"
+
+    def test_tnsnames_alias_resolved_once_at_build(self, tmp_path):
+        (tmp_path / "tnsnames.ora").write_text(
+            "AVIS = (DESCRIPTION=(ADDRESS=(PROTOCOL=TCP)(HOST=avis-tns)(PORT=1530))"
+            "(CONNECT_DATA=(SERVICE_NAME=avis_tns)))\n"
+        )
+        cache = ConnectParamsCache(make_settings(oracle_dsn_avis="AVIS", oracle_config_dir=str(tmp_path)))
+
+        (tmp_path / "tnsnames.ora").unlink()
+
+        assert cache.get("avis").host == "avis-tns"
+        assert cache.get("avis").port == 1530
@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.failover import Failover
+from app.services.oracle import OracleServiceError
+
+NO_LISTENER = OracleServiceError("unreachable", code=12541)
+LOST_CONTACT = OracleServiceError("lost contact", code=3113)
+BAD_PASSWORD = OracleServiceError("Invalid username or current password.", code=1017)
+
+
+def logon_with(*outcomes):
+    """AsyncMock logon that raises or returns each outcome in turn."""
+    return AsyncMock(side_effect=list(outcomes))
+
+
+@pytest.fixture()
+def no_sleep():
+    with patch("app.services.failover.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+        yield mock_sleep
+
+
+class TestFailover:
+    @pytest.mark.anyio
+    async def test_fails_over_to_next_address_without_waiting(self, no_sleep):
+        logon = logon_with(NO_LISTENER, "ok")
+        result = await Failover(attempts=3).call(["primary", "standby"], logon, True, "scott", "tiger")
+        assert result == "ok"
+        assert [c.args for c in logon.call_args_list] == [("scott", "tiger", "primary"), ("scott", "tiger", "standby")]
+        no_sleep.assert_not_awaited()
+
+    @pytest.mark.anyio
+    async def test_backs_off_between_passes(self, no_sleep):
+        logon = logon_with(NO_LISTENER, NO_LISTENER, "ok")
+        failover = Failover(attempts=3, backoff_seconds=0.5, backoff_max_seconds=1.0)
+        assert await failover.call(["only"], logon, True) == "ok"
+        assert logon.await_count == 3
+        delays = [c.args[0] for c in no_sleep.await_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0
+
+    @pytest.mark.anyio
+    async def test_attempts_are_bounded(self, no_sleep):
+        logon = logon_with(*[NO_LISTENER] * 5)
+        with pytest.raises(OracleServiceError) as excinfo:
+            await Failover(attempts=2).call(["a", "b"], logon, True)
+        assert excinfo.value is NO_LISTENER
+        assert logon.await_count == 2
+
+    @pytest.mark.anyio
+    async def test_permanent_errors_are_not_retried(self, no_sleep):
+        logon = logon_with(BAD_PASSWORD, "ok")
+        with pytest.raises(OracleServiceError):
+            await Failover(attempts=3).call(["a", "b"], logon, True)
+        assert logon.await_count == 1
+
+    @pytest.mark.anyio
+    async def test_ambiguous_error_retried_only_when_idempotent(self, no_sleep):
+        verify = logon_with(LOST_CONTACT, "ok")
+        assert await Failover(attempts=3).call(["a", "b"], verify, True) == "ok"
+
+        reset = logon_with(LOST_CONTACT, "ok")
+        with pytest.raises(OracleServiceError) as excinfo:
+            await Failover(attempts=3).call(["a", "b"], reset, False)
+        assert excinfo.value is LOST_CONTACT
+        assert reset.await_count == 1
+
+    @pytest.mark.anyio
+    async def test_connect_phase_error_retried_for_password_change(self, no_sleep):
+        reset = logon_with(NO_LISTENER, "changed")
+        assert await Failover(attempts=3).call(["a", "b"], reset, False) == "changed"
+
+    @pytest.mark.anyio
+    async def test_load_balance_rotates_first_address(self, no_sleep):
+        failover = Failover(load_balance=True)
+        logon = AsyncMock(return_value="ok")
+        for _ in range(4):
+            await failover.call(["a", "b", "c"], logon, True)
+        assert [c.args[0] for c in logon.call_args_list] == ["a", "b", "c", "a"]
@@ -0,0 +1,68 @@
+import sys
+
+import pytest
+
+from app.services.failure_sketch import DecayingCountMinSketch, FailureLimitExceeded, FailureTracker
+
+
+class TestDecayingCountMinSketch:
+    def test_counts_without_decay(self):
+        sketch = DecayingCountMinSketch(width=1024, depth=4, half_life_seconds=60)
+        for _ in range(3):
+            sketch.add("u|avis|SCOTT", now=0.0)
+        assert sketch.estimate("u|avis|SCOTT", now=0.0) == pytest.approx(3.0)
+        assert sketch.estimate("u|avis|ADAMS", now=0.0) == 0.0
+
+    def test_counts_halve_every_half_life(self):
+        sketch = DecayingCountMinSketch(width=1024, depth=4, half_life_seconds=60)
+        for _ in range(8):
+            sketch.add("key", now=0.0)
+        assert sketch.estimate("key", now=60.0) == pytest.approx(4.0)
+        assert sketch.estimate("key", now=180.0) == pytest.approx(1.0)
+
+    def test_memory_is_constant_in_distinct_keys(self):
+        sketch = DecayingCountMinSketch(width=256, depth=4, half_life_seconds=60)
+        before = sys.getsizeof(sketch._counters)
+        for i in range(20_000):
+            sketch.add(f"u|avis|USER{i}", now=0.0)
+        assert sys.getsizeof(sketch._counters) == before
+
+    def test_estimates_never_undercount(self):
+        sketch = DecayingCountMinSketch(width=64, depth=4, half_life_seconds=60)
+        for i in range(2000):
+            sketch.add(f"noise{i}", now=0.0)
+        for _ in range(5):
+            sketch.add("target", now=0.0)
+        assert sketch.estimate("target", now=0.0) >= 5
+
+    def test_long_idle_spell_rescales_instead_of_overflowing(self):
+        sketch = DecayingCountMinSketch(width=64, depth=2, half_life_seconds=1)
+        sketch.add("key", now=0.0)
+        assert sketch.estimate("key", now=10_000.0) == pytest.approx(0.0)
+        sketch.add("key", now=10_000.0)
+        assert sketch.estimate("key", now=10_000.0) == pytest.approx(1.0)
+
+
+class TestFailureTracker:
+    def test_user_over_threshold_is_rejected(self):
+        tracker = FailureTracker(user_threshold=3, ip_threshold=0, half_life_seconds=900)
+        for _ in range(2):
+            tracker.record_failure("scott", "avis", "10.0.0.1")
+        tracker.check("scott", "avis", "10.0.0.1")
+
+        tracker.record_failure("SCOTT", "avis", "10.0.0.2")
+        with pytest.raises(FailureLimitExceeded, match="this account"):
+            tracker.check("scott", "avis", "10.0.0.3")
+
+    def test_users_are_tracked_per_brand(self):
+        tracker = FailureTracker(user_threshold=1, ip_threshold=0, half_life_seconds=900)
+        tracker.record_failure("scott", "avis", "10.0.0.1")
+        tracker.check("scott", "budget", "10.0.0.1")
+
+    def test_ip_cycling_usernames_is_rejected(self):
+        tracker = FailureTracker(user_threshold=5, ip_threshold=10, half_life_seconds=900)
+        for i in range(10):
+            tracker.record_failure(f"user{i}", "avis", "10.0.0.1")
+        with pytest.raises(FailureLimitExceeded):
+            tracker.check("fresh_user", "avis", "10.0.0.1")
+        tracker.check("fresh_user", "avis", "10.0.0.2")
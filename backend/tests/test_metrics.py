@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from app.services.metrics import MetricsRegistry, error_code_label
+
+
+class TestCounter:
+    def test_sums_increments_per_label_set(self):
+        counter = MetricsRegistry().counter("errors_total", "Errors.", ("brand", "code"))
+        counter.inc("avis", "ORA-01017")
+        counter.inc("avis", "ORA-01017")
+        counter.inc("budget", "ORA-12541", amount=3)
+        assert counter.values() == {("avis", "ORA-01017"): 2, ("budget", "ORA-12541"): 3}
+
+    def test_preregistered_series_start_at_zero(self):
+        counter = MetricsRegistry().counter("rejected_total", "Rejections.", ("brand",))
+        counter.preregister("avis")
+        assert counter.values() == {("avis",): 0}
+        assert 'rejected_total{brand="avis"} 0' in counter.render()
+
+    def test_preregister_checks_label_count(self):
+        counter = MetricsRegistry().counter("rejected_total", "Rejections.", ("brand",))
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.preregister("avis", "extra")
+
+    def test_merges_every_threads_shard(self):
+        counter = MetricsRegistry().counter("hits_total", "Hits.", ("brand",))
+
+        def hit():
+            for _ in range(1000):
+                counter.inc("avis")
+
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        hit()
+        assert counter.values() == {("avis",): 5000}
+
+
+class TestHistogram:
+    def test_observations_land_in_the_first_bucket_that_holds_them(self):
+        histogram = MetricsRegistry().histogram("logon_seconds", "Logons.", ("brand",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value, "avis")
+        assert histogram.values()[("avis",)] == [2, 1, 1, pytest.approx(2.65)]
+
+    def test_renders_cumulative_buckets_sum_and_count(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("logon_seconds", "Logon time.", ("brand",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "avis")
+        histogram.observe(0.5, "avis")
+        assert registry.render().splitlines() == [
+            "# HELP logon_seconds Logon time.",
+            "# TYPE logon_seconds histogram",
+            'logon_seconds_bucket{brand="avis",le="0.1"} 1',
+            'logon_seconds_bucket{brand="avis",le="1.0"} 2',
+            'logon_seconds_bucket{brand="avis",le="+Inf"} 2',
+            'logon_seconds_sum{brand="avis"} 0.55',
+            'logon_seconds_count{brand="avis"} 2',
+        ]
+
+    def test_rejects_unsorted_buckets(self):
+        with pytest.raises(ValueError, match="increasing"):
+            MetricsRegistry().histogram("logon_seconds", "Logons.", buckets=(1.0, 0.1))
+
+
+class TestRegistry:
+    def test_gauges_are_collected_at_render_time(self):
+        registry = MetricsRegistry()
+        live = {"tokens": 3}
+        registry.gauge("tokens", "Live tokens.", (), lambda: {(): live["tokens"]})
+        live["tokens"] = 7
+        assert "tokens 7" in registry.render().splitlines()
+
+    def test_rejects_duplicate_names(self):
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits.")
+        with pytest.raises(ValueError, match="Duplicate"):
+            registry.counter("hits_total", "Hits.")
+
+    def test_escapes_label_values(self):
+        counter = MetricsRegistry().counter("hits_total", "Hits.", ("path",))
+        counter.inc('a"b\\c\nd')
+        assert counter.render()[-1] == 'hits_total{path="a\\"b\\\\c\\nd"} 1'
+
+    def test_error_code_labels(self):
+        assert error_code_label(1017, None) == "ORA-01017"
+        assert error_code_label(None, "DPY-6005") == "DPY-6005"
+        assert error_code_label(None, None) == "unknown"
+
+
+class TestOverhead:
+    def test_instrumenting_a_request_costs_under_five_microseconds(self):
+        # Everything the API records for one request that fails with an Oracle
+        # error: the logon histogram, the error counter and the request histogram.
+        registry = MetricsRegistry()
+        requests = registry.histogram("request_seconds", "Requests.", ("endpoint", "brand", "outcome"))
+        logons = registry.histogram("logon_seconds", "Logons.", ("brand", "operation", "outcome"))
+        errors = registry.counter("errors_total", "Errors.", ("brand", "code"))
+        iterations = 20_000
+
+        def per_request_seconds() -> float:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                logons.observe(0.012, "avis", "verify", "error")
+                errors.inc("avis", "ORA-01017")
+                requests.observe(0.013, "/verify-credentials", "avis", "failed")
+            return (time.perf_counter() - start) / iterations
+
+        # Best of several runs, so a busy CI host does not fail the bound.
+        assert min(per_request_seconds() for _ in range(5)) < 5e-6
@@ -1,7 +1,8 @@
 import pytest
 from pydantic import ValidationError
 
-from app.models import CredentialCheckRequest, PasswordResetRequest, PasswordResetResponse
+from app.models import CredentialCheckRequest, PasswordChangeRequest, PasswordResetRequest, PasswordResetResponse
+from app.services.password_policy import PasswordPolicy
 
 
 class TestPasswordResetRequest:
@@ -69,6 +70,12 @@ class TestPasswordResetRequest:
                 brand="avis", username="scott", current_password="tiger", new_password="short", verification_token="token-123"
             )
 
+    def test_passwords_longer_than_oracle_allows_rejected(self):
+        for field in ("current_password", "new_password"):
+            body = {"current_password": "tiger", "new_password": "newpass123", field: "x" * 1025}
+            with pytest.raises(ValidationError):
+                PasswordResetRequest(brand="avis", username="scott", verification_token="token-123", **body)
+
     def test_exactly_8_char_new_password_accepted(self):
         req = PasswordResetRequest(
             brand="avis",
@@ -113,6 +120,27 @@ class TestPasswordResetRequest:
                 brand="avis", username="A" * 129, current_password="tiger", new_password="newpass123", verification_token="token-123"
             )
 
+    def test_brand_password_policy_enforced(self, override_brand):
+        override_brand("avis", password_policy=PasswordPolicy.model_validate("ora12c"))
+        with pytest.raises(ValidationError, match="must not contain the username"):
+            PasswordResetRequest(
+                brand="avis", username="scott", current_password="tiger", new_password="scott1234", verification_token="t"
+            )
+        req = PasswordResetRequest(
+            brand="budget", username="scott", current_password="tiger", new_password="scott1234", verification_token="t"
+        )
+        assert req.brand == "budget"
+
+
+class TestPasswordChangeRequest:
+    def test_valid_request_needs_no_token(self):
+        req = PasswordChangeRequest(brand="avis", username="scott", current_password="tiger", new_password="newpass123")
+        assert req.new_password == "newpass123"
+
+    def test_short_new_password_rejected(self):
+        with pytest.raises(ValidationError):
+            PasswordChangeRequest(brand="avis", username="scott", current_password="tiger", new_password="short")
+
 
 class TestPasswordResetResponse:
     def test_success_response(self):
@@ -1,6 +1,12 @@
 import pytest
 
-from app.services.oracle import reset_password, verify_credentials
+from app.services.oracle import (
+    OracleServiceError,
+    reset_password,
+    reset_password_async,
+    verify_credentials,
+    verify_credentials_async,
+)
 
 TEST_DSN = "localhost:1521/testdb"
 
@@ -64,3 +70,102 @@ class TestVerifyCredentials:
         with mock_oracle_error(1017):
             with pytest.raises(ValueError, match="Invalid username or current password"):
                 verify_credentials("scott", "wrongpw", TEST_DSN)
+
+
+class TestAsyncResetPassword:
+    @pytest.mark.anyio
+    async def test_returns_success_message(self, mock_oracle_async_success):
+        result = await reset_password_async("scott", "tiger", "newpass123", TEST_DSN)
+        assert result == "Password changed successfully."
+
+    @pytest.mark.anyio
+    async def test_calls_connect_async_with_correct_args(self, mock_oracle_async_success):
+        await reset_password_async("scott", "tiger", "newpass123", TEST_DSN)
+        mock_oracle_async_success.assert_awaited_once_with(
+            user="scott",
+            password="tiger",
+            dsn=TEST_DSN,
+            newpassword="newpass123",
+        )
+
+    @pytest.mark.anyio
+    async def test_closes_connection(self, mock_oracle_async_success):
+        await reset_password_async("scott", "tiger", "newpass123", TEST_DSN)
+        mock_oracle_async_success.return_value.close.assert_awaited_once()
+
+    @pytest.mark.anyio
+    async def test_complexity_not_met(self, mock_oracle_async_error):
+        with mock_oracle_async_error(28003):
+            with pytest.raises(ValueError, match="complexity requirements"):
+                await reset_password_async("scott", "tiger", "weak", TEST_DSN)
+
+
+class TestAsyncVerifyCredentials:
+    @pytest.mark.anyio
+    async def test_returns_success_message(self, mock_oracle_async_success):
+        result = await verify_credentials_async("scott", "tiger", TEST_DSN)
+        assert result == "Credentials verified."
+
+    @pytest.mark.anyio
+    async def test_invalid_credentials(self, mock_oracle_async_error):
+        with mock_oracle_async_error(1017):
+            with pytest.raises(ValueError, match="Invalid username or current password"):
+                await verify_credentials_async("scott", "wrongpw", TEST_DSN)
+
+    @pytest.mark.anyio
+    async def test_unknown_error_code(self, mock_oracle_async_error):
+        with mock_oracle_async_error(99999):
+            with pytest.raises(ValueError, match="unexpected database error"):
+                await verify_credentials_async("scott", "tiger", TEST_DSN)
+
+
+class TestPrebuiltConnectParams:
+    def test_params_are_passed_instead_of_dsn(self, mock_oracle_success):
+        import oracledb
+
+        params = oracledb.ConnectParams(host="localhost", port=1521, service_name="testdb")
+        verify_credentials("scott", "tiger", params)
+        mock_oracle_success.assert_called_once_with(user="scott", password="tiger", params=params)
+
+    @pytest.mark.anyio
+    async def test_async_params_are_passed_instead_of_dsn(self, mock_oracle_async_success):
+        import oracledb
+
+        params = oracledb.ConnectParams(host="localhost", port=1521, service_name="testdb")
+        await reset_password_async("scott", "tiger", "newpass123", params)
+        mock_oracle_async_success.assert_awaited_once_with(
+            user="scott", password="tiger", params=params, newpassword="newpass123"
+        )
+
+
+class TestErrorClassification:
+    @pytest.mark.parametrize("code", [3113, 12170, 12514, 12541])
+    def test_listener_errors_are_transient(self, mock_oracle_error, code):
+        with mock_oracle_error(code):
+            with pytest.raises(OracleServiceError) as excinfo:
+                verify_credentials("scott", "tiger", TEST_DSN)
+        assert excinfo.value.code == code
+        assert excinfo.value.transient
+
+    @pytest.mark.parametrize("code", [1017, 28003, 28007])
+    def test_request_errors_are_not_transient(self, mock_oracle_error, code):
+        with mock_oracle_error(code):
+            with pytest.raises(OracleServiceError) as excinfo:
+                verify_credentials("scott", "tiger", TEST_DSN)
+        assert not excinfo.value.transient
+
+    def test_driver_connect_failure_is_transient(self):
+        assert OracleServiceError("x", code=0, full_code="DPY-6005").transient
+
+    @pytest.mark.parametrize("code", [12170, 12514, 12541])
+    def test_listener_refusals_are_connect_phase(self, code):
+        assert OracleServiceError("x", code=code).connect_phase
+
+    @pytest.mark.parametrize("code", [3113, 3135, 12537, 1017])
+    def test_errors_after_connecting_are_not_connect_phase(self, code):
+        assert not OracleServiceError("x", code=code).connect_phase
+
+    def test_transient_errors_get_retry_message(self, mock_oracle_error):
+        with mock_oracle_error(12514):
+            with pytest.raises(OracleServiceError, match="could not be reached"):
+                verify_credentials("scott", "tiger", TEST_DSN)
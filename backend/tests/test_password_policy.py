@@ -0,0 +1,103 @@
+import random
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.services.password_policy import DEFAULT_POLICY, PasswordPolicy, _differs_by_at_least, check_password
+
+
+class TestPresets:
+    def test_default_only_enforces_length(self):
+        assert check_password(DEFAULT_POLICY, "12345678", "scott", "tiger") == []
+        assert check_password(DEFAULT_POLICY, "short", "scott", "tiger") == [
+            "Password must be at least 8 characters long."
+        ]
+
+    def test_preset_name_expands(self):
+        policy = PasswordPolicy.model_validate("ora12c")
+        assert policy.min_letters == 1
+        assert policy.min_digits == 1
+        assert policy.min_differing_chars == 3
+
+    def test_preset_with_overrides(self):
+        policy = PasswordPolicy.model_validate({"preset": "ora12c_strong", "min_length": 14})
+        assert policy.min_length == 14
+        assert policy.min_special == 2
+
+    def test_unknown_preset_rejected(self):
+        with pytest.raises(ValidationError):
+            PasswordPolicy.model_validate("ora11g")
+
+
+class TestOra12c:
+    policy = PasswordPolicy.model_validate("ora12c")
+
+    def test_accepts_compliant_password(self):
+        assert check_password(self.policy, "Welcome2024", "scott", "tiger") == []
+
+    def test_requires_letter_and_digit(self):
+        violations = check_password(self.policy, "abcdefgh", "scott", "tiger")
+        assert violations == ["Password must contain at least 1 digit."]
+
+    def test_rejects_username_and_reversed_username(self):
+        assert "Password must not contain the username." in check_password(self.policy, "xSCOTT123", "scott", "tiger")
+        assert "Password must not contain the username." in check_password(self.policy, "xttocs123", "scott", "tiger")
+
+    def test_rejects_oracle(self):
+        assert 'Password must not contain the word "oracle".' in check_password(
+            self.policy, "MyOracle99", "scott", "tiger"
+        )
+
+    def test_requires_difference_from_old_password(self):
+        violations = check_password(self.policy, "Welcome2025", "scott", "Welcome2024")
+        assert violations == ["Password must differ from the current password by at least 3 characters."]
+        assert check_password(self.policy, "Welcome2999", "scott", "Welcome2024") == []
+
+
+class TestOra12cStrong:
+    policy = PasswordPolicy.model_validate("ora12c_strong")
+
+    def test_accepts_compliant_password(self):
+        assert check_password(self.policy, "AB12cd!?xy", "scott", "tiger") == []
+
+    def test_reports_every_missing_class(self):
+        violations = check_password(self.policy, "abcdefghij", "scott", "tiger")
+        assert violations == [
+            "Password must contain at least 2 uppercase letters.",
+            "Password must contain at least 2 digits.",
+            "Password must contain at least 2 special characters.",
+        ]
+
+
+class TestDiffersByAtLeast:
+    def _levenshtein(self, a, b):
+        previous = list(range(len(b) + 1))
+        for i in range(1, len(a) + 1):
+            current = [i] + [0] * len(b)
+            for j in range(1, len(b) + 1):
+                current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            previous = current
+        return previous[-1]
+
+    @pytest.mark.parametrize(
+        "a,b", [("", ""), ("abc", ""), ("kitten", "sitting"), ("Welcome1", "Welcome2"), ("abcdef", "fedcba")]
+    )
+    @pytest.mark.parametrize("n", [1, 2, 3, 4])
+    def test_matches_full_levenshtein(self, a, b, n):
+        assert _differs_by_at_least(a, b, n) == (self._levenshtein(a, b) >= n)
+
+    def test_matches_full_levenshtein_on_random_strings(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            a = "".join(rng.choices("ab", k=rng.randint(0, 9)))
+            b = "".join(rng.choices("ab", k=rng.randint(0, 9)))
+            n = rng.randint(1, 5)
+            assert _differs_by_at_least(a, b, n) == (self._levenshtein(a, b) >= n), (a, b, n)
+
+    def test_long_near_identical_inputs_stay_fast(self):
+        a = "x" * 20_000
+        b = "x" * 19_999 + "y"
+        start = time.perf_counter()
+        assert not _differs_by_at_least(a, b, 3)
+        assert time.perf_counter() - start < 0.5
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from app.services.profiler import ProfilerBusyError, SamplingProfiler
+
+
+def busy_handler(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def read_stacks(path):
+    stacks = {}
+    for line in path.read_text().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        stacks[stack] = int(count)
+    return stacks
+
+
+class TestSamplingProfiler:
+    def test_writes_collapsed_stacks_rooted_at_the_route(self, tmp_path):
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_handler, args=(stop,), name="worker")
+        worker.start()
+        profiler = SamplingProfiler(str(tmp_path), interval_seconds=0.005)
+        try:
+            path = profiler.start(0.2, {busy_handler.__code__: "/verify-credentials"})
+            profiler.join()
+        finally:
+            stop.set()
+            worker.join()
+
+        stacks = read_stacks(path)
+        handler_stacks = [stack for stack in stacks if "test_profiler.py:busy_handler" in stack]
+        assert handler_stacks
+        assert all(stack.startswith("/verify-credentials;") for stack in handler_stacks)
+        assert sum(stacks[stack] for stack in handler_stacks) >= 5
+
+    def test_stacks_outside_a_route_are_rooted_at_the_thread(self, tmp_path):
+        profiler = SamplingProfiler(str(tmp_path), interval_seconds=0.005)
+        path = profiler.start(0.05)
+        profiler.join()
+        assert any(stack.startswith("[MainThread];") for stack in read_stacks(path))
+
+    def test_one_profile_at_a_time(self, tmp_path):
+        profiler = SamplingProfiler(str(tmp_path), interval_seconds=0.005)
+        profiler.start(0.2)
+        with pytest.raises(ProfilerBusyError):
+            profiler.start(0.2)
+        profiler.join()
+        profiler.start(0.01)
+        profiler.join()
+        assert len(list(tmp_path.glob("*.collapsed"))) == 2
+
+    def test_duration_is_bounded(self, tmp_path):
+        profiler = SamplingProfiler(str(tmp_path), max_seconds=60)
+        with pytest.raises(ValueError, match="at most 60"):
+            profiler.start(61)
+        with pytest.raises(ValueError):
+            profiler.start(0)
+        assert not profiler.running
@@ -0,0 +1,144 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.services.rate_limit import (
+    MemoryRateLimitStorage,
+    RateLimit,
+    RateLimiter,
+    RateLimitExceeded,
+    SQLiteRateLimitStorage,
+    parse_rate,
+    slide,
+)
+
+FIVE_PER_MINUTE = RateLimit(5, 60)
+
+
+class TestParseRate:
+    def test_valid_rates(self):
+        assert parse_rate("5/minute") == RateLimit(5, 60)
+        assert parse_rate("100 / hour") == RateLimit(100, 3600)
+
+    def test_invalid_rate_rejected(self):
+        with pytest.raises(ValueError, match="Invalid rate limit"):
+            parse_rate("5 per minute")
+
+
+class TestSlidingWindow:
+    def test_allows_up_to_limit_then_rejects(self):
+        state = None
+        for _ in range(5):
+            state, retry_after = slide(state, FIVE_PER_MINUTE, 60.0)
+            assert retry_after == 0
+        _, retry_after = slide(state, FIVE_PER_MINUTE, 60.0)
+        assert retry_after > 0
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        state = (1, 5, 0)
+        # A quarter into the next window, 75% of the previous 5 hits still count.
+        state, retry_after = slide(state, FIVE_PER_MINUTE, 135.0)
+        assert retry_after == 0
+        _, retry_after = slide(state, FIVE_PER_MINUTE, 135.0)
+        # Needs 5 * (1 - f) + 1 + 1 <= 5, i.e. f >= 0.4: 24s into the window.
+        assert retry_after == pytest.approx(9.0)
+
+    def test_full_window_retry_points_into_next_window(self):
+        _, retry_after = slide((1, 5, 0), FIVE_PER_MINUTE, 90.0)
+        # Allowed once 5 * (1 - f) + 1 <= 5 in the next window, i.e. f >= 0.2.
+        assert retry_after == pytest.approx(30.0 + 12.0)
+
+    def test_old_windows_are_forgotten(self):
+        state, retry_after = slide((1, 5, 5), FIVE_PER_MINUTE, 600.0)
+        assert retry_after == 0
+        assert state == (10, 1, 0)
+
+
+class TestMemoryRateLimitStorage:
+    def test_key_space_is_lru_bounded(self):
+        storage = MemoryRateLimitStorage(max_keys=3)
+        for i in range(10):
+            storage.hit(f"key{i}", FIVE_PER_MINUTE, 60.0)
+        assert len(storage) == 3
+
+
+class TestSQLiteRateLimitStorage:
+    def test_counters_are_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "limits.db")
+        worker_a = SQLiteRateLimitStorage(path, max_keys=100)
+        worker_b = SQLiteRateLimitStorage(path, max_keys=100)
+        for i in range(5):
+            storage = worker_a if i % 2 else worker_b
+            assert storage.hit("verify|ip|10.0.0.1", FIVE_PER_MINUTE, 60.0) == 0
+        assert worker_a.hit("verify|ip|10.0.0.1", FIVE_PER_MINUTE, 60.0) > 0
+
+    def test_prune_trims_to_max_keys(self, tmp_path):
+        storage = SQLiteRateLimitStorage(str(tmp_path / "limits.db"), max_keys=5, prune_every=10)
+        for i in range(10):
+            storage.hit(f"key{i}", FIVE_PER_MINUTE, 60.0)
+        (count,) = storage._conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()
+        assert count == 5
+
+
+    @pytest.mark.anyio
+    async def test_waiting_for_another_workers_lock_does_not_block_the_event_loop(self, tmp_path):
+        path = str(tmp_path / "limits.db")
+        storage = SQLiteRateLimitStorage(path, max_keys=100)
+        other_worker = sqlite3.connect(path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+        limiter = RateLimiter(storage, per_ip=FIVE_PER_MINUTE, per_user=FIVE_PER_MINUTE)
+
+        check = asyncio.create_task(limiter.check_async("verify", "10.0.0.1", "scott", "avis"))
+        start = time.monotonic()
+        await asyncio.sleep(0.05)
+        assert time.monotonic() - start < 0.5
+        assert not check.done()
+        other_worker.execute("COMMIT")
+        await check
+        other_worker.close()
+
+
+class TestRateLimiter:
+    def test_users_behind_one_ip_have_separate_quotas(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(100, 60), per_user=FIVE_PER_MINUTE)
+        for _ in range(5):
+            limiter.check("verify", "10.0.0.1", "scott", "avis")
+            limiter.check("verify", "10.0.0.1", "adams", "avis")
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            limiter.check("verify", "10.0.0.1", "SCOTT", "avis")
+        assert excinfo.value.retry_after >= 1
+
+    def test_one_username_is_throttled_across_ips(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(100, 60), per_user=FIVE_PER_MINUTE)
+        for i in range(5):
+            limiter.check("verify", f"10.0.0.{i}", "scott", "avis")
+        with pytest.raises(RateLimitExceeded):
+            limiter.check("verify", "10.0.0.99", "SCOTT", "avis")
+        limiter.check("verify", "10.0.0.99", "scott", "budget")
+
+    def test_per_ip_limit_caps_username_cycling(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(3, 60), per_user=FIVE_PER_MINUTE)
+        for i in range(3):
+            limiter.check("verify", "10.0.0.1", f"user{i}", "avis")
+        with pytest.raises(RateLimitExceeded):
+            limiter.check("verify", "10.0.0.1", "user99", "avis")
+
+    def test_scopes_are_independent(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(1, 60), per_user=FIVE_PER_MINUTE)
+        limiter.check("verify", "10.0.0.1", "scott", "avis")
+        limiter.check("reset", "10.0.0.1", "scott", "avis")
+
+    @pytest.mark.anyio
+    async def test_check_async_counts_like_check(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(100, 60), per_user=RateLimit(1, 60))
+        await limiter.check_async("verify", "10.0.0.1", "scott", "avis")
+        with pytest.raises(RateLimitExceeded):
+            await limiter.check_async("verify", "10.0.0.1", "scott", "avis")
+
+    def test_disabled_limiter_allows_everything(self):
+        limiter = RateLimiter(MemoryRateLimitStorage(100), per_ip=RateLimit(1, 60), per_user=RateLimit(1, 60))
+        limiter.enabled = False
+        for _ in range(10):
+            limiter.check("verify", "10.0.0.1", "scott", "avis")
@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.replay import arrivals, synthetic_user
+
+
+def _line(ts, status, user, ip, latency_ms=0):
+    return json.dumps(
+        {"ts": ts, "status": status, "brand": "avis", "user": user, "ip": ip, "reason": None, "latency_ms": latency_ms}
+    )
+
+
+class TestArrivals:
+    def test_cli_rotations_are_not_replayed(self):
+        lines = [
+            _line("2026-10-18T09:00:00+00:00", "VERIFY_SUCCESS", "scott", "10.0.0.1"),
+            _line("2026-10-18T09:00:01+00:00", "SUCCESS", "batch1", None),
+            _line("2026-10-18T09:00:02+00:00", "SUCCESS", "scott", "10.0.0.1"),
+            _line("2026-10-18T09:00:03+00:00", "FAILED", "batch2", None),
+        ]
+
+        replayed = list(arrivals(lines))
+
+        assert [(a.offset, a.endpoint, a.user) for a in replayed] == [
+            (0.0, "/verify-credentials", synthetic_user("avis", "scott")),
+            (2.0, "/reset-password", synthetic_user("avis", "scott")),
+        ]
+
+    def test_arrival_is_timestamp_minus_latency(self):
+        lines = [
+            _line("2026-10-18T09:00:01+00:00", "VERIFY_SUCCESS", "scott", "10.0.0.1", latency_ms=1500),
+            _line("2026-10-18T09:00:01+00:00", "VERIFY_FAILED", "adams", "10.0.0.2"),
+        ]
+
+        assert [(a.offset, a.user) for a in arrivals(lines)] == [
+            (0.0, synthetic_user("avis", "scott")),
+            (1.5, synthetic_user("avis", "adams")),
+        ]
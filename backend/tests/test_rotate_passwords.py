@@ -0,0 +1,289 @@
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.config import settings
+from app.services.audit import AuditLogger
+from app.services.connect_params import ConnectParamsCache
+from app.services.failover import Failover
+from app.services.oracle import OracleServiceError
+from app.tools import rotate_passwords
+from app.tools.rotate_passwords import (
+    ALREADY_ROTATED_MESSAGE,
+    PasswordRotator,
+    ResultWriter,
+    load_checkpoint,
+    read_rows,
+    rotate_all,
+)
+
+CSV = (
+    "brand,username,current_password,new_password\n"
+    "avis,svc_billing,Old#Pass2024,New#Pass2025\n"
+    "budget,svc_reports,Old#Pass2024,New#Pass2025\n"
+)
+
+
+def row(brand="avis", username="svc_billing", current="Old#Pass2024", new="New#Pass2025"):
+    return {"brand": brand, "username": username, "current_password": current, "new_password": new}
+
+
+def rotator(audit_logger=None, concurrency=4):
+    return PasswordRotator(
+        ConnectParamsCache(settings), Failover(attempts=1), audit_logger or MagicMock(spec=AuditLogger), None, concurrency
+    )
+
+
+def results_of(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestReadRows:
+    def test_csv_rows_are_numbered_from_one(self):
+        rows = list(read_rows(io.StringIO(CSV)))
+        assert [number for number, _ in rows] == [1, 2]
+        assert rows[1][1] == row("budget", "svc_reports")
+
+    def test_ndjson_is_detected_and_bad_lines_become_none(self):
+        stream = io.StringIO(json.dumps(row()) + "\n\nnot json\n")
+        assert list(read_rows(stream)) == [(1, row()), (2, None)]
+
+    def test_reads_lazily(self):
+        stream = io.StringIO(CSV)
+        rows = read_rows(stream)
+        next(rows)
+        assert stream.tell() < len(CSV)
+
+
+class TestRotateAll:
+    @pytest.mark.anyio
+    async def test_rotates_and_records_results_and_audit(self, tmp_path, mock_oracle_success):
+        audit_logger = MagicMock(spec=AuditLogger)
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        counts = await rotate_all(read_rows(io.StringIO(CSV)), rotator(audit_logger), writer, {})
+        writer.close()
+
+        assert counts == Counter(SUCCESS=2)
+        kwargs = mock_oracle_success.call_args.kwargs
+        assert kwargs["newpassword"] == "New#Pass2025"
+        results = results_of(tmp_path / "results.ndjson")
+        assert {(r["row"], r["brand"], r["user"], r["status"]) for r in results} == {
+            (1, "avis", "svc_billing", "IN_PROGRESS"),
+            (1, "avis", "svc_billing", "SUCCESS"),
+            (2, "budget", "svc_reports", "IN_PROGRESS"),
+            (2, "budget", "svc_reports", "SUCCESS"),
+        }
+        assert "#Pass202" not in (tmp_path / "results.ndjson").read_text()
+        statuses = sorted(c.args[0] for c in audit_logger.log_async.call_args_list)
+        assert statuses == ["SUCCESS", "SUCCESS"]
+        assert audit_logger.log_async.call_args.kwargs["ip"] is None
+
+    @pytest.mark.anyio
+    async def test_invalid_rows_fail_without_contacting_oracle(self, tmp_path, mock_oracle_success):
+        rows = iter([(1, row(brand="hertz")), (2, row(new="short")), (3, None)])
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        counts = await rotate_all(rows, rotator(), writer, {})
+        writer.close()
+
+        assert counts == Counter(FAILED=3)
+        mock_oracle_success.assert_not_called()
+        reasons = {r["row"]: r["reason"] for r in results_of(tmp_path / "results.ndjson")}
+        assert "Unknown brand: hertz" in reasons[1]
+        assert reasons[2].startswith("new_password:")
+        assert reasons[3] == "Row is not a JSON object."
+
+    @pytest.mark.anyio
+    async def test_oracle_errors_are_recorded_as_failures(self, tmp_path, mock_oracle_error):
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        with mock_oracle_error(28007):
+            counts = await rotate_all(iter([(1, row())]), rotator(), writer, {})
+        writer.close()
+        assert counts == Counter(FAILED=1)
+        assert results_of(tmp_path / "results.ndjson")[-1]["reason"] == "Password cannot be reused."
+
+    @pytest.mark.anyio
+    async def test_unmapped_errors_fail_the_row_and_the_rest_carry_on(self, tmp_path):
+        def reset(username, current_password, new_password, target):
+            if username == "svc_billing":
+                raise RuntimeError("driver fell over")
+            return "Password changed successfully."
+
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        with patch.object(rotate_passwords, "reset_password", side_effect=reset):
+            counts = await rotate_all(read_rows(io.StringIO(CSV)), rotator(), writer, {})
+        writer.close()
+
+        assert counts == Counter(FAILED=1, SUCCESS=1)
+        final = {r["user"]: r for r in results_of(tmp_path / "results.ndjson") if r["status"] != "IN_PROGRESS"}
+        assert final["svc_billing"]["reason"] == "RuntimeError: driver fell over"
+        assert final["svc_reports"]["status"] == "SUCCESS"
+
+    @pytest.mark.anyio
+    async def test_invalid_credentials_cost_one_logon_on_a_fresh_row(self, tmp_path):
+        bad_password = OracleServiceError("Invalid username or current password.", code=1017)
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        with (
+            patch.object(rotate_passwords, "reset_password", side_effect=bad_password),
+            patch.object(rotate_passwords, "verify_credentials") as verify,
+        ):
+            counts = await rotate_all(iter([(1, row())]), rotator(), writer, {})
+        writer.close()
+
+        assert counts == Counter(FAILED=1)
+        verify.assert_not_called()
+        assert [r["status"] for r in results_of(tmp_path / "results.ndjson")] == ["IN_PROGRESS", "FAILED"]
+
+    @pytest.mark.anyio
+    async def test_interrupted_row_with_new_password_in_effect_counts_as_done(self, tmp_path):
+        bad_password = OracleServiceError("Invalid username or current password.", code=1017)
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        done = {("avis", "svc_billing"): "IN_PROGRESS"}
+        with (
+            patch.object(rotate_passwords, "reset_password", side_effect=bad_password),
+            patch.object(rotate_passwords, "verify_credentials", return_value="Credentials verified.") as verify,
+        ):
+            counts = await rotate_all(iter([(1, row())]), rotator(), writer, done)
+        writer.close()
+
+        assert counts == Counter(SUCCESS=1)
+        assert verify.call_args.args[:2] == ("svc_billing", "New#Pass2025")
+        assert results_of(tmp_path / "results.ndjson")[-1]["message"] == ALREADY_ROTATED_MESSAGE
+
+    @pytest.mark.anyio
+    async def test_checkpointed_rows_are_skipped_and_failures_retried_on_request(self, tmp_path, mock_oracle_success):
+        done = {("avis", "svc_billing"): "SUCCESS", ("budget", "svc_reports"): "FAILED"}
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        assert await rotate_all(read_rows(io.StringIO(CSV)), rotator(), writer, done) == Counter(SKIPPED=2)
+        counts = await rotate_all(read_rows(io.StringIO(CSV)), rotator(), writer, done, retry_failed=True)
+        writer.close()
+        assert counts == Counter(SKIPPED=1, SUCCESS=1)
+        assert mock_oracle_success.call_args.kwargs["user"] == "svc_reports"
+
+    @pytest.mark.anyio
+    async def test_repeated_account_is_skipped_with_a_reason(self, tmp_path, mock_oracle_success, capsys):
+        rows = iter([(1, row()), (2, row(current="New#Pass2025", new="Newer#Pass2026")), (3, row(brand="budget"))])
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        counts = await rotate_all(rows, rotator(), writer, {})
+        writer.close()
+        assert counts == Counter(SUCCESS=2, SKIPPED=1)
+        assert mock_oracle_success.call_count == 2
+        assert "row 2: skipped, avis/svc_billing is already rotated by row 1" in capsys.readouterr().err
+        assert load_checkpoint(tmp_path / "results.ndjson") == {
+            ("avis", "svc_billing"): "SUCCESS",
+            ("budget", "svc_billing"): "SUCCESS",
+        }
+
+    @pytest.mark.anyio
+    async def test_concurrency_is_bounded_per_brand(self, tmp_path):
+        active, peak, lock = Counter(), Counter(), threading.Lock()
+
+        def slow_reset(username, current_password, new_password, target):
+            brand = username.split("_")[0]
+            with lock:
+                active[brand] += 1
+                peak[brand] = max(peak[brand], active[brand])
+            time.sleep(0.02)
+            with lock:
+                active[brand] -= 1
+            return "Password changed successfully."
+
+        rows = iter([(i, row(brand, f"{brand}_{i}")) for i in range(12) for brand in ("avis", "budget")])
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        with patch.object(rotate_passwords, "reset_password", side_effect=slow_reset):
+            counts = await rotate_all(rows, rotator(concurrency=2), writer, {})
+        writer.close()
+        assert counts == Counter(SUCCESS=24)
+        assert peak == Counter(avis=2, budget=2)
+
+    @pytest.mark.anyio
+    async def test_reads_at_most_max_pending_rows_ahead(self, tmp_path):
+        release = asyncio.Event()
+        consumed = 0
+
+        def rows():
+            nonlocal consumed
+            for i in range(1, 20):
+                consumed += 1
+                yield i, row(username=f"svc_{i}")
+
+        class Blocked:
+            async def rotate(self, number, row, **kwargs):
+                await release.wait()
+                return {"row": number, "brand": "avis", "user": row["username"], "status": "SUCCESS"}
+
+        writer = ResultWriter(tmp_path / "results.ndjson")
+        task = asyncio.create_task(rotate_all(rows(), Blocked(), writer, {}, max_pending=3))
+        await asyncio.sleep(0.1)
+        assert consumed == 4  # three in flight, one waiting for a slot
+        release.set()
+        assert await task == Counter(SUCCESS=19)
+        writer.close()
+
+
+class TestCheckpoint:
+    def test_last_status_wins_and_torn_lines_are_ignored(self, tmp_path):
+        path = tmp_path / "results.ndjson"
+        path.write_text(
+            '{"row":1,"brand":"avis","user":"a","status":"FAILED"}\n'
+            '{"row":1,"brand":"avis","user":"a","status":"SUCCESS"}\n'
+            '{"row":2,"brand":"avis","user":"b","sta'
+        )
+        assert load_checkpoint(path) == {("avis", "a"): "SUCCESS"}
+
+    def test_lines_without_brand_user_or_status_are_ignored(self, tmp_path):
+        path = tmp_path / "results.ndjson"
+        path.write_text(
+            '{"row":1,"brand":"avis","user":"a","status":"SUCCESS"}\n'
+            '{"row":2,"brand":"avis","status":"FAILED"}\n'
+            '{"row":3,"brand":"","user":"","status":"FAILED"}\n'
+            '{"row":4,"brand":"avis","user":"b"}\n'
+            '["avis","c","SUCCESS"]\n'
+        )
+        assert load_checkpoint(path) == {("avis", "a"): "SUCCESS"}
+
+    def test_missing_file_is_an_empty_checkpoint(self, tmp_path):
+        assert load_checkpoint(tmp_path / "absent.ndjson") == {}
+
+
+class TestMain:
+    def test_reads_rows_from_a_file_descriptor(self, tmp_path, mock_oracle_success):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, CSV.encode())
+        os.close(write_fd)
+        results = tmp_path / "results.ndjson"
+        audit_log = tmp_path / "audit.log"
+        try:
+            rotate_passwords.main(
+                ["--results", str(results), "--input-fd", str(read_fd), "--audit-log", str(audit_log)]
+            )
+        finally:
+            os.close(read_fd)
+
+        assert load_checkpoint(results) == {("avis", "svc_billing"): "SUCCESS", ("budget", "svc_reports"): "SUCCESS"}
+        audit = [json.loads(line) for line in audit_log.read_text().splitlines()]
+        assert {(r["status"], r["brand"], r["user"]) for r in audit} == {
+            ("SUCCESS", "avis", "svc_billing"),
+            ("SUCCESS", "budget", "svc_reports"),
+        }
+
+    def test_exits_nonzero_when_a_row_fails(self, tmp_path, mock_oracle_error):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, CSV.encode())
+        os.close(write_fd)
+        try:
+            with mock_oracle_error(1017), pytest.raises(SystemExit) as exc:
+                rotate_passwords.main([
+                    "--results", str(tmp_path / "r.ndjson"),
+                    "--input-fd", str(read_fd),
+                    "--audit-log", str(tmp_path / "audit.log"),
+                ])
+        finally:
+            os.close(read_fd)
+        assert exc.value.code == 1
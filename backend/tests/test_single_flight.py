@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    @pytest.mark.anyio
+    async def test_concurrent_identical_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def logon(name):
+            calls.append(name)
+            await release.wait()
+            return f"hello {name}"
+
+        key = flights.key("avis", "scott", "tiger")
+        waiters = [asyncio.create_task(flights.do(key, logon, "scott")) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["hello scott"] * 10
+        assert calls == ["scott"]
+        assert len(flights) == 0
+
+    @pytest.mark.anyio
+    async def test_failure_is_shared(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def logon():
+            await release.wait()
+            raise ValueError("Invalid username or current password.")
+
+        key = flights.key("avis", "scott", "wrong")
+        waiters = [asyncio.create_task(flights.do(key, logon)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        assert len(flights) == 0
+
+    @pytest.mark.anyio
+    async def test_different_passwords_are_not_coalesced(self):
+        flights = SingleFlight()
+        assert flights.key("avis", "scott", "tiger") != flights.key("avis", "scott", "lion")
+        assert flights.key("avis", "scott", "tiger") != flights.key("budget", "scott", "tiger")
+
+    @pytest.mark.anyio
+    async def test_sequential_calls_run_again(self):
+        flights = SingleFlight()
+        calls = []
+
+        async def logon():
+            calls.append(1)
+            return "ok"
+
+        key = flights.key("avis", "scott", "tiger")
+        await flights.do(key, logon)
+        await flights.do(key, logon)
+        assert len(calls) == 2
+
+    def test_key_does_not_contain_password(self):
+        key = SingleFlight().key("avis", "scott", "tiger")
+        assert "tiger" not in key
+        assert b"tiger" not in key[2]
+
+    @pytest.mark.anyio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def logon():
+            await release.wait()
+            return "ok"
+
+        key = flights.key("avis", "scott", "tiger")
+        first = asyncio.create_task(flights.do(key, logon))
+        second = asyncio.create_task(flights.do(key, logon))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "ok"
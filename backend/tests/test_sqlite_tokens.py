@@ -0,0 +1,93 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.services.sqlite_tokens import SQLiteVerificationTokenStore
+from app.services.verification_tokens import VerificationTokenError
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    return str(tmp_path / "tokens.db")
+
+
+class TestSQLiteVerificationTokenStore:
+    def test_token_can_be_used_once(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = store.create_token("scott", "avis")
+
+        store.consume_token(token, "scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_token_is_shared_between_connections(self, db_path):
+        worker_a = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        worker_b = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = worker_a.create_token("scott", "avis")
+
+        worker_b.consume_token(token, "scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            worker_a.consume_token(token, "scott", "avis")
+
+    def test_token_survives_reopen(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = store.create_token("scott", "avis")
+        store.close()
+
+        SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path).consume_token(token, "scott", "avis")
+
+    def test_token_rejected_for_wrong_brand(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="provided brand"):
+            store.consume_token(token, "scott", "budget")
+
+    def test_token_rejected_for_wrong_username(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="provided username"):
+            store.consume_token(token, "other_user", "avis")
+
+    def test_expired_tokens_are_swept(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=0, path=db_path)
+        token = store.create_token("scott", "avis")
+
+        store.sweep_expired()
+
+        assert len(store) == 0
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_raw_token_is_not_stored(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        token = store.create_token("scott", "avis")
+
+        stored = store._conn.execute("SELECT token_hash FROM verification_tokens").fetchone()[0]
+
+        assert token.encode() not in stored
+        assert len(stored) == 32
+
+    @pytest.mark.anyio
+    async def test_waiting_for_another_workers_lock_does_not_block_the_event_loop(self, db_path):
+        store = SQLiteVerificationTokenStore(ttl_seconds=300, path=db_path)
+        other_worker = sqlite3.connect(db_path, isolation_level=None)
+        other_worker.execute("BEGIN IMMEDIATE")
+
+        create = asyncio.create_task(store.create_token_async("scott", "avis"))
+        start = time.monotonic()
+        await asyncio.sleep(0.05)
+        assert time.monotonic() - start < 0.5
+        assert not create.done()
+        other_worker.execute("COMMIT")
+        token = await create
+        other_worker.close()
+
+        await store.consume_token_async(token, "scott", "avis")
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            await store.consume_token_async(token, "scott", "avis")
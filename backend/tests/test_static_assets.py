@@ -0,0 +1,116 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from app.services.static_assets import IMMUTABLE_CACHE_CONTROL, StaticAssets
+from app.tools import build_frontend
+
+FRONTEND = Path(__file__).resolve().parents[2] / "frontend"
+
+
+@pytest.fixture()
+def source(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "index.html").write_text(
+        '<link rel="stylesheet" href="styles.css" />\n'
+        '<div class="flex hover:opacity-100 w-[98px]">x</div>\n'
+        '<script src="app.js"></script>\n'
+    )
+    (src / "styles.css").write_text(
+        "/* comment */\n"
+        ".flex { display: flex; }\n"
+        ".grid { display: grid; }\n"
+        ".hover\\:opacity-100:hover { opacity: 1; }\n"
+        ".w-\\[98px\\] { width: 98px; }\n"
+        ".toast, .unused { animation: fade 1s; }\n"
+        "@keyframes fade { from { opacity: 0; } }\n"
+        "@keyframes spin { to { transform: rotate(360deg); } }\n"
+        "@media (min-width: 640px) { .grid { display: grid; } .flex { gap: 1rem; } }\n"
+    )
+    (src / "app.js").write_text('el.classList.add("toast");\n' + "const padding = 'x';\n" * 200)
+    return src
+
+
+def built_css(dist: Path) -> str:
+    [css] = (dist / "assets").glob("styles.*.css")
+    return css.read_text()
+
+
+class TestBuildFrontend:
+    def test_purges_classes_the_markup_and_scripts_do_not_use(self, source, tmp_path):
+        dist = tmp_path / "dist"
+        build_frontend.build(source, dist)
+        assert built_css(dist) == (
+            "@keyframes fade{from{opacity:0}}"
+            ".flex{display:flex}"
+            ".hover\\:opacity-100:hover{opacity:1}"
+            ".w-\\[98px\\]{width:98px}"
+            ".toast{animation:fade 1s}"
+            "@media (min-width: 640px){.flex{gap:1rem}}"
+        )
+
+    def test_assets_are_renamed_by_content_hash_and_compressed(self, source, tmp_path):
+        dist = tmp_path / "dist"
+        build_frontend.build(source, dist)
+        [script] = (dist / "assets").glob("app.*.js")
+        html = (dist / "index.html").read_text()
+        assert f'src="assets/{script.name}"' in html
+        assert gzip.decompress(script.with_name(script.name + ".gz").read_bytes()) == script.read_bytes()
+
+        (source / "app.js").write_text("changed();\n")
+        build_frontend.build(source, dist)
+        assert not script.exists()
+        assert len(list((dist / "assets").glob("app.*.js"))) == 1
+
+    def test_builds_the_real_frontend(self, tmp_path):
+        dist = tmp_path / "dist"
+        build_frontend.build(FRONTEND, dist)
+        html = (dist / "index.html").read_text()
+        assert "cdn.tailwindcss.com" not in html
+        assert "fonts.googleapis.com" not in html
+        css = built_css(dist)
+        assert ".toast-enter{" in css
+        assert ".bg-green-50{" in css
+        assert ".brand-text" not in css
+
+
+class TestStaticAssets:
+    @pytest.fixture()
+    def assets(self, source, tmp_path):
+        dist = tmp_path / "dist"
+        build_frontend.build(source, dist)
+        return StaticAssets(str(dist))
+
+    @pytest.fixture()
+    def script_name(self, assets, tmp_path):
+        return "assets/" + next((tmp_path / "dist" / "assets").glob("app.*.js")).name
+
+    def test_gzip_variant_served_when_accepted(self, assets, script_name):
+        res = assets.response(script_name, "gzip, deflate", None)
+        assert res.headers["Content-Encoding"] == "gzip"
+        assert res.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+        assert res.headers["Vary"] == "Accept-Encoding"
+        assert res.headers["Content-Type"] == "text/javascript; charset=utf-8"
+
+    def test_identity_when_gzip_refused(self, assets, script_name):
+        res = assets.response(script_name, "gzip;q=0", None)
+        assert "Content-Encoding" not in res.headers
+
+    def test_matching_etag_gets_304(self, assets):
+        etag = assets.response("index.html", "gzip", None).headers["ETag"]
+        assert etag.startswith('"')
+        res = assets.response("index.html", "gzip", f'"other", {etag}')
+        assert res.status_code == 304
+        assert res.body == b""
+        assert res.headers["Cache-Control"] == "no-cache"
+
+    def test_each_encoding_has_its_own_etag(self, assets):
+        gzipped = assets.response("index.html", "gzip", None).headers["ETag"]
+        identity = assets.response("index.html", "", None).headers["ETag"]
+        assert gzipped != identity
+        assert assets.response("index.html", "", gzipped).status_code == 200
+
+    def test_unknown_files_are_404(self, assets):
+        assert assets.response("assets/../../etc/passwd", "", None).status_code == 404
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.timing import (
+    RequestTimer,
+    RequestTiming,
+    ServerTimingMiddleware,
+    SlowRequestLog,
+    _current_timer,
+    mark_validated,
+    span,
+)
+
+
+async def _drive(app, path="/verify-credentials"):
+    """Run one request through an ASGI app and return the response start message."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": "POST", "path": path, "headers": []}, receive, send)
+    return messages[0]
+
+
+async def _endpoint(scope, receive, send):
+    mark_validated(brand="avis", user="scott")
+    with span("connect"):
+        await asyncio.sleep(0.01)
+    with span("connect"):
+        pass
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class TestSpans:
+    def test_span_is_a_no_op_outside_a_sampled_request(self):
+        assert _current_timer.get() is None
+        with span("connect"):
+            pass
+
+    def test_repeated_phases_add_up(self):
+        timer = RequestTimer()
+        token = _current_timer.set(timer)
+        try:
+            for _ in range(3):
+                with span("connect"):
+                    pass
+            with pytest.raises(RuntimeError), span("audit"):
+                raise RuntimeError
+        finally:
+            _current_timer.reset(token)
+        assert list(timer.phases) == ["connect", "audit"]
+
+    def test_server_timing_header_value(self):
+        timer = RequestTimer()
+        timer.add("validate", 0.0012)
+        timer.add("connect", 0.25)
+        header = timer.server_timing()
+        assert header.startswith("validate;dur=1.2, connect;dur=250.0, total;dur=")
+
+
+class TestServerTimingMiddleware:
+    @pytest.mark.anyio
+    async def test_sampled_requests_get_a_server_timing_header(self):
+        app = ServerTimingMiddleware(_endpoint, RequestTiming(1.0, 10_000, None))
+        start = await _drive(app)
+        headers = dict(start["headers"])
+        phases = [entry.split(";")[0] for entry in headers[b"server-timing"].decode().split(", ")]
+        assert phases == ["validate", "connect", "total"]
+
+    @pytest.mark.anyio
+    async def test_unsampled_requests_pass_through(self):
+        app = ServerTimingMiddleware(_endpoint, RequestTiming(0.0, 0, None))
+        start = await _drive(app)
+        assert start["headers"] == []
+
+    @pytest.mark.anyio
+    async def test_slow_requests_are_logged_with_their_phases(self, tmp_path):
+        path = tmp_path / "slow.log"
+        slow_log = SlowRequestLog(str(path))
+        slow_log.start()
+        app = ServerTimingMiddleware(_endpoint, RequestTiming(1.0, 5, slow_log))
+        await _drive(app)
+        fast = ServerTimingMiddleware(_endpoint, RequestTiming(1.0, 60_000, slow_log))
+        await _drive(fast)
+        slow_log.stop()
+
+        [record] = [json.loads(line) for line in path.read_text().splitlines()]
+        assert record["path"] == "/verify-credentials"
+        assert record["status"] == 200
+        assert record["brand"] == "avis"
+        assert record["user"] == "scott"
+        assert record["total_ms"] >= 10
+        assert set(record["phases_ms"]) == {"validate", "connect"}
+        assert record["phases_ms"]["connect"] >= 10
+
+    def test_sample_rate_bounds(self):
+        assert not RequestTiming(0.0, 0, None).sampled()
+        assert RequestTiming(1.0, 0, None).sampled()
@@ -1,6 +1,15 @@
+from unittest.mock import patch
+
 import pytest
 
-from app.services.verification_tokens import VerificationTokenError, VerificationTokenStore
+from app.config import Settings
+from app.services.sqlite_tokens import SQLiteVerificationTokenStore
+from app.services.verification_tokens import (
+    SignedVerificationTokenStore,
+    VerificationTokenError,
+    VerificationTokenStore,
+    create_verification_store,
+)
 
 
 class TestVerificationTokenStore:
@@ -26,3 +35,188 @@ class TestVerificationTokenStore:
 
         with pytest.raises(VerificationTokenError, match="provided username"):
             store.consume_token(token, "other_user", "avis")
+
+    def test_expired_token_is_rejected(self):
+        store = VerificationTokenStore(ttl_seconds=0)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_expired_tokens_are_swept_from_queue_front(self):
+        store = VerificationTokenStore(ttl_seconds=0)
+        for _ in range(10):
+            store.create_token("scott", "avis")
+
+        store.sweep_expired()
+
+        assert len(store) == 0
+        assert not store._expiry_queue
+
+    def test_live_tokens_survive_sweep(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+        token = store.create_token("scott", "avis")
+
+        store.sweep_expired()
+
+        assert len(store) == 1
+        store.consume_token(token, "scott", "avis")
+
+    def test_token_with_lone_surrogate_rejected_as_expired(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token("\ud800", "scott", "avis")
+
+    def test_newer_verify_replaces_the_users_token(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+        first = store.create_token("scott", "avis")
+        second = store.create_token("scott", "avis")
+        other_brand = store.create_token("scott", "budget")
+
+        assert len(store) == 2
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(first, "scott", "avis")
+        store.consume_token(second, "scott", "avis")
+        store.consume_token(other_brand, "scott", "budget")
+
+    def test_oldest_token_is_evicted_at_capacity(self):
+        store = VerificationTokenStore(ttl_seconds=300, capacity=2)
+        oldest = store.create_token("alice", "avis")
+        kept = store.create_token("bob", "avis")
+        newest = store.create_token("carol", "avis")
+
+        assert len(store) == 2
+        assert store.evicted == 1
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(oldest, "alice", "avis")
+        store.consume_token(kept, "bob", "avis")
+        store.consume_token(newest, "carol", "avis")
+
+    def test_replacing_a_token_at_capacity_evicts_nothing(self):
+        store = VerificationTokenStore(ttl_seconds=300, capacity=2)
+        alice = store.create_token("alice", "avis")
+        store.create_token("bob", "avis")
+        store.create_token("bob", "avis")
+
+        assert store.evicted == 0
+        store.consume_token(alice, "alice", "avis")
+
+    def test_expiry_follows_the_monotonic_clock(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+        with patch("app.services.verification_tokens.time.monotonic", return_value=1000.0):
+            token = store.create_token("scott", "avis")
+        with patch("app.services.verification_tokens.time.monotonic", return_value=1300.0):
+            store.sweep_expired()
+        assert len(store) == 0
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_entries_are_compact(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+        store.create_token("scott", "".join(["av", "is"]))
+        store.create_token("tiger", "".join(["av", "is"]))
+
+        credentials = list(store._tokens.values())
+        assert all(isinstance(key, bytes) and len(key) == 32 for key in store._tokens)
+        assert credentials[0].brand is credentials[1].brand
+        assert isinstance(credentials[0].expires_at, float)
+
+    def test_queue_of_consumed_tokens_stays_bounded(self):
+        store = VerificationTokenStore(ttl_seconds=300)
+        store.create_token("long_lived", "avis")
+        for i in range(1_000):
+            store.consume_token(store.create_token(f"user{i}", "avis"), f"user{i}", "avis")
+
+        assert len(store) == 1
+        assert len(store._expiry_queue) <= 2 * len(store) + 65
+        assert store._users["avis"].keys() == {"long_lived"}
+
+
+SECRET = b"0123456789abcdef0123456789abcdef"
+
+
+class TestSignedVerificationTokenStore:
+    def test_token_validates_on_another_instance(self):
+        issuer = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        other_worker = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        token = issuer.create_token("scott", "avis")
+
+        other_worker.consume_token(token, "scott", "avis")
+
+    def test_token_can_be_used_once(self):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        token = store.create_token("scott", "avis")
+
+        store.consume_token(token, "scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_token_rejected_for_wrong_brand(self):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="provided brand"):
+            store.consume_token(token, "scott", "budget")
+
+    def test_token_rejected_for_wrong_username(self):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="provided username"):
+            store.consume_token(token, "other_user", "avis")
+
+    def test_token_signed_with_other_secret_rejected(self):
+        issuer = SignedVerificationTokenStore(ttl_seconds=300, secret=b"x" * 32)
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        token = issuer.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_tampered_payload_rejected(self):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+        payload, _, signature = store.create_token("scott", "avis").partition(".")
+        forged = payload[:-2] + ("A" if payload[-2] != "A" else "B") + payload[-1]
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(f"{forged}.{signature}", "scott", "avis")
+
+    def test_malformed_token_rejected(self):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token("not-a-token", "scott", "avis")
+
+    def test_expired_token_rejected(self):
+        store = SignedVerificationTokenStore(ttl_seconds=0, secret=SECRET)
+        token = store.create_token("scott", "avis")
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    @pytest.mark.parametrize("token", ["é.é", "payload.sïgnature", "\ud800.abc", "abc.\udfff"])
+    def test_non_ascii_token_rejected_as_expired(self, token):
+        store = SignedVerificationTokenStore(ttl_seconds=300, secret=SECRET)
+
+        with pytest.raises(VerificationTokenError, match="Verification expired"):
+            store.consume_token(token, "scott", "avis")
+
+    def test_short_secret_rejected(self):
+        with pytest.raises(ValueError, match="at least 32 bytes"):
+            SignedVerificationTokenStore(ttl_seconds=300, secret=b"short")
+
+
+class TestCreateVerificationStore:
+    def test_memory_mode_builds_in_process_store(self):
+        settings = Settings(_env_file=None, verification_token_mode="memory")
+        assert isinstance(create_verification_store(settings), VerificationTokenStore)
+
+    def test_sqlite_mode_builds_shared_store(self, tmp_path):
+        settings = Settings(
+            _env_file=None,
+            verification_token_mode="sqlite",
+            verification_token_db_path=str(tmp_path / "tokens.db"),
+        )
+        assert isinstance(create_verification_store(settings), SQLiteVerificationTokenStore)
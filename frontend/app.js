@@ -0,0 +1,351 @@
+// Relative paths: the backend serves this page, so API calls are same-origin and need no CORS preflight.
+const API_VERIFY = "verify-credentials";
+const API_RESET = "reset-password";
+const API_POLICY = "password-policy";
+const API_CHANGE = "change-password";
+const API_BRANDS = "brands";
+
+const BRAND_THEMES = {
+  avis:   { primary: "#D50032", hover: "#B0002A" },
+  budget: { primary: "#F68B1F", hover: "#DD7A10" },
+};
+
+const loginForm   = document.getElementById("loginForm");
+const resetForm   = document.getElementById("resetForm");
+const loginBtn    = document.getElementById("loginBtn");
+const loginSpinner = document.getElementById("loginSpinner");
+const loginText   = document.getElementById("loginText");
+const submitBtn   = document.getElementById("submitBtn");
+const spinner     = document.getElementById("spinner");
+const btnText     = document.getElementById("btnText");
+const verifiedUser = document.getElementById("verifiedUser");
+const changeUserBtn = document.getElementById("changeUserBtn");
+const statusMsg   = document.getElementById("statusMsg");
+const statusIcon  = document.getElementById("statusIcon");
+const statusTitle = document.getElementById("statusTitle");
+const statusDetail = document.getElementById("statusDetail");
+const statusClose = document.getElementById("statusClose");
+const brandSelect = document.getElementById("brand");
+const brandBadge  = document.getElementById("brandBadge");
+const oneStep     = document.getElementById("oneStep");
+
+let verifiedUsername = "";
+let verifiedPassword = "";
+let verificationToken = "";
+let selectedBrand = brandSelect.value;
+let passwordPolicies = {};
+
+const CHECK_PATH = "M9 12.75L11.25 15 15 9.75M21 12a9 9 0 11-18 0 9 9 0 0118 0z";
+const ERROR_PATH = "M12 9v3.75m9-.75a9 9 0 11-18 0 9 9 0 0118 0zm-9 3.75h.008v.008H12v-.008z";
+
+const DEFAULT_THEME = { primary: "#1F2937", hover: "#111827" };
+
+function applyBrandTheme(brand) {
+  const theme = BRAND_THEMES[brand] || DEFAULT_THEME;
+  document.documentElement.style.setProperty("--brand-primary", theme.primary);
+  document.documentElement.style.setProperty("--brand-hover", theme.hover);
+  selectedBrand = brand;
+}
+
+brandSelect.addEventListener("change", () => {
+  applyBrandTheme(brandSelect.value);
+});
+
+applyBrandTheme(brandSelect.value);
+
+// The built-in options cover avis/budget until the server's brand registry answers.
+fetch(API_BRANDS)
+  .then((res) => (res.ok ? res.json() : null))
+  .then((brands) => {
+    if (!brands || !brands.length || brandSelect.disabled) return;
+    const current = brandSelect.value;
+    brandSelect.replaceChildren(...brands.map(({ name, display_name }) => new Option(display_name, name)));
+    if (brands.some(({ name }) => name === current)) brandSelect.value = current;
+    applyBrandTheme(brandSelect.value);
+  })
+  .catch(() => {});
+
+function showStatus(message, success) {
+  statusIcon.innerHTML = `<path stroke-linecap="round" stroke-linejoin="round" d="${success ? CHECK_PATH : ERROR_PATH}" />`;
+  statusTitle.textContent = success ? "Success" : "Error";
+  statusDetail.textContent = message;
+
+  statusMsg.className = `mb-5 px-4 py-3.5 rounded-lg text-sm flex items-start gap-3 toast-enter ${
+    success
+      ? "bg-green-50 text-green-800 border border-green-200"
+      : "bg-red-50 text-red-800 border border-red-200"
+  }`;
+}
+
+statusClose.addEventListener("click", () => {
+  statusMsg.classList.add("toast-exit");
+  statusMsg.addEventListener("animationend", () => {
+    statusMsg.classList.add("hidden");
+    statusMsg.classList.remove("toast-exit");
+  }, { once: true });
+});
+
+function setLoginLoading(loading) {
+  loginBtn.disabled = loading;
+  loginSpinner.classList.toggle("hidden", !loading);
+  loginText.textContent = loading ? "Verifying..." : "Verify Credentials";
+}
+
+function setResetLoading(loading) {
+  submitBtn.disabled = loading;
+  spinner.classList.toggle("hidden", !loading);
+  btnText.textContent = loading ? "Resetting..." : "Reset Password";
+}
+
+async function parseJsonResponse(res) {
+  try {
+    return await res.json();
+  } catch {
+    return null;
+  }
+}
+
+fetch(API_POLICY)
+  .then((res) => (res.ok ? res.json() : {}))
+  .then((policies) => { passwordPolicies = policies; })
+  .catch(() => {});
+
+function differsByAtLeast(a, b, n) {
+  let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      current[j] = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+    }
+    previous = current;
+  }
+  return previous[b.length] >= n;
+}
+
+// Mirrors app/services/password_policy.py so users see problems before submitting.
+function checkPassword(policy, password, username, oldPassword) {
+  const violations = [];
+  if (!policy) return violations;
+  if (password.length < policy.min_length) {
+    violations.push(`Password must be at least ${policy.min_length} characters long.`);
+  }
+  const counts = { letter: 0, "uppercase letter": 0, "lowercase letter": 0, digit: 0, "special character": 0 };
+  for (const ch of password) {
+    if (/\p{L}/u.test(ch)) {
+      counts.letter++;
+      if (/\p{Lu}/u.test(ch)) counts["uppercase letter"]++;
+      else if (/\p{Ll}/u.test(ch)) counts["lowercase letter"]++;
+    } else if (/\p{Nd}/u.test(ch)) {
+      counts.digit++;
+    } else if (/[!-\/:-@\[-`{-~ ]/.test(ch)) {
+      counts["special character"]++;
+    }
+  }
+  const required = {
+    letter: policy.min_letters,
+    "uppercase letter": policy.min_uppercase,
+    "lowercase letter": policy.min_lowercase,
+    digit: policy.min_digits,
+    "special character": policy.min_special,
+  };
+  for (const [label, min] of Object.entries(required)) {
+    if (counts[label] < min) {
+      violations.push(`Password must contain at least ${min} ${label}${min > 1 ? "s" : ""}.`);
+    }
+  }
+  const lowered = password.toLowerCase();
+  const name = username.toLowerCase();
+  if (policy.disallow_username && name &&
+      (lowered.includes(name) || lowered.includes([...name].reverse().join("")))) {
+    violations.push("Password must not contain the username.");
+  }
+  for (const word of policy.disallowed_words) {
+    if (lowered.includes(word.toLowerCase())) violations.push(`Password must not contain the word "${word}".`);
+  }
+  if (policy.min_differing_chars && !differsByAtLeast(password, oldPassword, policy.min_differing_chars)) {
+    violations.push(
+      `Password must differ from the current password by at least ${policy.min_differing_chars} characters.`
+    );
+  }
+  return violations;
+}
+
+function currentViolations() {
+  const newPassword = document.getElementById("newPassword").value;
+  return checkPassword(passwordPolicies[selectedBrand], newPassword, verifiedUsername, verifiedPassword);
+}
+
+const policyHints = document.getElementById("policyHints");
+document.getElementById("newPassword").addEventListener("input", (e) => {
+  policyHints.replaceChildren(
+    ...(e.target.value ? currentViolations() : []).map((text) => {
+      const li = document.createElement("li");
+      li.textContent = text;
+      return li;
+    })
+  );
+});
+
+document.querySelectorAll(".password-toggle").forEach((btn) => {
+  btn.addEventListener("click", () => {
+    const input = document.getElementById(btn.dataset.target);
+    const isHidden = input.type === "password";
+    input.type = isHidden ? "text" : "password";
+    btn.querySelector(".eye-open").classList.toggle("hidden", isHidden);
+    btn.querySelector(".eye-closed").classList.toggle("hidden", !isHidden);
+  });
+});
+
+function showResetForm(username, currentPassword, token) {
+  verifiedUsername = username;
+  verifiedPassword = currentPassword;
+  verificationToken = token;
+  verifiedUser.textContent = username;
+  brandBadge.textContent = selectedBrand;
+  brandSelect.disabled = true;
+  resetForm.reset();
+  loginForm.classList.add("hidden");
+  resetForm.classList.remove("hidden");
+}
+
+loginForm.addEventListener("submit", async (e) => {
+  e.preventDefault();
+
+  const username        = document.getElementById("username").value.trim();
+  const currentPassword = document.getElementById("currentPassword").value;
+
+  if (!username || !currentPassword) {
+    showStatus("Enter a username and current password.", false);
+    return;
+  }
+
+  // One-step mode: the new-password logon itself checks the current password.
+  if (oneStep.checked) {
+    showResetForm(username, currentPassword, "");
+    return;
+  }
+
+  setLoginLoading(true);
+
+  try {
+    const res = await fetch(API_VERIFY, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        brand: selectedBrand,
+        username,
+        current_password: currentPassword,
+      }),
+    });
+
+    if (res.status === 429) {
+      showStatus("Too many requests. Please try again later.", false);
+      return;
+    }
+
+    const data = await parseJsonResponse(res);
+    if (!data) {
+      showStatus(`Server returned an invalid response (${res.status}).`, false);
+      return;
+    }
+    showStatus(data.message, data.success);
+
+    if (data.success) {
+      if (!data.verification_token) {
+        showStatus("Verification token missing from server response.", false);
+        return;
+      }
+      showResetForm(username, currentPassword, data.verification_token);
+    }
+  } catch (error) {
+    showStatus(`Unable to reach the server (${error.message}).`, false);
+  } finally {
+    setLoginLoading(false);
+  }
+});
+
+changeUserBtn.addEventListener("click", () => {
+  verifiedUsername = "";
+  verifiedPassword = "";
+  verificationToken = "";
+  brandSelect.disabled = false;
+  resetForm.reset();
+  policyHints.replaceChildren();
+  loginForm.reset();
+  resetForm.classList.add("hidden");
+  loginForm.classList.remove("hidden");
+  applyBrandTheme(brandSelect.value);
+});
+
+resetForm.addEventListener("submit", async (e) => {
+  e.preventDefault();
+
+  if (!verifiedUsername || !verifiedPassword || (!verificationToken && !oneStep.checked)) {
+    showStatus("Please verify your credentials first.", false);
+    return;
+  }
+
+  const newPassword     = document.getElementById("newPassword").value;
+  const confirmPassword = document.getElementById("confirmPassword").value;
+
+  if (newPassword !== confirmPassword) {
+    showStatus("New passwords do not match.", false);
+    return;
+  }
+
+  const violations = currentViolations();
+  if (violations.length) {
+    showStatus(violations.join(" "), false);
+    return;
+  }
+
+  setResetLoading(true);
+
+  try {
+    const payload = {
+      brand: selectedBrand,
+      username: verifiedUsername,
+      current_password: verifiedPassword,
+      new_password: newPassword,
+    };
+    if (!oneStep.checked) payload.verification_token = verificationToken;
+    const res = await fetch(oneStep.checked ? API_CHANGE : API_RESET, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload),
+    });
+
+    if (res.status === 429) {
+      showStatus("Too many requests. Please try again later.", false);
+      return;
+    }
+
+    const data = await parseJsonResponse(res);
+    if (!data) {
+      showStatus(`Server returned an invalid response (${res.status}).`, false);
+      return;
+    }
+    if (res.status === 422) {
+      showStatus(data.detail?.[0]?.msg?.replace(/^Value error, /, "") || "Invalid request.", false);
+      return;
+    }
+    showStatus(data.message, data.success);
+
+    if (data.success) {
+      verifiedPassword = "";
+      policyHints.replaceChildren();
+      verificationToken = "";
+      brandSelect.disabled = false;
+      resetForm.reset();
+      document.getElementById("username").value = verifiedUsername;
+      document.getElementById("currentPassword").value = "";
+      resetForm.classList.add("hidden");
+      loginForm.classList.remove("hidden");
+    }
+  } catch (error) {
+    showStatus(`Unable to reach the server (${error.message}).`, false);
+  } finally {
+    setResetLoading(false);
+  }
+});